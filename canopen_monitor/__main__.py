@@ -3,6 +3,8 @@ import sys
 import time
 import logging
 import argparse
+import contextlib
+import datetime as dt
 from . import APP_NAME, \
               APP_VERSION, \
               APP_DESCRIPTION, \
@@ -11,8 +13,10 @@ from . import APP_NAME, \
               LOG_DIR
 from .app import App
 from .meta import Meta
-from .can import MagicCANBus, MessageTable
-from .parse import CANOpenParser, load_eds_files
+from .can import MagicCANBus, MessageHistory, MessageTable, ParsePool
+from .parse import CANOpenParser, LazyODs, ODCache, PluginRegistry, \
+    load_eds_files
+from .parse.cache import CACHE_FILE
 
 
 def init_dirs():
@@ -43,6 +47,40 @@ def main():
                         help='Disable block-waiting for the Magic CAN Bus.'
                              ' (Warning, this may produce undefined'
                              ' behavior).')
+    parser.add_argument('--max-messages',
+                        dest='max_messages',
+                        type=int,
+                        default=8192,
+                        help='The maximum number of COB IDs to keep in the'
+                             ' message table, the least recently seen are'
+                             ' evicted first. (Default: 8192)')
+    parser.add_argument('--dead-ttl',
+                        dest='dead_ttl',
+                        type=float,
+                        default=None,
+                        help='Evict messages that have been dead for longer'
+                             ' than this many seconds. (Default: never)')
+    parser.add_argument('--history-size',
+                        dest='history_size',
+                        type=int,
+                        default=100000,
+                        help='Record this many of the most recent messages'
+                             ' in the message history, 0 to keep no'
+                             ' history. (Default: 100000)')
+    parser.add_argument('--parse-workers',
+                        dest='parse_workers',
+                        type=int,
+                        default=0,
+                        help='Parse messages on this many worker threads,'
+                             ' sharded by node ID, rather than in the main'
+                             ' loop. (Default: 0, parse in the main loop)')
+    parser.add_argument('--lazy-od',
+                        dest='lazy_od',
+                        action='store_true',
+                        default=False,
+                        help='Only parse the OD file of a node once a message'
+                             ' from the node is seen, in the background.'
+                             ' (Default: parse every OD file at launch)')
     parser.add_argument('--log-level',
                         dest='log_level',
                         choices=['info', 'warn', 'debug', 'error', 'fatal'],
@@ -67,13 +105,42 @@ def main():
 
         meta = Meta(CONFIG_DIR, CACHE_DIR)
         features = meta.load_features()
-        eds_configs = load_eds_files(CACHE_DIR, features.ecss_time)
-        mt = MessageTable(CANOpenParser(eds_configs))
+        plugins = PluginRegistry.default(features.ecss_time)
+        od_cache = ODCache(os.path.join(CACHE_DIR, CACHE_FILE))
+        if args.lazy_od:
+            eds_configs = LazyODs(CACHE_DIR,
+                                  features.ecss_time,
+                                  plugins,
+                                  od_cache)
+        else:
+            eds_configs = load_eds_files(CACHE_DIR,
+                                         features.ecss_time,
+                                         plugins,
+                                         od_cache)
+        dead_ttl = dt.timedelta(seconds=args.dead_ttl) \
+            if args.dead_ttl is not None else None
+        parser = CANOpenParser(eds_configs, plugins=plugins)
+        pool = ParsePool(parser, args.parse_workers) \
+            if args.parse_workers > 0 else None
+        history = MessageHistory(args.history_size) \
+            if args.history_size > 0 else None
+        mt = MessageTable(parser,
+                          max_entries=args.max_messages,
+                          dead_ttl=dead_ttl,
+                          history=history,
+                          pool=pool)
         interfaces = meta.load_interfaces(args.interfaces)
 
-        # Start the can bus and the curses app
+        # The state the parser shares between nodes is only read while the
+        #   workers are not updating it, they keep decoding meanwhile
+        parser_lock = pool.lock if pool is not None \
+            else contextlib.nullcontext()
+
+        # Start the can bus, the parse workers and the curses app
         with MagicCANBus(interfaces, no_block=args.no_block) as bus, \
-                App(mt, eds_configs, bus, meta, features) as app:
+                pool or contextlib.nullcontext(), \
+                App(mt, eds_configs, bus, meta, features,
+                    parser.emcy_tracker) as app:
             while True:
                 # Bus updates
                 for message in bus:
@@ -81,13 +148,16 @@ def main():
                         mt += message
 
                 # User Input updates
-                app.handle_keyboard_input()
+                with parser_lock:
+                    app.handle_keyboard_input()
 
                 # Sleep VERY briefly so we're not using 99% of the CPU
                 time.sleep(0.01)
 
                 # Draw update
-                app.draw(bus.statuses)
+                mt.publish()
+                with parser_lock:
+                    app.draw(bus.statuses)
     except KeyboardInterrupt:
         print('Goodbye!')
 
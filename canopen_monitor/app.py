@@ -11,13 +11,16 @@ from . import APP_NAME, \
               APP_URL
 from .can import MessageTable, \
                  MessageType, \
-                 MagicCANBus
+                 MagicCANBus, \
+                 SearchIndex
 from .ui import MessagePane, \
                 PopupWindow, \
                 InputPopup, \
                 SelectionPopup, \
+                EMCYPane, \
                 Column
 from .meta import Meta, FeatureConfig
+from .parse.emcy import EMCYTracker
 
 # Key Constants not defined in curses
 # _UBUNTU key constants work in Ubuntu
@@ -85,6 +88,12 @@ class KeyMap(Enum):
           'key': curses.KEY_F5}
     F6 = {'name': 'F6', 'description': 'Clear screen',
           'key': curses.KEY_F6}
+    F7 = {'name': 'F7', 'description': 'Toggle search messages',
+          'key': curses.KEY_F7}
+    F8 = {'name': 'F8', 'description': 'Jump to next search match',
+          'key': curses.KEY_F8}
+    F9 = {'name': 'F9', 'description': 'Toggle emergency errors',
+          'key': curses.KEY_F9}
     UP_ARR = {'name': 'Up Arrow', 'description': 'Scroll pane up 1 row',
               'key': curses.KEY_UP}
     DOWN_ARR = {'name': 'Down Arrow', 'description': 'Scroll pane down 1 row',
@@ -123,13 +132,17 @@ class App:
     """
 
     def __init__(self: App, message_table: MessageTable, eds_configs: dict,
-                 bus: MagicCANBus, meta: Meta, features: FeatureConfig):
+                 bus: MagicCANBus, meta: Meta, features: FeatureConfig,
+                 emcy_tracker: EMCYTracker = None):
         """
         App Initialization function
         :param message_table: Reference to shared message table object
         :type MessageTable
         :param features: Application feature settings
         :type features: FeatureConfig
+        :param emcy_tracker: Tracker of the EMCY messages to list active
+            errors from
+        :type EMCYTracker
         """
         self.table = message_table
         self.eds_configs = eds_configs
@@ -138,6 +151,11 @@ class App:
         self.selected_pane = None
         self.meta = meta
         self.features = features
+        self.window_active = False
+        self.search_index = SearchIndex(self.table)
+        self.search_results = []
+        self.search_pos = 0
+        self.emcy_tracker = emcy_tracker or EMCYTracker()
         self.key_dict = {
             KeyMap.UP_ARR.value['key']: self.up,
             KeyMap.S_UP_ARR.value['key']: self.shift_up,
@@ -157,6 +175,9 @@ class App:
             KeyMap.F4.value['key']: self.f4,
             KeyMap.F5.value['key']: self.f5,
             KeyMap.F6.value['key']: self.f6,
+            KeyMap.F7.value['key']: self.f7,
+            KeyMap.F8.value['key']: self.f8,
+            KeyMap.F9.value['key']: self.f9,
         }
 
     def __enter__(self: App) -> App:
@@ -208,6 +229,15 @@ class App:
                                             header='Remove Interface',
                                             footer='ENTER: remove, F5: exit window',
                                             style=curses.color_pair(1))
+        self.search_win = InputPopup(self.screen,
+                                     header='Search Messages',
+                                     footer='ENTER: search, F7: exit window',
+                                     style=curses.color_pair(1),
+                                     input_filter=curses.ascii.isprint)
+        self.emcy_win = EMCYPane(self.screen,
+                                 self.emcy_tracker,
+                                 footer='F9: exit window',
+                                 style=curses.color_pair(1))
         self.hb_pane = MessagePane(cols=[Column('Node ID', 'node_name'),
                                          Column('State', 'state'),
                                          Column('Status', 'message'),
@@ -226,7 +256,8 @@ class App:
                                            Column('Type', 'type'),
                                            Column('Age',
                                                   'age',
-                                                  trunc_timedelta),
+                                                  trunc_timedelta,
+                                                  dynamic=True),
                                            Column('Message', 'message'),
                                            Column('Error', 'error')],
                                      types=[MessageType.NMT,
@@ -244,7 +275,7 @@ class App:
                                      message_table=self.table)
         self.__select_pane(self.hb_pane, 0)
         self.popups = [self.hotkeys_win, self.info_win, self.add_if_win,
-                       self.remove_if_win]
+                       self.remove_if_win, self.search_win, self.emcy_win]
         return self
 
     def __exit__(self: App, type, value, traceback) -> None:
@@ -328,6 +359,7 @@ class App:
         self.hb_pane._reset_scroll_positions()
         self.misc_pane._reset_scroll_positions()
         self.screen.clear()
+        self.__invalidate_panes()
 
     def f1(self):
         """
@@ -377,8 +409,61 @@ class App:
         """
         self.hb_pane.clear_messages()
         self.misc_pane.clear_messages()
+        self.emcy_tracker.clear()
         self.hb_pane.clear()
         self.misc_pane.clear()
+        self.__invalidate_panes()
+
+    def f7(self) -> None:
+        """
+        Toggles Search Messages Popup
+        :return: None
+        """
+        self.toggle_popup(self.search_win)
+
+    def f8(self) -> None:
+        """
+        Jump to the next match of the last search
+        :return: None
+        """
+        if(len(self.search_results) > 0):
+            self.search_pos = (self.search_pos + 1) % len(self.search_results)
+            self.__jump_to_match()
+
+    def f9(self) -> None:
+        """
+        Toggles Emergency Errors Popup
+        :return: None
+        """
+        self.toggle_popup(self.emcy_win)
+
+    def search(self: App, query: str) -> None:
+        """
+        Search the parsed messages and errors for every word of a query and
+        jump to the first match
+        :param query: The words to search for
+        :type query: str
+        :return: None
+        """
+        self.search_results = self.search_index.search(query)
+        self.search_pos = 0
+        self.__jump_to_match()
+
+    def __jump_to_match(self: App) -> None:
+        """
+        Select the pane of the current search match and move its cursor to the
+        match, skipping any matches that are no longer displayed
+        :return: None
+        """
+        panes = [self.hb_pane, self.misc_pane]
+        for i in range(len(self.search_results)):
+            pos = (self.search_pos + i) % len(self.search_results)
+            arb_id = self.search_results[pos]
+            for j, pane in enumerate(panes):
+                if(pane.jump_to(arb_id)):
+                    self.search_pos = pos
+                    self.__select_pane(pane, j)
+                    return
 
     def toggle_popup(self, selected_popup) -> None:
         for popup in self.popups:
@@ -417,6 +502,16 @@ class App:
             else:
                 self.remove_if_win.read_input(keyboard_input)
 
+        elif self.search_win.enabled:
+            if keyboard_input == curses.KEY_ENTER or \
+                    keyboard_input == 10 or keyboard_input == 13:
+                value = self.search_win.get_value()
+                if value != "":
+                    self.search(value)
+                self.search_win.toggle()
+            else:
+                self.search_win.read_input(keyboard_input)
+
         try:
             self.key_dict[keyboard_input]()
         except KeyError:
@@ -435,6 +530,14 @@ class App:
         curses.init_pair(4, curses.COLOR_CYAN, curses.COLOR_BLACK)
         curses.init_pair(5, curses.COLOR_MAGENTA, curses.COLOR_BLACK)
 
+    def __invalidate_panes(self: App) -> None:
+        """
+        Force all panes to be fully redrawn on the next draw
+        :return: None
+        """
+        self.hb_pane.invalidate()
+        self.misc_pane.invalidate()
+
     def __select_pane(self: App, pane: MessagePane, pos: int) -> None:
         """
         Set Pane as Selected
@@ -479,7 +582,9 @@ class App:
                  '<F3>: Add OD File, ' \
                  '<F4>: Add Interface, ' \
                  '<F5> Remove Interface ' \
-                 '<F6> Clear Messages'
+                 '<F6> Clear Messages ' \
+                 '<F7> Search ' \
+                 '<F9> Errors'
         self.screen.addstr(height - 1, 1, footer)
 
     def draw(self: App, ifaces: [tuple]) -> None:
@@ -491,6 +596,13 @@ class App:
         window_active = any(popup.enabled for popup in self.popups)
         self.__draw_header(ifaces)  # Draw header info
 
+        # Panes only redraw the rows that changed, so anything that was drawn
+        #   over them by a window or cleared from the screen must be redrawn
+        if (window_active != self.window_active):
+            self.window_active = window_active
+            self.__invalidate_panes()
+        self.screen.noutrefresh()
+
         # Draw panes
         if (not window_active):
             self.hb_pane.draw()
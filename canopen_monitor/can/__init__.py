@@ -4,7 +4,10 @@ CAN messages according to the
 `CANOpen spec <https://en.wikipedia.org/wiki/CANopen>`_.
 """
 from .message import Message, MessageState, MessageType
-from .message_table import MessageTable
+from .history import MessageHistory
+from .message_table import MessageTable, TableChanges, TableSnapshot
+from .parse_pool import ParsePool
+from .search import SearchIndex
 from .interface import Interface
 from .magic_can_bus import MagicCANBus
 
@@ -13,6 +16,11 @@ __all__ = [
     "MessageState",
     "MessageType",
     "MessageTable",
+    "TableChanges",
+    "TableSnapshot",
+    "MessageHistory",
+    "ParsePool",
+    "SearchIndex",
     'Interface',
     'MagicCANBus',
 ]
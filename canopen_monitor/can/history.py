@@ -0,0 +1,234 @@
+from __future__ import annotations
+import heapq
+import itertools
+import datetime as dt
+from array import array
+from bisect import bisect_left, bisect_right
+from .message import Message, MessageType
+
+# Fraction of the size limit of a history forgotten at once, as a divisor
+HISTORY_TRIM_FRACTION = 10
+
+
+class _Stream:
+    """Every frame recorded for a single COB ID, sorted by timestamp
+
+    The timestamps are kept in a packed array separate from the payloads, so a
+    time window can be located with a binary search over contiguous memory.
+    """
+
+    def __init__(self: _Stream, arb_id: int, extended: bool):
+        self.arb_id = arb_id
+        self.extended = extended
+        self.type = MessageType.cob_id_to_type(arb_id)
+        self.node_id = MessageType.cob_to_node(self.type, arb_id)
+        self.timestamps = array('d')
+        self.payloads = []
+        self.interfaces = []
+
+    def append(self: _Stream,
+               timestamp: float,
+               data: bytes,
+               interface: str) -> None:
+        # Frames from several interfaces can arrive slightly out of order
+        if(len(self.timestamps) == 0 or timestamp >= self.timestamps[-1]):
+            self.timestamps.append(timestamp)
+            self.payloads.append(data)
+            self.interfaces.append(interface)
+        else:
+            i = bisect_right(self.timestamps, timestamp)
+            self.timestamps.insert(i, timestamp)
+            self.payloads.insert(i, data)
+            self.interfaces.insert(i, interface)
+
+    def window(self: _Stream, start: float, end: float) -> iter:
+        """Iterate over the frames in the time window [start, end]
+
+        The frames of the window are copied when it is found, so frames
+        recorded or forgotten meanwhile do not change what it iterates over.
+
+        :return: An iterator of `(timestamp, stream, data, interface)` tuples
+        :rtype: iter
+        """
+        lo = 0 if start is None else bisect_left(self.timestamps, start)
+        hi = len(self.timestamps) if end is None \
+            else bisect_right(self.timestamps, end)
+        return zip(self.timestamps[lo:hi],
+                   itertools.repeat(self),
+                   self.payloads[lo:hi],
+                   self.interfaces[lo:hi])
+
+    def trim(self: _Stream, cutoff: float) -> int:
+        """Forget the frames received at or before a time
+
+        :return: The number of frames forgotten
+        :rtype: int
+        """
+        i = bisect_right(self.timestamps, cutoff)
+        del self.timestamps[:i]
+        del self.payloads[:i]
+        del self.interfaces[:i]
+        return i
+
+    def __len__(self: _Stream) -> int:
+        return len(self.timestamps)
+
+
+class MessageHistory:
+    """A record of every message received, indexed by COB ID and sorted by
+    timestamp, to answer queries such as "everything node 0x21 sent between
+    T0 and T1" long after the message table has moved on
+
+    Only the raw frames are stored. Messages are rebuilt and parsed lazily
+    while a query is being iterated over, so only the frames that are actually
+    read out of a query ever get decoded.
+
+    Once more than `max_messages` frames are recorded, the oldest frames are
+    forgotten, a tenth of the limit at a time so the cost of forgetting is
+    spread over many appends.
+
+    :param count: The number of frames recorded
+    :type count: int
+
+    :param max_messages: The number of frames to keep, or None to keep every
+        frame
+    :type max_messages: int
+    """
+
+    def __init__(self: MessageHistory, max_messages: int = None):
+        self.__streams = {}
+        self.count = 0
+        self.max_messages = max_messages
+
+    def __len__(self: MessageHistory) -> int:
+        return self.count
+
+    def append(self: MessageHistory, message: Message) -> None:
+        """Record a message
+
+        :param message: The message received
+        :type message: Message
+        """
+        stream = self.__streams.get(message.arb_id)
+        if(stream is None):
+            stream = _Stream(message.arb_id, message.is_extended_id)
+            self.__streams[message.arb_id] = stream
+
+        timestamp = message.timestamp
+        if(isinstance(timestamp, dt.datetime)):
+            timestamp = timestamp.timestamp()
+        stream.append(timestamp, bytes(message.data), message.interface)
+        self.count += 1
+
+        if(self.max_messages is not None and self.count > self.max_messages):
+            self.__trim(self.count - self.max_messages
+                        + self.max_messages // HISTORY_TRIM_FRACTION)
+
+    def __trim(self: MessageHistory, excess: int) -> None:
+        """Forget at least the given number of the oldest frames
+
+        :param excess: The number of frames to forget
+        :type excess: int
+        """
+        oldest = heapq.merge(*map(lambda x: x.timestamps,
+                                  self.__streams.values()))
+        cutoff = next(itertools.islice(oldest, excess - 1, None), None)
+        if(cutoff is None):
+            self.clear()
+            return
+
+        for arb_id, stream in list(self.__streams.items()):
+            self.count -= stream.trim(cutoff)
+            if(len(stream) == 0):
+                del self.__streams[arb_id]
+
+    def clear(self: MessageHistory) -> None:
+        """Forget every recorded message
+        """
+        self.__streams = {}
+        self.count = 0
+
+    def query(self: MessageHistory,
+              start: dt.datetime = None,
+              end: dt.datetime = None,
+              cob_id: int = None,
+              node_id: int = None,
+              msg_type: MessageType = None,
+              parser=None) -> iter:
+        """Find every recorded message matching all of the given criteria
+
+        Each COB ID matching the criteria has its time window found by a
+        binary search, and the windows are merged lazily in timestamp order,
+        so the messages are only rebuilt and parsed as they are read. The
+        windows are copied when the query is made, so messages recorded or
+        forgotten while it is iterated over do not change its results.
+
+        .. warning::
+
+            Parsing is stateful for some message types (such as SDO
+            transfers), so the parser given should not be the one used for the
+            live message table. A new `CANOpenParser` sharing the same EDS
+            configs is a good choice.
+
+        :param start: Only include messages received at or after this time
+        :type start: datetime.datetime
+
+        :param end: Only include messages received at or before this time
+        :type end: datetime.datetime
+
+        :param cob_id: Only include messages with this COB ID
+        :type cob_id: int
+
+        :param node_id: Only include messages sent to or from this node
+        :type node_id: int
+
+        :param msg_type: Only include messages of this type or supertype
+        :type msg_type: MessageType
+
+        :param parser: The parser used to fill in the node name, message and
+            error of every message, if not given the messages are left raw
+        :type parser: CANOpenParser
+
+        :return: A generator of the matching messages, in timestamp order
+        :rtype: iter
+        """
+        start = start.timestamp() if start is not None else None
+        end = end.timestamp() if end is not None else None
+
+        if(cob_id is not None):
+            stream = self.__streams.get(cob_id)
+            streams = [stream] if stream is not None else []
+        else:
+            streams = list(self.__streams.values())
+
+        if(node_id is not None):
+            streams = list(filter(lambda x: x.node_id == node_id, streams))
+        if(msg_type is not None):
+            streams = list(filter(lambda x: x.type == msg_type
+                                  or x.type.supertype == msg_type, streams))
+
+        return self.__generate(heapq.merge(*map(lambda x: x.window(start, end),
+                                                streams),
+                                           key=lambda x: (x[0], x[1].arb_id)),
+                               parser)
+
+    def __generate(self: MessageHistory, frames: iter, parser) -> iter:
+        """Rebuild and optionally parse each frame as it is requested
+
+        :param frames: An iterator of `(timestamp, stream, data, interface)`
+            tuples
+        :type frames: iter
+
+        :return: A generator of messages
+        :rtype: iter
+        """
+        for timestamp, stream, data, interface in frames:
+            message = Message(stream.arb_id,
+                              data=list(data),
+                              interface=interface,
+                              timestamp=dt.datetime.fromtimestamp(timestamp),
+                              extended=stream.extended)
+            if(parser is not None):
+                message.node_name = parser.get_name(message)
+                message.message, message.error = parser.parse(message)
+            yield message
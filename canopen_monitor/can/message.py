@@ -6,6 +6,10 @@ from pyvit.can import Frame
 STALE_TIME = dt.timedelta(seconds=5)
 DEAD_TIME = dt.timedelta(seconds=10)
 
+# The message type of every standard (11-bit) COB ID, filled in below
+#   `MessageType`
+COB_ID_TYPES = ()
+
 
 class MessageType(Enum):
     """This enumeration describes all of the ranges in the CANOpen spec that
@@ -17,8 +21,10 @@ class MessageType(Enum):
     """
     # Regular CANOpen message types
     NMT = (0x0, 0x0)
-    SYNC = (0x1, 0x7F)
+    SYNC = (0x80, 0x80)
     TIME = (0x100, 0x100)
+    # EMCY COB IDs are 0x80 plus the node ID, 0x80 itself is the SYNC, which
+    #   is matched first
     EMER = (0x80, 0x0FF)
     PDO1_TX = (0x180, 0x1FF)
     PDO1_RX = (0x200, 0x27F)
@@ -99,6 +105,8 @@ class MessageType(Enum):
         :return: The message type (range) the COB ID fits into
         :rtype: MessageType
         """
+        if 0 <= cob_id < len(COB_ID_TYPES):
+            return COB_ID_TYPES[cob_id]
         for msg_type in list(MessageType):
             if msg_type.start <= cob_id <= msg_type.end:
                 return msg_type
@@ -108,6 +116,9 @@ class MessageType(Enum):
         return self.name
 
 
+COB_ID_TYPES = tuple(map(MessageType.cob_id_to_type, range(0x800)))
+
+
 class MessageState(Enum):
     """This enumeration describes all possible states of a CAN Message
 
@@ -1,27 +1,444 @@
 from __future__ import annotations
-from .message import Message, MessageType
+import copy
+import datetime as dt
+from collections import OrderedDict
+from .message import Message, MessageState, MessageType, DEAD_TIME
+from .history import MessageHistory
+from .parse_pool import ParsePool, PARSE_BUDGET
+
+
+class TableChanges:
+    """A record of everything that changed in a `MessageTable` since the last
+    time its changes were published
+
+    :param inserted: COB IDs of the rows added to the table
+    :type inserted: set
+
+    :param updated: COB IDs of existing rows that received a new message
+    :type updated: set
+
+    :param state_changed: COB IDs of rows whose `MessageState` changed
+    :type state_changed: set
+
+    :param removed: COB IDs of rows evicted from the table
+    :type removed: set
+
+    :param cleared: Indication that the table was emptied, any rows held by
+        a subscriber from before the change are no longer valid
+    :type cleared: bool
+    """
+
+    def __init__(self: TableChanges):
+        self.inserted = set()
+        self.updated = set()
+        self.state_changed = set()
+        self.removed = set()
+        self.cleared = False
+
+    @property
+    def dirty(self: TableChanges) -> set:
+        """COB IDs of rows that already existed but need to be redrawn
+
+        :return: The set of modified rows
+        :rtype: set
+        """
+        return (self.updated | self.state_changed) - self.inserted
+
+    def __bool__(self: TableChanges) -> bool:
+        return bool(self.cleared
+                    or self.inserted
+                    or self.updated
+                    or self.state_changed
+                    or self.removed)
+
+
+def filter_messages(messages: [Message],
+                    types: [MessageType],
+                    start: int = 0,
+                    end: int = None,
+                    sort_by: str = 'arb_id',
+                    reverse=False) -> [Message]:
+    """Select the messages matching any of the given types or supertypes
+
+    :param messages: The messages to filter
+    :type messages: [Message]
+
+    :param types: The message types to keep
+    :type types: [MessageType]
+
+    :return: The matching messages, sorted by the `sort_by` attribute
+    :rtype: [Message]
+    """
+    messages = list(filter(lambda x: x.type in types
+                    or x.supertype in types, messages))
+    end = len(messages) if end is None else end
+    slice = messages[start:end]
+    return sorted(slice, key=lambda x: getattr(x, sort_by), reverse=reverse)
+
+
+class TableSnapshot:
+    """An immutable, versioned view of a `MessageTable` as it was when its
+    changes were last published
+
+    Snapshots are safe to read from any thread. The table they wrap is never
+    modified after publication, the `MessageTable` copies it before its next
+    write instead.
+
+    :param version: The number of publishes that changed the table before
+        this snapshot was taken
+    :type version: int
+    """
+
+    def __init__(self: TableSnapshot, version: int, table: dict):
+        self.version = version
+        self.__table = table
+
+    def __getitem__(self: TableSnapshot, arb_id: int) -> Message:
+        return self.__table[arb_id]
+
+    def __contains__(self: TableSnapshot, arb_id: int) -> bool:
+        return arb_id in self.__table
+
+    def __len__(self: TableSnapshot) -> int:
+        return len(self.__table)
+
+    def __iter__(self: TableSnapshot) -> iter:
+        return iter(map(lambda x: self.__table[x], sorted(self.__table)))
+
+    def get(self: TableSnapshot, arb_id: int, default: any = None) -> Message:
+        return self.__table.get(arb_id, default)
+
+    def filter(self: TableSnapshot,
+               types: MessageType,
+               start: int = 0,
+               end: int = None,
+               sort_by: str = 'arb_id',
+               reverse=False) -> [Message]:
+        return filter_messages(self.__table.values(),
+                               types,
+                               start,
+                               end,
+                               sort_by,
+                               reverse)
 
 
 class MessageTable:
-    def __init__(self: MessageTable, parser=None):
+    """The table of the most recent message received for each COB ID
+
+    Changes to the table are collected as they happen and handed out to
+    subscribers as a single `TableChanges` each time `publish()` is called,
+    which allows consumers to only do work for the rows that changed.
+
+    Every publish that changed the table also makes a new `TableSnapshot`
+    available through `snapshot`, for consumers on other threads. The table is
+    copy-on-write: a publish only shares the current table with the snapshot,
+    and the first write after it makes a private copy, so readers never need a
+    lock and the ingest path never waits on a reader.
+
+    :param parser: The parser used to decode every message added. If it has a
+        `poll()` method, it is called on every publish for the rows to flag
+        with errors found since their message was parsed
+    :type parser: CANOpenParser
+
+    :param max_entries: The maximum number of rows in the table, once reached
+        the least recently updated row is evicted to make room, preferring
+        dead rows over stale rows and stale rows over alive ones
+    :type max_entries: int
+
+    :param dead_ttl: How long a row may stay `DEAD` before it is evicted
+    :type dead_ttl: datetime.timedelta
+
+    :param history: A record of every message added, if one should be kept
+    :type history: MessageHistory
+
+    :param pool: Workers to parse the messages added with the parser, rather
+        than parsing them as they are added. Parsed messages are merged into
+        the table on publish, for up to `parse_budget` seconds per publish.
+    :type pool: ParsePool
+
+    :param parse_budget: The time a publish may spend merging parsed
+        messages, the rest are merged by the next publishes
+    :type parse_budget: float
+
+    :param evicted_expired: The number of rows evicted by `dead_ttl`
+    :type evicted_expired: int
+
+    :param evicted_capacity: The number of rows evicted by `max_entries`
+    :type evicted_capacity: int
+    """
+
+    def __init__(self: MessageTable,
+                 parser=None,
+                 max_entries: int = None,
+                 dead_ttl: dt.timedelta = None,
+                 history: MessageHistory = None,
+                 pool: ParsePool = None,
+                 parse_budget: float = PARSE_BUDGET):
         self.table = {}
         self.parser = parser
+        self.history = history
+        self.pool = pool
+        self.parse_budget = parse_budget
+        self.max_entries = max_entries
+        self.dead_ttl = dead_ttl
+        self.evicted_expired = 0
+        self.evicted_capacity = 0
+        self.version = 0
+        self.__subscribers = []
+        self.__changes = TableChanges()
+        self.__snapshot = TableSnapshot(self.version, self.table)
+        self.__shared = True
+
+        # Rows bucketed by liveness, each bucket is ordered from the least to
+        #   the most recently updated row, so state changes are only ever
+        #   found at the front of a bucket
+        self.__alive = OrderedDict()
+        self.__stale = OrderedDict()
+        self.__dead = OrderedDict()
 
     def __add__(self: MessageTable, message: Message) -> MessageTable:
+        if(self.history is not None):
+            self.history.append(message)
+
+        if(self.pool is not None):
+            self.pool.submit(message)
+            return self
+
         if(self.parser is not None):
             message.node_name = self.parser.get_name(message)
             message.message, message.error = self.parser.parse(message)
-        self.table[message.arb_id] = message
+        self.__insert(message)
         return self
 
+    def __insert(self: MessageTable, message: Message) -> None:
+        """Make a parsed message the row of its COB ID
+
+        :param message: The message
+        :type message: Message
+        """
+        arb_id = message.arb_id
+        if(arb_id in self.table):
+            self.__changes.updated.add(arb_id)
+        else:
+            if(self.max_entries is not None
+                    and len(self.table) >= self.max_entries):
+                self.__evict_oldest()
+            self.__changes.inserted.add(arb_id)
+
+        if(arb_id in self.__alive):
+            self.__alive.move_to_end(arb_id)
+        else:
+            # The row was either stale, dead, or is new
+            if(arb_id in self.table):
+                if(arb_id in self.__stale):
+                    del self.__stale[arb_id]
+                else:
+                    del self.__dead[arb_id]
+                self.__changes.state_changed.add(arb_id)
+            self.__alive[arb_id] = None
+
+        self.__write()[arb_id] = message
+
+    def __write(self: MessageTable) -> dict:
+        """Get the table for writing, copying it first if it is shared with the
+        published snapshot
+
+        :return: The private table
+        :rtype: dict
+        """
+        if(self.__shared):
+            self.table = dict(self.table)
+            self.__shared = False
+        return self.table
+
+    def __evict(self: MessageTable, arb_id: int) -> None:
+        """Remove a row from the table, its liveness bucket must already have
+        been removed
+
+        :param arb_id: The COB ID of the row
+        :type arb_id: int
+        """
+        del self.__write()[arb_id]
+        changes = self.__changes
+        changes.updated.discard(arb_id)
+        changes.state_changed.discard(arb_id)
+        if(arb_id in changes.inserted):
+            # Subscribers never saw this row
+            changes.inserted.discard(arb_id)
+        else:
+            changes.removed.add(arb_id)
+
+    def __evict_oldest(self: MessageTable) -> None:
+        """Evict the least recently updated row, in the order of dead, stale,
+        then alive rows
+        """
+        for bucket in [self.__dead, self.__stale, self.__alive]:
+            if(bucket):
+                arb_id, _ = bucket.popitem(last=False)
+                self.__evict(arb_id)
+                self.evicted_capacity += 1
+                return
+
+    @property
+    def evicted(self: MessageTable) -> int:
+        """The total number of rows evicted from the table
+
+        :return: Count of evicted rows
+        :rtype: int
+        """
+        return self.evicted_expired + self.evicted_capacity
+
+    @property
+    def snapshot(self: MessageTable) -> TableSnapshot:
+        """The most recently published view of the table
+
+        :return: An immutable view of the table
+        :rtype: TableSnapshot
+        """
+        return self.__snapshot
+
+    def __getitem__(self: MessageTable, arb_id: int) -> Message:
+        return self.table[arb_id]
+
     def __len__(self: MessageTable) -> int:
         return len(self.table)
 
+    def subscribe(self: MessageTable, callback: callable) -> None:
+        """Register a callback to receive the `TableChanges` every time the
+        table changes are published
+
+        :param callback: A function accepting a single `TableChanges`
+        :type callback: callable
+        """
+        self.__subscribers.append(callback)
+
+    def unsubscribe(self: MessageTable, callback: callable) -> None:
+        """Stop sending table changes to a previously registered callback
+
+        :param callback: The callback to remove
+        :type callback: callable
+        """
+        if(callback in self.__subscribers):
+            self.__subscribers.remove(callback)
+
+    def publish(self: MessageTable) -> TableChanges:
+        """Collect the changes since the last publish, including any rows that
+        have changed liveness state by aging, and hand them to all subscribers
+
+        This is meant to be called once per cycle of the main loop. Only the
+        rows that changed state or expired are visited, so the cost of a
+        publish scales with the amount of change rather than with the size of
+        the table.
+
+        :return: The changes that were published
+        :rtype: TableChanges
+        """
+        self.__merge()
+        self.__poll_parser()
+        self.__update_states()
+        changes = self.__changes
+        self.__changes = TableChanges()
+
+        if(changes):
+            self.version += 1
+            self.__snapshot = TableSnapshot(self.version, self.table)
+            self.__shared = True
+            for callback in self.__subscribers:
+                callback(changes)
+        return changes
+
+    def annotate(self: MessageTable, arb_id: int, error: str) -> bool:
+        """Flag the row of a COB ID with an error found after its message was
+        parsed
+
+        The message is replaced by a copy, since the message in the table may
+        be shared with a published snapshot or the history.
+
+        :param arb_id: The COB ID of the row
+        :type arb_id: int
+
+        :param error: The error to show on the row
+        :type error: str
+
+        :return: An indication that the row exists
+        :rtype: bool
+        """
+        message = self.table.get(arb_id)
+        if(message is None):
+            return False
+
+        message = copy.copy(message)
+        message.error = error
+        self.__write()[arb_id] = message
+        if(arb_id not in self.__changes.inserted):
+            self.__changes.updated.add(arb_id)
+        return True
+
+    def __merge(self: MessageTable) -> None:
+        """Add the messages parsed by the pool since the last publish, within
+        the parse budget
+        """
+        if(self.pool is None):
+            return
+        for message in self.pool.results(self.parse_budget):
+            self.__insert(message)
+
+    def __poll_parser(self: MessageTable) -> None:
+        """Flag the rows the parser found errors for since the last publish
+        """
+        poll = getattr(self.pool or self.parser, 'poll', None)
+        if(poll is None):
+            return
+        for arb_id, error in poll():
+            self.annotate(arb_id, error)
+
+    def __update_states(self: MessageTable) -> None:
+        """Move any rows that have aged into a new state to the next bucket,
+        and evict the dead rows that outlived the `dead_ttl`
+        """
+        while(self.__alive):
+            arb_id = next(iter(self.__alive))
+            if(self.table[arb_id].state == MessageState.ALIVE):
+                break
+            del self.__alive[arb_id]
+            self.__stale[arb_id] = None
+            self.__changes.state_changed.add(arb_id)
+
+        while(self.__stale):
+            arb_id = next(iter(self.__stale))
+            if(self.table[arb_id].state != MessageState.DEAD):
+                break
+            del self.__stale[arb_id]
+            self.__dead[arb_id] = None
+            self.__changes.state_changed.add(arb_id)
+
+        if(self.dead_ttl is None):
+            return
+
+        expiry = DEAD_TIME + self.dead_ttl
+        while(self.__dead):
+            arb_id = next(iter(self.__dead))
+            if(self.table[arb_id].age < expiry):
+                break
+            del self.__dead[arb_id]
+            self.__evict(arb_id)
+            self.evicted_expired += 1
+
     def clear(self) -> None:
         """
         Clear the table to remove all its messages.
+
+        Subscribers are notified immediately, since any rows they hold are no
+        longer valid.
         """
         self.table = {}
+        self.__shared = False
+        self.__alive.clear()
+        self.__stale.clear()
+        self.__dead.clear()
+        self.__changes = TableChanges()
+        self.__changes.cleared = True
+        self.publish()
 
     def filter(self: MessageTable,
                types: MessageType,
@@ -29,29 +446,36 @@ class MessageTable:
                end: int = None,
                sort_by: str = 'arb_id',
                reverse=False) -> [Message]:
-        end = len(self.table) if end is None else end
-        messages = list(filter(lambda x: x.type in types
-                        or x.supertype in types, self.table.values()))
-        slice = messages[start:end]
-        return sorted(slice, key=lambda x: getattr(x, sort_by), reverse=reverse)
+        return filter_messages(self.table.values(),
+                               types,
+                               start,
+                               end,
+                               sort_by,
+                               reverse)
 
     def __contains__(self: MessageTable, node_id: int) -> bool:
         return node_id in self.table
 
-    def __iter__(self: MessageTable) -> MessageTable:
-        self.__keys = sorted(list(self.table.keys()))
-        return self
-
-    def __next__(self: MessageTable) -> Message:
-        if(self.__start == self.__stop):
-            raise StopIteration()
-        message = self.table[self.__keys[self.__start]]
-        self.__start += 1
-        return message
+    def __iter__(self: MessageTable) -> iter:
+        return self(0)
 
     def __call__(self: MessageTable,
                  start: int,
-                 stop: int = None) -> MessageTable:
-        self.__stop = stop if stop < len(self.table) else len(self.table)
-        self.__start = start if start < self.__stop else self.__stop
-        return self
+                 stop: int = None) -> iter:
+        """Iterate over a range of the messages, sorted by COB ID
+
+        The keys are sorted up front, so no iteration state is kept on the
+        table itself and several iterations may be in progress at once.
+
+        :param start: The position of the first message
+        :type start: int
+
+        :param stop: The position after the last message
+        :type stop: int
+
+        :return: An iterator over the messages
+        :rtype: iter
+        """
+        table = self.table
+        keys = sorted(table)[start:stop]
+        return iter(map(lambda x: table[x], keys))
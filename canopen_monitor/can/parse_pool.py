@@ -0,0 +1,152 @@
+from __future__ import annotations
+import contextlib
+import queue
+import threading as t
+import time
+from collections import deque
+from .message import Message
+
+# Seconds a publish may spend merging parsed messages into the table
+PARSE_BUDGET = 0.005
+
+# Number of parsed messages kept waiting to be merged into the table
+PARSE_BACKLOG = 65536
+
+
+class ParsePool:
+    """A pool of threads parsing messages off the main loop, so bursts of
+    messages that are expensive to decode, such as SDO domain transfers, do
+    not freeze the UI
+
+    Messages are sharded by node ID, every message of a node is parsed by the
+    same worker in the order it was submitted, so stateful parsers such as
+    SDO see the messages of a node in order. A node flooding the bus only
+    fills the queue of its own worker. Messages updating state shared
+    between nodes, such as SYNCs, synchronous PDOs, NMT commands and
+    heartbeats, see `CANOpenParser.shares_state`, all go to the first worker
+    so they are parsed in order with each other.
+
+    The workers parse at the same time, the parser only guards the state
+    shared between nodes with its `lock`, which is also the `lock` of the
+    pool. Anything else reading that state, such as drawing the EMCY
+    tracker, must hold the lock too. Workers take turns parsing with the
+    lock of the pool if the parser has no lock of its own.
+
+    Parsed messages wait in `completed` until they are merged into the
+    table. If more than `backlog` are waiting, the oldest are dropped and
+    counted in `dropped`.
+
+    :param parser: The parser to parse the messages with
+    :type parser: CANOpenParser
+
+    :param workers: The number of worker threads
+    :type workers: int
+
+    :param backlog: The number of parsed messages kept waiting
+    :type backlog: int
+    """
+
+    def __init__(self: ParsePool,
+                 parser: any,
+                 workers: int = 1,
+                 backlog: int = PARSE_BACKLOG):
+        self.parser = parser
+        if(hasattr(parser, 'lock')):
+            self.lock = parser.lock
+            self.__parse_lock = contextlib.nullcontext()
+        else:
+            self.lock = t.RLock()
+            self.__parse_lock = self.lock
+        self.completed = deque(maxlen=backlog)
+        self.dropped = 0
+        self.shards = [queue.SimpleQueue() for _ in range(max(workers, 1))]
+        self.threads = []
+        self.__shares_state = getattr(parser, 'shares_state', None)
+        self.__completed_lock = t.Lock()
+
+    def __enter__(self: ParsePool) -> ParsePool:
+        self.threads = [t.Thread(target=self.handler,
+                                 name=f'canopen-monitor-parse-{i}',
+                                 args=[shard],
+                                 daemon=True)
+                        for i, shard in enumerate(self.shards)]
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def __exit__(self: ParsePool,
+                 etype: str,
+                 evalue: str,
+                 traceback: any) -> None:
+        for shard in self.shards:
+            shard.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+    @property
+    def pending(self: ParsePool) -> int:
+        """The number of messages submitted but not parsed yet
+
+        :return: Count of messages waiting in the worker queues
+        :rtype: int
+        """
+        return sum(map(lambda x: x.qsize(), self.shards))
+
+    def submit(self: ParsePool, message: Message) -> None:
+        """Queue a message to be parsed by the worker of its node
+
+        :param message: The message to parse
+        :type message: Message
+        """
+        node_id = message.node_id
+        if(node_id is None or (self.__shares_state is not None
+                               and self.__shares_state(message.arb_id))):
+            shard = 0
+        else:
+            shard = node_id % len(self.shards)
+        self.shards[shard].put(message)
+
+    def handler(self: ParsePool, shard: queue.SimpleQueue) -> None:
+        """Parse the messages of a shard until a None is received
+
+        :param shard: The queue of messages of the worker
+        :type shard: queue.SimpleQueue
+        """
+        while(True):
+            message = shard.get(block=True)
+            if(message is None):
+                return
+            with self.__parse_lock:
+                message.node_name = self.parser.get_name(message)
+                message.message, message.error = self.parser.parse(message)
+            with self.__completed_lock:
+                if(len(self.completed) == self.completed.maxlen):
+                    self.dropped += 1
+                self.completed.append(message)
+
+    def results(self: ParsePool, budget: float = PARSE_BUDGET) -> iter:
+        """Get the parsed messages, in the order they were parsed, until the
+        time budget runs out. Messages left over are kept for the next call.
+
+        :param budget: The time to spend on the messages, in seconds
+        :type budget: float
+
+        :return: The parsed messages
+        :rtype: iter
+        """
+        deadline = time.perf_counter() + budget
+        while(time.perf_counter() < deadline):
+            try:
+                yield self.completed.popleft()
+            except IndexError:
+                return
+
+    def poll(self: ParsePool) -> [(int, str)]:
+        """Poll the parser for errors found since the messages were parsed,
+        see `CANOpenParser.poll`
+        """
+        poll = getattr(self.parser, 'poll', None)
+        if(poll is None):
+            return []
+        return poll()
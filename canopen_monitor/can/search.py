@@ -0,0 +1,115 @@
+from __future__ import annotations
+import re
+from .message_table import MessageTable, TableChanges
+
+_TOKEN = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> set:
+    """Split text into the set of lower-cased words used by the search index
+
+    :param text: The text to split
+    :type text: str
+
+    :return: The words in the text
+    :rtype: set
+    """
+    return set(_TOKEN.findall(str(text).lower()))
+
+
+class SearchIndex:
+    """An inverted index from the words in the parsed message and error of each
+    row of a `MessageTable` to the COB IDs of the rows containing them
+
+    The index follows the change feed of the table. Changed rows are only
+    marked as stale when the changes are published and are re-indexed the
+    next time a search is made, so the ingest path never has to render or
+    tokenize text, and a search only touches the rows that changed since the
+    previous one plus the index entries of the words searched for.
+
+    :param table: The table to index
+    :type table: MessageTable
+
+    :param fields: The names of the row attributes to index
+    :type fields: [str]
+    """
+
+    def __init__(self: SearchIndex,
+                 table: MessageTable,
+                 fields: [str] = ['message', 'error']):
+        self.table = table
+        self.fields = fields
+        self.__index = {}
+        self.__row_tokens = {}
+        self.__stale = set(table.table)
+        table.subscribe(self.__on_changes)
+
+    def __on_changes(self: SearchIndex, changes: TableChanges) -> None:
+        """Mark the rows changed in the table as needing to be re-indexed
+
+        :param changes: The changes published by the message table
+        :type changes: TableChanges
+        """
+        if(changes.cleared):
+            self.__index = {}
+            self.__row_tokens = {}
+            self.__stale = set()
+
+        for arb_id in changes.removed:
+            self.__remove(arb_id)
+            self.__stale.discard(arb_id)
+
+        self.__stale |= changes.inserted
+        self.__stale |= changes.updated
+
+    def __remove(self: SearchIndex, arb_id: int) -> None:
+        """Remove every index entry of a row
+
+        :param arb_id: The COB ID of the row
+        :type arb_id: int
+        """
+        for token in self.__row_tokens.pop(arb_id, []):
+            rows = self.__index[token]
+            rows.discard(arb_id)
+            if(len(rows) == 0):
+                del self.__index[token]
+
+    def __refresh(self: SearchIndex) -> None:
+        """Re-index the rows that changed since the last search
+        """
+        for arb_id in self.__stale:
+            message = self.table.table.get(arb_id)
+            if(message is None):
+                continue
+
+            tokens = set()
+            for field in self.fields:
+                tokens |= tokenize(getattr(message, field, ''))
+
+            old_tokens = self.__row_tokens.get(arb_id, set())
+            for token in old_tokens - tokens:
+                rows = self.__index[token]
+                rows.discard(arb_id)
+                if(len(rows) == 0):
+                    del self.__index[token]
+            for token in tokens - old_tokens:
+                self.__index.setdefault(token, set()).add(arb_id)
+            self.__row_tokens[arb_id] = tokens
+        self.__stale = set()
+
+    def search(self: SearchIndex, query: str) -> [int]:
+        """Find the rows containing every word of the query
+
+        :param query: The words to search for, case insensitive
+        :type query: str
+
+        :return: The sorted COB IDs of the matching rows
+        :rtype: [int]
+        """
+        self.__refresh()
+        matches = sorted(map(lambda x: self.__index.get(x, set()),
+                             tokenize(query)),
+                         key=len)
+        if(len(matches) == 0):
+            return []
+        return sorted(matches[0].intersection(*matches[1:]))
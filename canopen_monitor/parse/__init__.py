@@ -4,11 +4,17 @@ Data Sheet files, provided by the end user.
 """
 from .eds import EDS, load_eds_file, load_eds_files, DataType
 from .canopen import CANOpenParser
+from .plugins import PluginRegistry
+from .cache import ODCache
+from .lazy import LazyODs
 
 __all__ = [
     'CANOpenParser',
     'EDS',
+    'LazyODs',
     'load_eds_file',
+    'ODCache',
+    'PluginRegistry',
     'DataType',
     'load_eds_files'
 ]
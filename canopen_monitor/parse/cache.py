@@ -0,0 +1,183 @@
+"""A cache of parsed OD files, so the ODs do not have to be parsed again on
+every launch.
+
+Every OD file is cached with the ODs parsed from it, including those of its
+extended PDO definitions, with their name maps and PDO decode plans. A file
+is parsed again when its size and modification time changed and its content
+hash no longer matches, or when it was loaded with different plugins or by a
+different version of the app.
+"""
+from __future__ import annotations
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from .. import APP_VERSION
+from .pdo import compile_plans
+
+# Name of the cache file in the cache directory
+CACHE_FILE = 'od-cache.pickle'
+
+# Version of the layout of the cache, bump it when the layout or any cached
+#   class changes
+CACHE_FORMAT = 2
+
+
+def file_digest(filepath: str) -> str:
+    """
+    Get the SHA-256 hash of the content of a file
+    """
+    with open(filepath, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+class ODCache:
+    """
+    The ODs parsed from every OD file, keyed by the path of the file
+
+    The whole cache is read once when it is created, and written by `save()`
+    if anything changed. The ODs of each file are kept pickled on their own,
+    and only unpickled when they are looked up, so looking up the node IDs
+    of every file is cheap. A missing, unreadable or outdated cache is
+    treated as empty.
+
+    :param path: The path of the cache file
+    :type path: str
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = {}
+        self.changed = False
+        self.load()
+
+    def load(self) -> None:
+        """
+        Read the cache file, replacing any entries in memory
+        """
+        try:
+            with open(self.path, 'rb') as file:
+                version, entries = pickle.load(file)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logging.warning(f'Ignoring unreadable OD cache {self.path}: {e}')
+            return
+
+        if version == (CACHE_FORMAT, APP_VERSION):
+            self.entries = entries
+            self.changed = False
+
+    def get(self,
+            filepath: str,
+            stat: os.stat_result,
+            signature: tuple = ()) -> dict:
+        """
+        Get the ODs parsed from a file, if they are cached and up to date
+
+        :param filepath: The path of the OD file
+        :param stat: The status of the OD file
+        :param signature: The signature of the plugins the file is loaded
+            with, see `PluginRegistry.signature`
+        :return: The ODs keyed by node ID, or None if they need to be parsed
+        """
+        entry = self.__lookup(filepath, stat, signature)
+        return pickle.loads(entry[5]) if entry is not None else None
+
+    def node_ids(self,
+                 filepath: str,
+                 stat: os.stat_result,
+                 signature: tuple = ()) -> [int]:
+        """
+        Get the node IDs of the ODs parsed from a file, if they are cached and
+        up to date, without unpickling the ODs
+
+        :return: The node IDs, or None if the file needs to be parsed
+        """
+        entry = self.__lookup(filepath, stat, signature)
+        return entry[4] if entry is not None else None
+
+    def __lookup(self,
+                 filepath: str,
+                 stat: os.stat_result,
+                 signature: tuple) -> tuple:
+        entry = self.entries.get(filepath)
+        if entry is None:
+            return None
+
+        size, mtime, digest, cached_signature, node_ids, blob = entry
+        if cached_signature != signature or size != stat.st_size:
+            return None
+        if mtime != stat.st_mtime_ns:
+            # Only read the whole file when it may have changed
+            if file_digest(filepath) != digest:
+                return None
+            entry = (size, stat.st_mtime_ns, digest, signature, node_ids,
+                     blob)
+            self.entries[filepath] = entry
+            self.changed = True
+        return entry
+
+    def put(self,
+            filepath: str,
+            stat: os.stat_result,
+            configs: dict,
+            signature: tuple = ()) -> None:
+        """
+        Cache the ODs parsed from a file, compiling their PDO decode plans
+        first so they are cached too
+
+        :param filepath: The path of the OD file
+        :param stat: The status of the OD file, from before it was parsed
+        :param configs: The ODs keyed by node ID
+        :param signature: The signature of the plugins the file was loaded
+            with, see `PluginRegistry.signature`
+        """
+        for node_id, od in configs.items():
+            if isinstance(node_id, int):
+                compile_plans(od, node_id)
+        self.entries[filepath] = (stat.st_size, stat.st_mtime_ns,
+                                  file_digest(filepath), signature,
+                                  list(configs),
+                                  pickle.dumps(configs,
+                                               pickle.HIGHEST_PROTOCOL))
+        self.changed = True
+
+    def prune(self, directory: str, filepaths: [str]) -> None:
+        """
+        Drop the entries of the files of a directory not in a list, such as
+        deleted files
+        """
+        directory = os.path.normpath(directory)
+        filepaths = set(filepaths)
+        for filepath in list(self.entries):
+            if os.path.dirname(os.path.normpath(filepath)) == directory \
+                    and filepath not in filepaths:
+                del self.entries[filepath]
+                self.changed = True
+
+    def save(self) -> None:
+        """
+        Write the cache file if anything changed, replacing it atomically so
+        an interrupted write never leaves a broken cache
+        """
+        if not self.changed:
+            return
+
+        directory = os.path.dirname(self.path) or '.'
+        try:
+            with tempfile.NamedTemporaryFile('wb',
+                                             dir=directory,
+                                             delete=False) as file:
+                pickle.dump(((CACHE_FORMAT, APP_VERSION), self.entries),
+                            file,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(file.name, self.path)
+            self.changed = False
+        except (OSError, pickle.PicklingError) as e:
+            logging.warning(f'Failed to save OD cache {self.path}: {e}')
+            try:
+                os.unlink(file.name)
+            except (NameError, OSError):
+                ...
@@ -1,21 +1,155 @@
+import datetime as dt
+import threading as t
+from collections import Counter, OrderedDict, deque
 from typing import Union
 from ..can import Message, MessageType
 from . import hb as HBParser, \
     pdo as PDOParser, \
     sync as SYNCParser, \
     emcy as EMCYParser, \
+    nmt as NMTParser, \
     time as TIMEParser
+from .result import INVALID_MESSAGE, ParseError, ParseResult, RawData
+from .plugins import PluginRegistry
 from .sdo import SDOParser
-from .utilities import FailedValidationError, format_bytes
+from .utilities import FailedValidationError
+
+# Seconds without a message before an SDO transfer is abandoned
+SDO_IDLE_TIMEOUT = 10.0
+
+# Number of completed SDO transfers kept for their payloads
+SDO_COMPLETED_HISTORY = 16
+
+# Number of standard (11-bit) COB IDs
+STANDARD_COB_IDS = 0x800
+
+
+def message_time(message: Message) -> float:
+    """
+    Get when a message arrived on the bus, in seconds
+
+    :return: The timestamp, or None if the message has none
+    """
+    timestamp = getattr(message, 'timestamp', None)
+    if isinstance(timestamp, dt.datetime):
+        return timestamp.timestamp()
+    if isinstance(timestamp, (int, float)):
+        return timestamp
+    return None
 
 
 class CANOpenParser:
     """
     A convenience wrapper for the parse function
+
+    SDO transfers are tracked by a separate `SDOParser` for each SDO channel,
+    keyed by the pair of COB IDs (client to server, server to client), so
+    transfers with several nodes at once do not interfere. Channels idle for
+    longer than `sdo_timeout` seconds are dropped. The most recently completed
+    transfers are kept in `sdo_completed`, to retrieve or save their payloads.
+
+    EMCY messages are also recorded in `emcy_tracker`, which keeps the errors
+    still active on each node, and heartbeats in `hb_supervisor`, which
+    notices nodes that miss their heartbeat or keep rebooting. NMT commands
+    and heartbeats are reconciled by `nmt_state`, to notice nodes that did
+    not follow a command. Synchronous TPDOs are grouped into the cycle of the
+    SYNC they follow by `sync_cycles`, which notices PDOs arriving late or
+    missing a cycle. Those are reported by `poll()`. Cycles are timed with
+    the timestamps of the messages, so parsing them later, on a worker
+    thread or from a capture, does not change their timing.
+
+    Messages are dispatched with a table, built once, mapping every standard
+    COB ID to its parse function and node ID. Extended COB IDs are looked up
+    in a dictionary instead. Parsers for other COB IDs, such as manufacturer
+    specific ones, can be added to the table with `register_parser()`, or by
+    the `plugins` given when the parser is created.
+
+    The ODs may be loaded lazily, see `LazyODs`, the ODs loaded since the
+    parser was created are taken in by `poll()`.
+
+    Messages of different nodes may be parsed on several threads at once, as
+    by a `ParsePool`, as long as the messages of each node, and the messages
+    for which `shares_state()` is true, are each parsed in order. Only the
+    state shared between nodes, the trackers and the SDO channels, is
+    guarded by `lock`, decoding runs outside of it. Anything else reading
+    that state, such as drawing the EMCY tracker, must hold the lock too.
+    The error counts are guarded by a lock of their own, so counting errors
+    never waits for a reader holding `lock`.
+
+    The built in parsers return a `ParseError` for messages that fail
+    validation rather than raising a `FailedValidationError`, which is only
+    caught for the SDO and registered parsers. Failed messages are counted by
+    node and reason in `error_counts`.
     """
-    def __init__(self, eds_configs: dict):
-        self.sdo_parser = SDOParser()
+    def __init__(self, eds_configs: dict,
+                 sdo_timeout: float = SDO_IDLE_TIMEOUT,
+                 plugins: PluginRegistry = None):
+        self.sdo_parsers = OrderedDict()
+        self.sdo_timeout = sdo_timeout
+        self.sdo_completed = deque(maxlen=SDO_COMPLETED_HISTORY)
         self.eds_configs = eds_configs
+        self.emcy_tracker = EMCYParser.EMCYTracker()
+        self.hb_supervisor = HBParser.HeartbeatSupervisor(eds_configs)
+        self.nmt_state = NMTParser.NetworkState(self.hb_supervisor.timeouts)
+        self.sync_cycles = SYNCParser.SyncCycleAssembler(
+            SYNCParser.synchronous_pdos(eds_configs),
+            SYNCParser.synchronous_window(eds_configs))
+        self.error_counts = Counter()
+        self.lock = t.RLock()
+        self.__counts_lock = t.Lock()
+        self.__dispatch = [(None, None)] * STANDARD_COB_IDS
+        self.__extended_dispatch = {}
+
+        # Parse functions called with the timestamp of the message too
+        self.__timed = {self.__parse_sync, self.__parse_sync_pdo}
+
+        # Parse functions updating state shared between nodes
+        self.__shared = {self.__parse_sync, self.__parse_sync_pdo,
+                         self.__parse_nmt, self.__parse_hb}
+
+        parse_functions = {
+            MessageType.NMT: self.__parse_nmt,
+            MessageType.SYNC: self.__parse_sync,
+            MessageType.EMER: self.__parse_emcy,
+            MessageType.PDO: PDOParser.try_parse,
+            MessageType.SDO: self.__parse_sdo,
+            MessageType.HEARTBEAT: self.__parse_hb,
+            MessageType.TIME: TIMEParser.try_parse,
+        }
+        for cob_id in range(STANDARD_COB_IDS):
+            msg_type = MessageType.cob_id_to_type(cob_id)
+            parse_function = parse_functions.get(msg_type) \
+                or parse_functions.get(msg_type.supertype)
+            if parse_function is not None:
+                self.__dispatch[cob_id] = \
+                    (parse_function,
+                     MessageType.cob_to_node(msg_type, cob_id))
+        for cob_id in self.sync_cycles.pdos:
+            if cob_id < STANDARD_COB_IDS:
+                self.__dispatch[cob_id] = (self.__parse_sync_pdo,
+                                           self.__dispatch[cob_id][1])
+
+        if plugins is not None:
+            plugins.install(self)
+
+        # Compile the PDO decode plans up front rather than on the first PDO
+        for node_id, eds_config in eds_configs.items():
+            if node_id is not None:
+                PDOParser.compile_plans(eds_config, node_id)
+
+    def shares_state(self, arb_id: int) -> bool:
+        """
+        Whether the messages sent with a COB ID update state shared between
+        nodes, such as SYNCs and the synchronous PDOs grouped into their
+        cycles, or NMT commands and the heartbeats reconciled with them, so
+        they must be parsed in order with each other
+        """
+        if arb_id < STANDARD_COB_IDS:
+            parse_function = self.__dispatch[arb_id][0]
+        else:
+            parse_function = self.__extended_dispatch.get(arb_id,
+                                                          (None, None))[0]
+        return parse_function in self.__shared
 
     def get_name(self, message: Message) -> Union[str, None]:
         # import ipdb; ipdb.set_trace()
@@ -23,6 +157,232 @@ class CANOpenParser:
         return parser.device_commissioning.node_name \
             if parser else hex(message.node_id)
 
+    def register_parser(self,
+                        parse_function: callable,
+                        start: int,
+                        end: int = None,
+                        base: int = None) -> None:
+        """
+        Register the parse function of a range of COB IDs, replacing any
+        parse function already registered for them
+
+        :param parse_function: A function of the COB ID, the data and the OD
+            of the node, returning the parsed message or a `ParseError`, or
+            raising a `FailedValidationError`, or None to stop parsing the
+            COB IDs
+        :param start: The first COB ID of the range
+        :param end: The last COB ID of the range, defaults to `start`
+        :param base: The COB ID of node 0 in the range, the node ID of each
+            message is its COB ID minus the base, defaults to `start`
+        """
+        end = start if end is None else end
+        base = start if base is None else base
+        for cob_id in range(start, end + 1):
+            entry = (parse_function, cob_id - base) \
+                if parse_function is not None else (None, None)
+            if cob_id < STANDARD_COB_IDS:
+                self.__dispatch[cob_id] = entry
+            elif parse_function is not None:
+                self.__extended_dispatch[cob_id] = entry
+            else:
+                self.__extended_dispatch.pop(cob_id, None)
+
+    def get_sdo_parser(self, node_id: int) -> SDOParser:
+        """
+        Get the parser of the SDO channel of a node, starting a new one if
+        there is no transfer in progress on the channel
+        """
+        key = (MessageType.SDO_RX.start + node_id,
+               MessageType.SDO_TX.start + node_id)
+
+        with self.lock:
+            # Channels are ordered from the least to the most recently active
+            while self.sdo_parsers:
+                oldest = next(iter(self.sdo_parsers.values()))
+                if oldest.idle_time < self.sdo_timeout:
+                    break
+                self.sdo_parsers.popitem(last=False)
+
+            sdo_parser = self.sdo_parsers.get(key)
+            if sdo_parser is None or sdo_parser.is_complete:
+                sdo_parser = SDOParser()
+                self.sdo_parsers[key] = sdo_parser
+            else:
+                self.sdo_parsers.move_to_end(key)
+            return sdo_parser
+
+    def __parse_sdo(self, cob_id: int, data: bytes, eds_config) -> str:
+        """
+        Parse an SDO with the parser of its channel
+        """
+        node_id = MessageType.cob_to_node(MessageType.cob_id_to_type(cob_id),
+                                          cob_id)
+        sdo_parser = self.get_sdo_parser(node_id)
+        try:
+            return sdo_parser.parse(cob_id, data, eds_config)
+        finally:
+            if sdo_parser.is_complete:
+                self.sdo_completed.append(sdo_parser)
+
+    def __parse_sync(self,
+                     cob_id: int,
+                     data: bytes,
+                     eds_config,
+                     timestamp: float = None) -> ParseResult:
+        """
+        Parse a SYNC received at a time and start the next SYNC cycle
+        """
+        sync = SYNCParser.try_parse(cob_id, data, eds_config)
+        if type(sync) is ParseError:
+            return sync
+        with self.lock:
+            self.sync_cycles.sync(data[0] if len(data) > 0 else None,
+                                  timestamp)
+        return sync
+
+    def __parse_sync_pdo(self,
+                         cob_id: int,
+                         data: bytes,
+                         eds_config,
+                         timestamp: float = None):
+        """
+        Parse a synchronous PDO received at a time and add it to the current
+        SYNC cycle, PDOs failing validation still arrived in the cycle
+        """
+        pdo = PDOParser.try_parse(cob_id, data, eds_config)
+        with self.lock:
+            self.sync_cycles.pdo(cob_id, pdo, timestamp)
+        return pdo
+
+    def __parse_emcy(self,
+                     cob_id: int,
+                     data: bytes,
+                     eds_config) -> ParseResult:
+        """
+        Parse an EMCY message and record it in the EMCY tracker
+        """
+        emcy = EMCYParser.try_parse_emcy(cob_id, data)
+        if type(emcy) is ParseError:
+            return emcy
+        node_id = MessageType.cob_to_node(MessageType.EMER, cob_id)
+        with self.lock:
+            self.emcy_tracker.update(node_id, emcy)
+        return emcy
+
+    def __parse_hb(self,
+                   cob_id: int,
+                   data: bytes,
+                   eds_config) -> ParseResult:
+        """
+        Parse a heartbeat and restart the heartbeat timeout of its node
+        """
+        state = HBParser.try_parse(cob_id, data, eds_config)
+        if type(state) is ParseError:
+            return state
+        node_id = MessageType.cob_to_node(MessageType.HEARTBEAT, cob_id)
+        with self.lock:
+            self.hb_supervisor.heartbeat(node_id,
+                                         data[HBParser.STATE_BYTE_IDX])
+            self.nmt_state.heartbeat(node_id, data[HBParser.STATE_BYTE_IDX])
+        return state
+
+    def __parse_nmt(self,
+                    cob_id: int,
+                    data: bytes,
+                    eds_config) -> ParseResult:
+        """
+        Parse an NMT command and update the states expected of the nodes
+        """
+        command = NMTParser.try_parse(cob_id, data, eds_config)
+        if type(command) is ParseError:
+            return command
+        with self.lock:
+            self.nmt_state.command(data[0], data[1])
+        return command
+
+    def poll(self) -> [(int, str)]:
+        """
+        Check for problems found after their messages were parsed, such as a
+        node missing its heartbeat, rebooting over and over or not following
+        an NMT command, or a synchronous PDO arriving late or missing a SYNC
+        cycle
+
+        :return: The COB IDs of the messages to flag and the errors to flag
+            them with
+        """
+        with self.lock:
+            flags = [(MessageType.HEARTBEAT.start + event.node_id,
+                      event.message)
+                     for event in self.hb_supervisor.poll()
+                     if event.kind != HBParser.BOOT_UP_EVENT]
+            flags += [(MessageType.HEARTBEAT.start + node_id,
+                       self.nmt_state.error(node_id))
+                      for node_id in self.nmt_state.poll()]
+            flags += self.sync_cycles.poll()
+
+            # ODs loaded lazily, see `LazyODs`, are only known once loaded
+            loaded = getattr(self.eds_configs, 'poll', None)
+            if loaded is not None:
+                node_ids = loaded()
+                if node_ids:
+                    self.__add_nodes(node_ids)
+        return flags
+
+    def __add_nodes(self, node_ids: [int]) -> None:
+        """
+        Take in the ODs of nodes loaded after the parser was created, the
+        heartbeat timeouts and synchronous PDOs are found again from every
+        OD since the ODs of other nodes may set them too
+        """
+        for node_id in node_ids:
+            eds_config = self.eds_configs.get(node_id)
+            if node_id is not None and eds_config is not None:
+                PDOParser.compile_plans(eds_config, node_id)
+
+        # Updated in place, the timeouts are shared with `nmt_state`
+        timeouts = self.hb_supervisor.timeouts
+        timeouts.clear()
+        timeouts.update(HBParser.heartbeat_timeouts(self.eds_configs))
+
+        pdos = SYNCParser.synchronous_pdos(self.eds_configs)
+        self.sync_cycles.pdos.update(pdos)
+        self.sync_cycles.window = \
+            SYNCParser.synchronous_window(self.eds_configs)
+        for cob_id in pdos:
+            if cob_id < STANDARD_COB_IDS \
+                    and self.__dispatch[cob_id][0] is PDOParser.try_parse:
+                self.__dispatch[cob_id] = (self.__parse_sync_pdo,
+                                           self.__dispatch[cob_id][1])
+
+    def error_count(self, node_id: int = None, reason: str = None) -> int:
+        """
+        Count the messages that failed validation
+
+        :param node_id: Only count the messages of this node
+        :param reason: Only count the messages that failed for this reason,
+            such as `result.INVALID_LENGTH`
+        :return: The number of messages
+        """
+        with self.__counts_lock:
+            counts = list(self.error_counts.items())
+        return sum(count for (node, why), count in counts
+                   if (node_id is None or node == node_id)
+                   and (reason is None or why == reason))
+
+    def __count_error(self, node_id: int, reason: str) -> None:
+        with self.__counts_lock:
+            self.error_counts[(node_id, reason)] += 1
+
+    @property
+    def sdo_transfers(self) -> dict:
+        """
+        The SDO transfers in progress, keyed by the pair of COB IDs of their
+        channel
+        """
+        return {key: sdo_parser
+                for key, sdo_parser in self.sdo_parsers.items()
+                if not sdo_parser.is_complete}
+
     def parse(self, message: Message) -> (str, str):
         """
         Detect the type of the given message and return the parsed version
@@ -36,37 +396,111 @@ class CANOpenParser:
         `str`: The parsed message
 
         """
-        node_id = message.node_id
-        eds_config = self.eds_configs.get(node_id) \
-            if node_id is not None else None
-
-        # Detect message type and select the appropriate parse function
-        if (message.type == MessageType.SYNC):
-            parse_function = SYNCParser.parse
-        elif (message.type == MessageType.EMER):
-            parse_function = EMCYParser.parse
-        elif (message.supertype == MessageType.PDO):
-            parse_function = PDOParser.parse
-        elif (message.supertype == MessageType.SDO):
-            if self.sdo_parser.is_complete:
-                self.sdo_parser = SDOParser()
-            parse_function = self.sdo_parser.parse
-        elif (message.type == MessageType.HEARTBEAT):
-            parse_function = HBParser.parse
-        elif (message.type == MessageType.TIME):
-            parse_function = TIMEParser.parse
+        arb_id = message.arb_id
+        if arb_id < STANDARD_COB_IDS:
+            parse_function, node_id = self.__dispatch[arb_id]
         else:
-            parse_function = None
+            parse_function, node_id = \
+                self.__extended_dispatch.get(arb_id, (None, None))
+
+        # Messages without a parser are shown as raw data
+        if parse_function is None:
+            return RawData(message.data), ""
 
-        # Call the parse function and save the result
-        # On error, return the message data
         try:
-            parsed_message = parse_function(message.arb_id,
-                                            message.data,
-                                            eds_config)
-            error = ""
+            if parse_function in self.__timed:
+                parsed_message = parse_function(arb_id,
+                                                message.data,
+                                                self.eds_configs.get(node_id),
+                                                message_time(message))
+            else:
+                parsed_message = parse_function(arb_id,
+                                                message.data,
+                                                self.eds_configs.get(node_id))
         except (FailedValidationError, TypeError) as exception:
-            parsed_message = format_bytes(message.data)
-            error = str(exception)
+            parsed_message = self.__error(exception, arb_id)
+
+        # On error, return the message data
+        if type(parsed_message) is ParseError:
+            self.__count_error(node_id, parsed_message.reason)
+            return RawData(message.data), parsed_message
+        return parsed_message, ""
+
+    def __error(self, exception: Exception, arb_id: int) -> ParseError:
+        """
+        Get the error record of an exception raised by a parse function
+        """
+        if isinstance(exception, FailedValidationError):
+            return ParseError.from_exception(exception)
+        return ParseError(INVALID_MESSAGE, None, arb_id, None, str(exception))
+
+    def parse_many(self, frames: iter) -> [(str, str)]:
+        """
+        Parse many messages at once, such as a capture being replayed
+
+        The dispatch target and OD of each COB ID, and the decode plan of each
+        PDO, are looked up once for all the frames sharing the COB ID rather
+        than for every frame. Frames are still parsed in input order, so
+        stateful parsers such as SDO see them in the order they were sent.
+
+        :param frames: Messages, or pairs of a COB ID and data
+        :return: The parsed message and error of every frame, in input order
+        """
+        contexts = {}
+        results = []
+        for frame in frames:
+            if isinstance(frame, tuple):
+                arb_id, data = frame
+                timestamp = None
+            else:
+                arb_id, data = frame.arb_id, frame.data
+                timestamp = message_time(frame)
+
+            context = contexts.get(arb_id)
+            if context is None:
+                context = self.__bind(arb_id)
+                contexts[arb_id] = context
+            parse_function, node_id, timed = context
+
+            try:
+                if timed:
+                    parsed_message = parse_function(data, timestamp)
+                else:
+                    parsed_message = parse_function(data)
+            except (FailedValidationError, TypeError) as exception:
+                parsed_message = self.__error(exception, arb_id)
+
+            if type(parsed_message) is ParseError:
+                self.__count_error(node_id, parsed_message.reason)
+                results.append((RawData(data), parsed_message))
+            else:
+                results.append((parsed_message, ""))
+        return results
+
+    def __bind(self, arb_id: int) -> (callable, int, bool):
+        """
+        Get a function parsing the data of messages sent with a COB ID, the
+        node ID of the messages, and whether the function also takes the
+        timestamp of the messages
+        """
+        if arb_id < STANDARD_COB_IDS:
+            parse_function, node_id = self.__dispatch[arb_id]
+        else:
+            parse_function, node_id = \
+                self.__extended_dispatch.get(arb_id, (None, None))
 
-        return parsed_message, error
+        if parse_function is None:
+            return RawData, node_id, False
+        eds_config = self.eds_configs.get(node_id)
+        if parse_function in self.__timed:
+            return (lambda data, timestamp: parse_function(arb_id,
+                                                           data,
+                                                           eds_config,
+                                                           timestamp),
+                    node_id,
+                    True)
+        if parse_function is PDOParser.try_parse and eds_config is not None:
+            return PDOParser.bind(arb_id, eds_config), node_id, False
+        return (lambda data: parse_function(arb_id, data, eds_config),
+                node_id,
+                False)
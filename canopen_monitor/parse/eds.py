@@ -1,43 +1,48 @@
 from __future__ import annotations
 import copy
 import string
+from functools import lru_cache
 from re import finditer
-from typing import Union
+from typing import TYPE_CHECKING, Union
 from dateutil.parser import parse as dtparse
 import os
 from enum import Enum
 
+if TYPE_CHECKING:
+    from .cache import ODCache
+    from .plugins import PluginRegistry
+
 
 class DataType(Enum):
-    BOOLEAN = '0x0001'
-    INTEGER8 = '0x0002'
-    INTEGER16 = '0x0003'
-    INTEGER32 = '0x0004'
-    UNSIGNED8 = '0x0005'
-    UNSIGNED16 = '0x0006'
-    UNSIGNED32 = '0x0007'
-    REAL32 = '0x0008'
-    VISIBLE_STRING = '0x0009'
-    OCTET_STRING = '0x000A'
-    UNICODE_STRING = '0x000B'
-    TIME_OF_DAY = '0x000C'
-    TIME_DIFFERENCE = '0x000D'
-    DOMAIN = '0x000F'
-    INTEGER24 = '0x0010'
-    REAL64 = '0x0011'
-    INTEGER40 = '0x0012'
-    INTEGER48 = '0x0013'
-    INTEGER56 = '0x0014'
-    INTEGER64 = '0x0015'
-    UNSIGNED24 = '0x0016'
-    UNSIGNED40 = '0x0018'
-    UNSIGNED48 = '0x0019'
-    UNSIGNED56 = '0x001A'
-    UNSIGNED64 = '0x001B'
-    PDO_COMMUNICATION_PARAMETER = '0x0020'
-    PDO_MAPPING = '0x0021'
-    SDO_PARAMETER = '0x0022'
-    IDENTITY = '0x0023'
+    BOOLEAN = 0x0001
+    INTEGER8 = 0x0002
+    INTEGER16 = 0x0003
+    INTEGER32 = 0x0004
+    UNSIGNED8 = 0x0005
+    UNSIGNED16 = 0x0006
+    UNSIGNED32 = 0x0007
+    REAL32 = 0x0008
+    VISIBLE_STRING = 0x0009
+    OCTET_STRING = 0x000A
+    UNICODE_STRING = 0x000B
+    TIME_OF_DAY = 0x000C
+    TIME_DIFFERENCE = 0x000D
+    DOMAIN = 0x000F
+    INTEGER24 = 0x0010
+    REAL64 = 0x0011
+    INTEGER40 = 0x0012
+    INTEGER48 = 0x0013
+    INTEGER56 = 0x0014
+    INTEGER64 = 0x0015
+    UNSIGNED24 = 0x0016
+    UNSIGNED40 = 0x0018
+    UNSIGNED48 = 0x0019
+    UNSIGNED56 = 0x001A
+    UNSIGNED64 = 0x001B
+    PDO_COMMUNICATION_PARAMETER = 0x0020
+    PDO_MAPPING = 0x0021
+    SDO_PARAMETER = 0x0022
+    IDENTITY = 0x0023
 
     # Used by ECSS Time feature only
     ECSS_TIME = 'ECSS_TIME'
@@ -55,12 +60,20 @@ class DataType(Enum):
                      SDO_PARAMETER, IDENTITY)
 
 
+# Characters of decimal and hexadecimal numbers
+DECIMAL_DIGITS = frozenset(string.digits)
+HEX_DIGITS = frozenset(string.hexdigits)
+
+
+@lru_cache(maxsize=None)
 def camel_to_snake(old_str: str) -> str:
     """
     Converts camel cased string to snake case, counting groups of repeated
     capital letters (such as "PDO") as one unit That is, string like
     "PDO_group" become "pdo_group" instead of "p_d_o_group"
 
+    OD files only use a few dozen distinct keys, so conversions are cached
+
     :param old_str: The string to convert to camel_case
     :type old_str: str
 
@@ -105,28 +118,69 @@ def camel_to_snake(old_str: str) -> str:
     return new_str
 
 
+def tokenize(lines: [str]) -> iter:
+    """
+    Split the lines of an OD file into its sections in a single pass, leaving
+    out blank lines and comments
+
+    :param lines: The lines of the file
+    :type lines: [str]
+
+    :return: The name of every section, such as "1018sub1" or "DeviceInfo",
+        and its fields as a list of `(key, value)` pairs
+    :rtype: iter
+    """
+    name = None
+    fields = []
+    for line in lines:
+        line = line.strip()
+        if not line or line[0] == ';':
+            continue
+        if line[0] == '[':
+            if name is not None:
+                yield name, fields
+            name = line[1:-1]
+            fields = []
+        elif name is not None:
+            key, _, value = line.partition('=')
+            fields.append((key, value))
+    if name is not None:
+        yield name, fields
+
+
 class Metadata:
-    def __init__(self, data):
-        # Process all sub-data
-        for e in data:
-            # Skip comment lines
-            if (e[0] == ';'):
-                continue
+    """
+    A section of an OD file that is not an object, such as "DeviceInfo"
 
-            # Separate field name from field value
-            key, value = e.split('=')
+    Dates and times are only parsed the first time they are read, since
+    parsing them is slow and most are never read.
+    """
 
+    def __init__(self, data: [(str, str)]):
+        self.__dates = {}
+        for key, value in data:
             # Create the proper field name
             key = camel_to_snake(key)
 
-            # Turn date-time-like objects into datetimes
-            if ('date' in key):
-                value = dtparse(value).date()
-            elif ('time' in key):
-                value = dtparse(value).time()
-
-            # Set the attribute
-            self.__setattr__(key, value)
+            if ('date' in key or 'time' in key):
+                self.__dates[key] = value
+            else:
+                self.__setattr__(key, value)
+
+    def __getattr__(self, key: str) -> any:
+        # Only called for attributes not set yet, such as unparsed dates
+        dates = self.__dict__.get('_Metadata__dates', {})
+        if key not in dates:
+            raise AttributeError(key)
+
+        # Turn date-time-like objects into datetimes
+        value = dates.pop(key)
+        if ('date' in key):
+            value = dtparse(value).date()
+        else:
+            value = dtparse(value).time()
+        self.__setattr__(key, value)
+        return value
 
 
 class Index:
@@ -135,7 +189,10 @@ class Index:
     Note: Not all possible properties are stored
     """
 
-    def __init__(self, data, index: Union[str, int], is_sub=False):
+    def __init__(self,
+                 data: [(str, str)],
+                 index: Union[str, int],
+                 is_sub=False):
         # Determine if this is a parent index or a child index
         if not is_sub:
             self.sub_indices = {}
@@ -147,15 +204,10 @@ class Index:
         self.is_sub = is_sub
 
         # Process all sub-data
-        for e in data:
-            # Skip commented lines
-            if (e[0] == ';'):
-                continue
-
-            # Separate field name from field value
-            key, value = e.split('=')
-
+        for key, value in data:
             value = convert_value(value)
+            if (key == 'DataType'):
+                value = convert_data_type(value)
 
             self.__setattr__(camel_to_snake(key), value)
 
@@ -194,16 +246,36 @@ class Index:
 def convert_value(value: str) -> Union[int, str]:
     # Turn number-like objects into numbers
     if (value != ''):
-        if value.startswith("0x") and all(c in string.hexdigits for c in value):
-            return int(value[2:], 16)
-        if (all(c in string.digits for c in value)):
+        if (DECIMAL_DIGITS.issuperset(value)):
             return int(value, 10)
-        elif (all(c in string.hexdigits for c in value)):
+        elif (HEX_DIGITS.issuperset(value)):
             return int(value, 16)
         else:
             return value
 
 
+def convert_data_type(value: Union[int, str, DataType]) -> Union[int, str]:
+    """
+    Normalize a data type to its integer code, so data types read from any
+    OD compare equal to the values of `DataType` whatever their formatting
+
+    :param value: A data type code, a hex string such as "0x0007", or a
+        `DataType`
+    :type value: int, str or DataType
+    :return: The data type code, or the value unchanged if it is not a code,
+        such as `DataType.ECSS_TIME`
+    :rtype: int or str
+    """
+    if (isinstance(value, DataType)):
+        value = value.value
+    if (isinstance(value, str)):
+        try:
+            return int(value, 16)
+        except ValueError:
+            return value
+    return value
+
+
 class OD:
     def __init__(self):
         self.node_id = None
@@ -219,6 +291,9 @@ class OD:
         self.mandatory_objects = None
         self.optional_objects = None
         self.manufacturer_objects = None
+        # Compiled PDO decode plans keyed by COB ID, see `pdo.compile_plan`
+        self.pdo_plans = {}
+        self.__names = None
 
     def extended_pdo_definition(self, offset: int) -> OD:
         # TODO: Move to constant with message types
@@ -226,6 +301,14 @@ class OD:
         pdo_tx_offset = 0x1A00 + (offset * 4)
         pdo_rx = 0x1600
         pdo_rx_offset = 0x1600 + (offset * 4)
+
+        # Checked before copying anything, most ODs have no extended PDOs
+        if (pdo_tx_offset not in self and pdo_rx_offset not in self) or \
+                (self[pdo_tx_offset].parameter_name != "TPDO mapping parameter"
+                 and self[pdo_rx_offset].parameter_name != "RPDO mapping parameter"):
+
+            raise KeyError("Extended PDO definitions not found")
+
         node = OD()
         node.node_id = copy.deepcopy(self.node_id)
         node.device_commissioning = copy.deepcopy(self.device_commissioning)
@@ -239,12 +322,6 @@ class OD:
         node.manufacturer_objects = copy.deepcopy(self.manufacturer_objects)
         node.indices = copy.deepcopy(self.indices)
 
-        if (pdo_tx_offset not in self and pdo_rx_offset not in self) or \
-                (self[pdo_tx_offset].parameter_name != "TPDO mapping parameter"
-                 and self[pdo_rx_offset].parameter_name != "RPDO mapping parameter"):
-
-            raise KeyError("Extended PDO definitions not found")
-
         self.get_pdo_offset(node, pdo_tx, pdo_tx_offset)
         self.get_pdo_offset(node, pdo_rx, pdo_rx_offset)
 
@@ -258,6 +335,47 @@ class OD:
             if start % 4 == 0:
                 break
 
+    @property
+    def names(self) -> dict:
+        """
+        The data type and full name of every object, keyed by the index and
+        subindex packed in an integer as `index << 8 | subindex`. Objects
+        without subindices are keyed with subindex 0. The map is built on
+        first use and rebuilt after the OD is modified.
+
+        :return: A map of packed index to a `(data_type, name)` tuple
+        :rtype: dict
+        """
+        if self.__names is None:
+            self.__names = self.__build_names()
+        return self.__names
+
+    def invalidate(self) -> None:
+        """
+        Drop everything derived from the objects of the OD, this must be
+        called after modifying an object in place
+        """
+        self.__names = None
+        self.pdo_plans.clear()
+
+    def __build_names(self) -> dict:
+        names = {}
+        for key, index in self.indices.items():
+            try:
+                key = int(key, 16) << 8
+                if len(index) == 0:
+                    names[key] = (index.data_type, index.parameter_name)
+                    continue
+                for subindex, sub in index.sub_indices.items():
+                    names[key | subindex] = (sub.data_type,
+                                             index.parameter_name + ' '
+                                             + sub.parameter_name)
+            except (AttributeError, TypeError, ValueError):
+                # Incomplete objects are left to the slow path of `get_name`
+                #   to raise the appropriate error
+                continue
+        return names
+
     def __len__(self) -> int:
         return sum(map(lambda x: len(x), self.indices.values()))
 
@@ -273,6 +391,7 @@ class OD:
         callable = hex if type(key) == int else str
         key = callable(key)
         self.indices[key] = value
+        self.invalidate()
 
     def __contains__(self, item):
         callable = hex if type(item) == int else str
@@ -291,30 +410,18 @@ class EDS(OD):
         super().__init__()
         self.indices = {}
 
-        prev = 0
-        for i, line in enumerate(eds_data):
-            if line == '' or i == len(eds_data) - 1:
-                # Handle extra empty strings
-                if prev == i:
-                    prev = i + 1
-                    continue
+        for name, fields in tokenize(eds_data):
+            id = name.split('sub')
 
-                section = eds_data[prev:i]
-                id = section[0][1:-1].split('sub')
-
-                if all(c in string.hexdigits for c in id[0]):
-                    index = hex(int(id[0], 16))
-                    if len(id) == 1:
-                        self.indices[index] = Index(section[1:], index)
-                    else:
-                        self.indices[index] \
-                            .add(Index(section[1:], int(id[1], 16),
-                                       is_sub=True))
+            if HEX_DIGITS.issuperset(id[0]):
+                index = hex(int(id[0], 16))
+                if len(id) == 1:
+                    self.indices[index] = Index(fields, index)
                 else:
-                    name = section[0][1:-1]
-                    self.__setattr__(camel_to_snake(name),
-                                     Metadata(section[1:]))
-                prev = i + 1
+                    self.indices[index] \
+                        .add(Index(fields, int(id[1], 16), is_sub=True))
+            else:
+                self.__setattr__(camel_to_snake(name), Metadata(fields))
 
         if self.device_commissioning is not None:
             self.node_id = convert_value(self.device_commissioning.node_id)
@@ -324,7 +431,9 @@ class EDS(OD):
             self.node_id = None
 
 
-def load_eds_file(filepath: str, enable_ecss: bool = False) -> EDS:
+def load_eds_file(filepath: str,
+                  enable_ecss: bool = False,
+                  plugins: PluginRegistry = None) -> EDS:
     """Read in the EDS file, grab the raw lines, strip them of all escaped
     characters, then serialize into an `EDS` and return the resulting
     object.
@@ -333,39 +442,101 @@ def load_eds_file(filepath: str, enable_ecss: bool = False) -> EDS:
     :type filepath: str
     :param enable_ecss: Flag to enable ECSS time, defaults to False
     :type enable_ecss: bool, optional
+    :param plugins: The plugins decoding manufacturer specific objects,
+        defaults to the installed plugins
+    :type plugins: PluginRegistry, optional
     :return: The successfully serialized EDS file.
     :rtype: EDS
     """
+    if plugins is None:
+        from .plugins import PluginRegistry
+        plugins = PluginRegistry.default(enable_ecss)
+
     with open(filepath) as file:
-        od = EDS(list(map(lambda x: x.strip(), file.read().split('\n'))))
-        if enable_ecss and 0x2101 in od:
-            od[0x2101].data_type = DataType.ECSS_TIME.value
+        od = EDS(file.read().splitlines())
+        plugins.apply(od)
+
+        # Build the name map at load rather than on the first lookup
+        _ = od.names
         return od
 
 
-def load_eds_files(filepath: str, enable_ecss: bool = False) -> dict:
+def load_node_configs(filepath: str,
+                      enable_ecss: bool = False,
+                      plugins: PluginRegistry = None) -> dict:
+    """Read an OD file, along with the ODs of its extended PDO definitions
+
+    :param filepath: Path to an eds file
+    :type filepath: str
+    :param enable_ecss: Flag to enable ECSS time, defaults to False
+    :type enable_ecss: bool, optional
+    :param plugins: The plugins decoding manufacturer specific objects,
+        defaults to the installed plugins
+    :type plugins: PluginRegistry, optional
+    :return: dictionary of ODs with node id as key and OD as value
+    :rtype: dict
+    """
+    config = load_eds_file(filepath, enable_ecss, plugins)
+    configs = {config.node_id: config}
+    try:
+        i = 1
+        while True:
+            extended_node = config.extended_pdo_definition(i)
+            configs[config.node_id+i] = extended_node
+            i += 1
+    except KeyError:
+        ...
+    return configs
+
+
+def load_eds_files(filepath: str,
+                   enable_ecss: bool = False,
+                   plugins: PluginRegistry = None,
+                   cache: ODCache = None) -> dict:
     """Read a directory of OD files
 
     :param filepath: Directory to load files from
     :type filepath: str
     :param enable_ecss: Flag to enable ECSS time, defaults to False
     :type enable_ecss: bool, optional
+    :param plugins: The plugins decoding manufacturer specific objects,
+        defaults to the installed plugins
+    :type plugins: PluginRegistry, optional
+    :param cache: The cache to take unchanged ODs from rather than parsing
+        them again, and to save newly parsed ODs to, defaults to no cache
+    :type cache: ODCache, optional
     :return: dictionary of OD files with node id as key and OD as value
     :rtype: dict
     """
+    if plugins is None:
+        from .plugins import PluginRegistry
+        plugins = PluginRegistry.default(enable_ecss)
+    signature = plugins.signature()
+
     configs = {}
+    paths = []
     for file in os.listdir(filepath):
         full_path = f'{filepath}/{file}'
         if file.lower().endswith(".eds") or file.lower().endswith(".dcf"):
-            config = load_eds_file(full_path, enable_ecss)
-            configs[config.node_id] = config
-            try:
-                i = 1
-                while True:
-                    extended_node = config.extended_pdo_definition(i)
-                    configs[config.node_id+i] = extended_node
-                    i += 1
-            except KeyError:
-                ...
+            if cache is None:
+                configs.update(load_node_configs(full_path,
+                                                 enable_ecss,
+                                                 plugins))
+                continue
 
+            # Stat before parsing, so a file changed while it is parsed is
+            #   parsed again next time
+            stat = os.stat(full_path)
+            node_configs = cache.get(full_path, stat, signature)
+            if node_configs is None:
+                node_configs = load_node_configs(full_path,
+                                                 enable_ecss,
+                                                 plugins)
+                cache.put(full_path, stat, node_configs, signature)
+            configs.update(node_configs)
+            paths.append(full_path)
+
+    if cache is not None:
+        cache.prune(filepath, paths)
+        cache.save()
     return configs
@@ -1,16 +1,90 @@
+from collections import Counter, deque
+from datetime import datetime
 from .eds import EDS
-from .utilities import FailedValidationError
+from .result import INVALID_LENGTH, ParseError, ParseResult, unwrap
+
+# Number of EMCY messages kept in the history of an `EMCYTracker`
+EMCY_HISTORY = 256
+
+# The emergency error code of an error reset, clearing the errors of a node
+ERROR_RESET = 0x0000
+
+# Generic Emergency Error Codes are defined here, but application specific
+#   error codes can be defined as well
+ERROR_CODES = {
+    0x0000: "Error reset or no error",
+    0x1000: "Generic error",
+    0x2000: "Current = generic error",
+    0x2100: "Current, CANopen device input side - generic",
+    0x2200: "Current inside the CANopen device - generic",
+    0x2300: "Current, CANopen device output side - generic",
+    0x3000: "Voltage = generic error",
+    0x3100: "Mains voltage - generic",
+    0x3200: "Voltage inside the CANopen device - generic",
+    0x3300: "Output voltage - generic",
+    0x4000: "Temperature - generic error",
+    0x4100: "Ambient temperature - generic",
+    0x4200: "Device temperature - generic",
+    0x5000: "CANopen device hardware - generic error",
+    0x6000: "CANopen device software - generic error",
+    0x6100: "Internal software - generic",
+    0x6200: "User software - generic",
+    0x6300: "Data set - generic",
+    0x7000: "Additional modules - generic error",
+    0x8000: "Monitoring - generic error",
+    0x8100: "Communication - generic",
+    0x8110: "CAN overrun (objects lost)",
+    0x8120: "CAN in error passive mode",
+    0x8130: "Life guard error on heartbeat error",
+    0x8140: "recovered from bus off",
+    0x8150: "CAN-ID collision",
+    0x8200: "Protocol error - generic",
+    0x8210: "PDO not processed due to length error",
+    0x8220: "PDO length exceeded",
+    0x8230: "DAM MPDO not processed, destination object not available",
+    0x8240: "Unexpected SYNC data length",
+    0x8250: "RPDO timeout",
+    0x9000: "External error - generic error",
+    0xF000: "Additional functions - generic error",
+    0xFF00: "Device specific - generic error"
+}
+
+# The meaning of each bit of the error register (object 0x1001)
+ERROR_REGISTER_BITS = (
+    "Generic error",
+    "Current",
+    "Voltage",
+    "Temperature",
+    "Communication error",
+    "Device profile specific",
+    "Reserved",
+    "Manufacturer specific",
+)
 
 
 def parse(cob_id: int, data: list, eds: EDS):
+    return parse_emcy(cob_id, data)
+
+
+def parse_emcy(cob_id: int, data: list):
+    """
+    Validate an EMCY message and split it into its fields
+    """
+    return unwrap(try_parse_emcy(cob_id, data), data)
+
+
+def try_parse_emcy(cob_id: int, data: list):
+    """
+    Validate an EMCY message and split it into its fields, returning a
+    `ParseError` rather than raising it
+    """
     if len(data) != 8:
-        raise FailedValidationError(data, cob_id-0x80, cob_id, __name__,
-                                    "Invalid EMCY message length")
-    message = EMCY(data)
-    return message.error_message
+        return ParseError(INVALID_LENGTH, cob_id-0x80, cob_id, __name__,
+                          "Invalid EMCY message length")
+    return EMCY(data)
 
 
-class EMCY:
+class EMCY(ParseResult):
     """
 
 
@@ -33,17 +107,26 @@ class EMCY:
         self.__emergency_error_code = raw_sdo[0:2]
         self.__error_register = raw_sdo[2]
         self.__manufacturer_specific_error_code = raw_sdo[3:8]
-        self.__error_message = determine_error_message(
-            self.__emergency_error_code)
+        self.__error_code = error_code_to_int(self.__emergency_error_code)
+        self.__error_message = ERROR_CODES.get(self.__error_code,
+                                               "Error code not found")
 
     @property
     def emergency_error_code(self):
         return self.__emergency_error_code
 
+    @property
+    def error_code(self):
+        return self.__error_code
+
     @property
     def error_register(self):
         return self.__error_register
 
+    @property
+    def error_register_bits(self):
+        return decode_error_register(self.__error_register)
+
     @property
     def manufacturer_specific_error_code(self):
         return self.__manufacturer_specific_error_code
@@ -52,54 +135,114 @@ class EMCY:
     def error_message(self):
         return self.__error_message
 
+    def key(self) -> tuple:
+        return (self.__error_code, self.__error_register,
+                tuple(self.__manufacturer_specific_error_code))
+
+    def render(self) -> str:
+        return self.__error_message
+
+
+def error_code_to_int(error_code: list) -> int:
+    """
+    Convert the two bytes of an emergency error code to an integer, least
+    significant byte first as sent on the bus
+    """
+    return error_code[0] | (error_code[1] << 8)
+
+
+def decode_error_register(error_register: int) -> [str]:
+    """
+    Get the meaning of every bit set in an error register
+    """
+    return [name for bit, name in enumerate(ERROR_REGISTER_BITS)
+            if error_register & (1 << bit)]
+
 
 def determine_error_message(error_code: list):
     """
-    Generic Emergency Error Codes are defined here, but application specific
-    error codes can be defined as well
+    Get the description of an emergency error code
     """
-    error_codes = {
-        0x0000: "Error reset or no error",
-        0x1000: "Generic error",
-        0x2000: "Current = generic error",
-        0x2100: "Current, CANopen device input side - generic",
-        0x2200: "Current inside the CANopen device - generic",
-        0x2300: "Current, CANopen device output side - generic",
-        0x3000: "Voltage = generic error",
-        0x3100: "Mains voltage - generic",
-        0x3200: "Voltage inside the CANopen device - generic",
-        0x3300: "Output voltage - generic",
-        0x4000: "Temperature - generic error",
-        0x4100: "Ambient temperature - generic",
-        0x4200: "Device temperature - generic",
-        0x5000: "CANopen device hardware - generic error",
-        0x6000: "CANopen device software - generic error",
-        0x6100: "Internal software - generic",
-        0x6200: "User software - generic",
-        0x6300: "Data set - generic",
-        0x7000: "Additional modules - generic error",
-        0x8000: "Monitoring - generic error",
-        0x8100: "Communication - generic",
-        0x8110: "CAN overrun (objects lost)",
-        0x8120: "CAN in error passive mode",
-        0x8130: "Life guard error on heartbeat error",
-        0x8140: "recovered from bus off",
-        0x8150: "CAN-ID collision",
-        0x8200: "Protocol error - generic",
-        0x8210: "PDO not processed due to length error",
-        0x8220: "PDO length exceeded",
-        0x8230: "DAM MPDO not processed, destination object not available",
-        0x8240: "Unexpected SYNC data length",
-        0x8250: "RPDO timeout",
-        0x9000: "External error - generic error",
-        0xF000: "Additional functions - generic error",
-        0xFF00: "Device specific - generic error"
-    }
-
-    # Safe conversion to int ok, because data is bytes
-    ebytes = list(map(lambda x: hex(x)[2:], error_code))
-    error_id = int('0x' + ''.join(ebytes), 16)
-    if error_id in error_codes.keys():
-        return error_codes[error_id]
-    else:
-        return "Error code not found"
+    return ERROR_CODES.get(error_code_to_int(error_code),
+                           "Error code not found")
+
+
+class EMCYTracker:
+    """
+    Tracks the emergency errors of every node across EMCY messages, rather
+    than only the last one sent
+
+    Each node has a set of active errors, keyed by error code, which is
+    cleared when the node sends an error reset (0x0000). Every EMCY message
+    is also kept in a bounded history, and the number of occurrences of each
+    error code of each node is counted.
+
+    :param history_length: The number of EMCY messages kept in the history
+    :type history_length: int
+    """
+
+    def __init__(self, history_length: int = EMCY_HISTORY):
+        self.active = {}
+        self.history = deque(maxlen=history_length)
+        self.counts = Counter()
+
+    def update(self,
+               node_id: int,
+               emcy: EMCY,
+               timestamp: datetime = None) -> None:
+        """
+        Record an EMCY message sent by a node
+
+        :param node_id: The node that sent the message
+        :type node_id: int
+
+        :param emcy: The message
+        :type emcy: EMCY
+
+        :param timestamp: When the message was received, defaults to now
+        :type timestamp: datetime
+        """
+        timestamp = timestamp or datetime.now()
+        self.history.append((timestamp, node_id, emcy))
+        self.counts[(node_id, emcy.error_code)] += 1
+
+        if emcy.error_code == ERROR_RESET:
+            self.active.pop(node_id, None)
+        else:
+            self.active.setdefault(node_id, {})[emcy.error_code] = \
+                (timestamp, emcy)
+
+    def active_errors(self, node_id: int = None) -> [tuple]:
+        """
+        Get the active errors of a node, or of every node
+
+        :param node_id: The node, or None for every node
+        :type node_id: int
+
+        :return: Tuples of the node ID, when the error was last sent and the
+            last EMCY message of the error, ordered by node ID and error code
+        :rtype: [(int, datetime, EMCY)]
+        """
+        nodes = [node_id] if node_id is not None else sorted(self.active)
+        return [(node, timestamp, emcy)
+                for node in nodes
+                for _, (timestamp, emcy)
+                in sorted(self.active.get(node, {}).items())]
+
+    def count(self, node_id: int, error_code: int = None) -> int:
+        """
+        Get the number of times a node sent an error code, or any EMCY
+        message if no error code is given
+        """
+        if error_code is not None:
+            return self.counts[(node_id, error_code)]
+        return sum(n for (node, _), n in self.counts.items()
+                   if node == node_id)
+
+    def clear(self) -> None:
+        """
+        Forget every error, the history and the counts
+        """
+        self.active.clear()
+        self.history.clear()
+        self.counts.clear()
@@ -1,9 +1,45 @@
+import time
+from collections import deque
 from .eds import EDS
-from .utilities import FailedValidationError
+from .result import INVALID_STATE, HBResult, ParseError, unwrap
+from .utilities import object_value
 from ..can import MessageType
 
 STATE_BYTE_IDX = 0
 
+BOOT_UP = 0x00
+
+STATES = {
+    0x00: "Boot-up",
+    0x04: "Stopped",
+    0x05: "Operational",
+    0x7F: "Pre-operational"
+}
+
+# Object indices of the heartbeat times in the OD
+CONSUMER_HEARTBEAT_TIME = 0x1016
+PRODUCER_HEARTBEAT_TIME = 0x1017
+
+# Multiple of the producer time allowed between heartbeats of a node that no
+#   other node consumes
+PRODUCER_TIME_MARGIN = 1.5
+
+# Boot-ups of a node within this many seconds are a reboot loop
+REBOOT_LOOP_COUNT = 3
+REBOOT_LOOP_WINDOW = 60.0
+
+# Resolution of the timing wheel in seconds and its number of slots
+WHEEL_TICK = 0.01
+WHEEL_SLOTS = 512
+
+# Number of heartbeat events kept by a `HeartbeatSupervisor`
+HEARTBEAT_EVENT_HISTORY = 256
+
+# Kinds of `HeartbeatEvent`
+HEARTBEAT_LOST = 'Heartbeat lost'
+BOOT_UP_EVENT = 'Boot-up'
+REBOOT_LOOP = 'Reboot loop'
+
 
 def parse(cob_id: int, data: list, eds_config: EDS):
     """
@@ -15,17 +51,243 @@ def parse(cob_id: int, data: list, eds_config: EDS):
     heartbeat state info.
 
     :return: the parsed message
-    :rtype: str
-    """
-    states = {
-        0x00: "Boot-up",
-        0x04: "Stopped",
-        0x05: "Operational",
-        0x7F: "Pre-operational"
-    }
-
-    node_id = MessageType.cob_to_node(MessageType.HEARTBEAT, cob_id)
-    if len(data) < 1 or data[STATE_BYTE_IDX] not in states:
-        raise FailedValidationError(data, node_id, cob_id, __name__,
-                                    "Invalid heartbeat state detected")
-    return states.get(data[STATE_BYTE_IDX])
+    :rtype: HBResult
+    """
+    return unwrap(try_parse(cob_id, data, eds_config), data)
+
+
+def try_parse(cob_id: int, data: list, eds_config: EDS):
+    """
+    Parse Heartbeat message, returning a `ParseError` rather than raising it
+
+    :return: the parsed message, or the error
+    :rtype: HBResult or ParseError
+    """
+    if len(data) < 1 or data[STATE_BYTE_IDX] not in STATES:
+        return ParseError(INVALID_STATE,
+                          MessageType.cob_to_node(MessageType.HEARTBEAT,
+                                                  cob_id),
+                          cob_id,
+                          __name__,
+                          "Invalid heartbeat state detected")
+    state = data[STATE_BYTE_IDX]
+    return HBResult(state, STATES[state])
+
+
+def heartbeat_timeouts(eds_configs: dict) -> dict:
+    """
+    Get the longest time allowed between two heartbeats of every node, in
+    seconds, from the heartbeat times in the ODs
+
+    A node consumed by other nodes (object 0x1016) is allowed the shortest of
+    their consumer times, otherwise it is allowed its own producer time
+    (object 0x1017) with a margin. Nodes with neither are not supervised.
+    """
+    timeouts = {}
+    producers = {}
+    for node_id, eds in eds_configs.items():
+        if node_id is None:
+            continue
+
+        try:
+            producer = object_value(eds[hex(PRODUCER_HEARTBEAT_TIME)])
+            if producer:
+                producers[node_id] = producer * PRODUCER_TIME_MARGIN
+        except KeyError:
+            ...
+
+        try:
+            consumers = eds[hex(CONSUMER_HEARTBEAT_TIME)].sub_indices
+        except KeyError:
+            continue
+        for subindex, entry in consumers.items():
+            value = object_value(entry) if subindex > 0 else None
+            if not value:
+                continue
+            # Bits 16-22 are the node consumed and bits 0-15 the time in ms
+            consumed = (value >> 16) & 0x7F
+            consumer_time = value & 0xFFFF
+            if consumed and consumer_time:
+                timeouts[consumed] = min(timeouts.get(consumed, consumer_time),
+                                         consumer_time)
+
+    for node_id, producer in producers.items():
+        timeouts.setdefault(node_id, producer)
+    return {node_id: timeout / 1000 for node_id, timeout in timeouts.items()}
+
+
+class TimingWheel:
+    """
+    A hashed timing wheel of timers identified by key. Scheduling and
+    cancelling a timer are O(1), and advancing the wheel only visits the slots
+    the clock moved past, whatever the number of timers.
+
+    Timers further away than a full turn of the wheel stay in their slot until
+    their deadline comes around.
+
+    :param tick: The time covered by a slot, in seconds
+    :type tick: float
+
+    :param slots: The number of slots
+    :type slots: int
+
+    :param now: The current time, defaults to `time.monotonic()`
+    :type now: float
+    """
+
+    def __init__(self,
+                 tick: float = WHEEL_TICK,
+                 slots: int = WHEEL_SLOTS,
+                 now: float = None):
+        self.tick = tick
+        self.__slots = [{} for _ in range(slots)]
+        self.__timers = {}
+        now = time.monotonic() if now is None else now
+        self.__current = int(now / tick)
+
+    def __len__(self) -> int:
+        return len(self.__timers)
+
+    def __contains__(self, key: any) -> bool:
+        return key in self.__timers
+
+    def schedule(self, key: any, deadline: float) -> None:
+        """
+        Set the timer of a key to expire at a deadline, replacing any timer
+        already set for the key
+        """
+        self.cancel(key)
+        slot = max(int(deadline / self.tick), self.__current) \
+            % len(self.__slots)
+        self.__slots[slot][key] = deadline
+        self.__timers[key] = slot
+
+    def cancel(self, key: any) -> bool:
+        """
+        Cancel the timer of a key, if there is one
+        """
+        slot = self.__timers.pop(key, None)
+        if slot is None:
+            return False
+        del self.__slots[slot][key]
+        return True
+
+    def advance(self, now: float = None) -> list:
+        """
+        Move the clock of the wheel forward and remove the timers that expired
+
+        :return: The keys of the expired timers
+        """
+        now = time.monotonic() if now is None else now
+        target = int(now / self.tick)
+        expired = []
+        steps = min(target - self.__current + 1, len(self.__slots))
+        for step in range(max(steps, 0)):
+            slot = self.__slots[(self.__current + step) % len(self.__slots)]
+            for key in [k for k, deadline in slot.items() if deadline <= now]:
+                del slot[key]
+                del self.__timers[key]
+                expired.append(key)
+        self.__current = max(target, self.__current)
+        return expired
+
+
+class HeartbeatEvent:
+    """
+    A change in the heartbeat of a node noticed by a `HeartbeatSupervisor`
+    """
+    __slots__ = ['node_id', 'kind', 'message', 'timestamp']
+
+    def __init__(self, node_id: int, kind: str, message: str,
+                 timestamp: float):
+        self.node_id = node_id
+        self.kind = kind
+        self.message = message
+        self.timestamp = timestamp
+
+    def __repr__(self) -> str:
+        return f'<HeartbeatEvent node={hex(self.node_id)} {self.message}>'
+
+
+class HeartbeatSupervisor:
+    """
+    A heartbeat consumer for every node, which notices when a node misses its
+    heartbeat or keeps rebooting
+
+    Every heartbeat reschedules the timer of its node on a timing wheel, so
+    the cost of a heartbeat and of a `poll()` does not depend on the number
+    of nodes.
+
+    :param eds_configs: The ODs of the nodes, keyed by node ID
+    :type eds_configs: dict
+
+    :param now: The current time, defaults to `time.monotonic()`
+    :type now: float
+    """
+
+    def __init__(self,
+                 eds_configs: dict,
+                 reboot_count: int = REBOOT_LOOP_COUNT,
+                 reboot_window: float = REBOOT_LOOP_WINDOW,
+                 now: float = None):
+        self.timeouts = heartbeat_timeouts(eds_configs)
+        self.reboot_count = reboot_count
+        self.reboot_window = reboot_window
+        self.lost = set()
+        self.events = deque(maxlen=HEARTBEAT_EVENT_HISTORY)
+        self.__boots = {}
+        self.__pending = []
+        self.__wheel = TimingWheel(now=now)
+
+    def heartbeat(self, node_id: int, state: int, now: float = None) -> None:
+        """
+        Record a heartbeat of a node, restarting its timeout
+        """
+        now = time.monotonic() if now is None else now
+        timeout = self.timeouts.get(node_id)
+        if timeout:
+            self.__wheel.schedule(node_id, now + timeout)
+        self.lost.discard(node_id)
+
+        if state != BOOT_UP:
+            return
+        boots = self.__boots.get(node_id)
+        if boots is None:
+            boots = deque(maxlen=self.reboot_count)
+            self.__boots[node_id] = boots
+        boots.append(now)
+
+        if len(boots) == boots.maxlen and now - boots[0] <= self.reboot_window:
+            self.__add_event(node_id,
+                             REBOOT_LOOP,
+                             f'{REBOOT_LOOP}, {len(boots)} boot-ups in'
+                             f' {now - boots[0]:.1f}s',
+                             now)
+        else:
+            self.__add_event(node_id, BOOT_UP_EVENT, BOOT_UP_EVENT, now)
+
+    def poll(self, now: float = None) -> [HeartbeatEvent]:
+        """
+        Check for nodes that missed their heartbeat
+
+        :return: The events since the last poll
+        :rtype: [HeartbeatEvent]
+        """
+        now = time.monotonic() if now is None else now
+        for node_id in self.__wheel.advance(now):
+            self.lost.add(node_id)
+            self.__add_event(node_id,
+                             HEARTBEAT_LOST,
+                             f'{HEARTBEAT_LOST}, none for'
+                             f' {self.timeouts[node_id] * 1000:.0f} ms',
+                             now)
+
+        events = self.__pending
+        self.__pending = []
+        return events
+
+    def __add_event(self, node_id: int, kind: str, message: str,
+                    now: float) -> None:
+        event = HeartbeatEvent(node_id, kind, message, now)
+        self.events.append(event)
+        self.__pending.append(event)
@@ -0,0 +1,221 @@
+"""Lazy loading of a directory of OD files, for benches with the ODs of a
+whole fleet but only a few nodes powered.
+
+The node ID of every OD file is indexed up front, from the cache or from the
+DeviceCommissioning section of the file, and the file is only parsed, on a
+background thread, once a message from its node is seen.
+"""
+from __future__ import annotations
+import logging
+import os
+import queue
+import threading as t
+from collections.abc import Mapping
+from typing import TYPE_CHECKING
+from .eds import OD, camel_to_snake, convert_value, load_node_configs, \
+    tokenize
+
+if TYPE_CHECKING:
+    from .cache import ODCache
+    from .plugins import PluginRegistry
+
+
+def scan_node_id(filepath: str) -> int:
+    """
+    Read the node ID of an OD file from its DeviceCommissioning section,
+    without reading the rest of the file
+
+    :return: The node ID, or None if the file has no DeviceCommissioning
+        section
+    """
+    with open(filepath) as file:
+        for name, fields in tokenize(file):
+            if camel_to_snake(name) != 'device_commissioning':
+                continue
+            for key, value in fields:
+                if camel_to_snake(key) == 'node_id':
+                    return convert_value(value)
+            return None
+    return None
+
+
+class LazyODs(Mapping):
+    """
+    The ODs of a directory of OD files keyed by node ID, as returned by
+    `load_eds_files`, but each file is only parsed once its node is looked
+    up
+
+    The node IDs are indexed when it is created. Files without a
+    DeviceCommissioning section, whose node ID is only known once they are
+    parsed, are parsed right away. The node IDs of extended PDO definitions
+    are only indexed from the cache, otherwise they are known once the file
+    is parsed.
+
+    Looking up an indexed node that is not loaded yet queues its file to be
+    parsed on a background thread, and raises a KeyError as for a node
+    without an OD. The nodes loaded since are returned by `poll()`.
+
+    :param filepath: Directory to load files from
+    :type filepath: str
+
+    :param enable_ecss: Flag to enable ECSS time, defaults to False
+    :type enable_ecss: bool, optional
+
+    :param plugins: The plugins decoding manufacturer specific objects,
+        defaults to the installed plugins
+    :type plugins: PluginRegistry, optional
+
+    :param cache: The cache to take unchanged ODs and node IDs from, and to
+        save newly parsed ODs to, defaults to no cache
+    :type cache: ODCache, optional
+    """
+
+    def __init__(self,
+                 filepath: str,
+                 enable_ecss: bool = False,
+                 plugins: PluginRegistry = None,
+                 cache: ODCache = None):
+        if plugins is None:
+            from .plugins import PluginRegistry
+            plugins = PluginRegistry.default(enable_ecss)
+
+        self.filepath = filepath
+        self.enable_ecss = enable_ecss
+        self.plugins = plugins
+        self.cache = cache
+        self.files = {}
+        self.__signature = plugins.signature()
+        self.__configs = {}
+        self.__scheduled = set()
+        self.__loaded = []
+        self.__lock = t.Lock()
+        self.__requests = queue.Queue()
+        self.__thread = None
+        self.index()
+
+    def index(self) -> None:
+        """
+        Index the node ID of every OD file of the directory
+        """
+        paths = []
+        for file in os.listdir(self.filepath):
+            full_path = f'{self.filepath}/{file}'
+            if file.lower().endswith(".eds") or file.lower().endswith(".dcf"):
+                paths.append(full_path)
+                node_ids = self.cache.node_ids(full_path,
+                                               os.stat(full_path),
+                                               self.__signature) \
+                    if self.cache is not None else None
+                if node_ids is None:
+                    node_id = scan_node_id(full_path)
+                    if node_id is None:
+                        self.__load(full_path)
+                        continue
+                    node_ids = [node_id]
+                for node_id in node_ids:
+                    self.files[node_id] = full_path
+
+        if self.cache is not None:
+            self.cache.prune(self.filepath, paths)
+            self.cache.save()
+
+        # The files parsed while indexing are loaded before anyone looks
+        #   them up
+        self.__loaded = []
+
+    def load(self, node_id: int) -> None:
+        """
+        Queue the OD file of a node to be parsed, if it is indexed and not
+        loaded or queued yet
+        """
+        filepath = self.files.get(node_id)
+        if filepath is None:
+            return
+        with self.__lock:
+            if filepath in self.__scheduled:
+                return
+            self.__scheduled.add(filepath)
+            self.__requests.put(filepath)
+            if self.__thread is None:
+                self.__thread = t.Thread(target=self.handler,
+                                         name='canopen-monitor-od-loader',
+                                         daemon=True)
+                self.__thread.start()
+
+    def handler(self) -> None:
+        """
+        Parse the queued OD files, until none are left
+        """
+        while True:
+            with self.__lock:
+                try:
+                    filepath = self.__requests.get_nowait()
+                except queue.Empty:
+                    self.__thread = None
+                    return
+            try:
+                self.__load(filepath)
+            except Exception as e:
+                logging.warning(f'Failed to load OD file {filepath}: {e}')
+            finally:
+                self.__requests.task_done()
+
+    def join(self) -> None:
+        """
+        Wait until every queued OD file is parsed
+        """
+        self.__requests.join()
+        with self.__lock:
+            thread = self.__thread
+        if thread is not None:
+            thread.join()
+
+    def poll(self) -> [int]:
+        """
+        Get the nodes whose ODs were loaded since the last poll
+
+        :return: The node IDs
+        """
+        with self.__lock:
+            loaded = self.__loaded
+            self.__loaded = []
+        return loaded
+
+    def __load(self, filepath: str) -> None:
+        cache = self.cache
+        if cache is None:
+            configs = load_node_configs(filepath,
+                                        self.enable_ecss,
+                                        self.plugins)
+        else:
+            # Stat before parsing, so a file changed while it is parsed is
+            #   parsed again next time
+            stat = os.stat(filepath)
+            configs = cache.get(filepath, stat, self.__signature)
+            if configs is None:
+                configs = load_node_configs(filepath,
+                                            self.enable_ecss,
+                                            self.plugins)
+                cache.put(filepath, stat, configs, self.__signature)
+                cache.save()
+
+        with self.__lock:
+            self.__configs.update(configs)
+            self.__loaded += list(configs)
+            for node_id in configs:
+                self.files[node_id] = filepath
+                self.__scheduled.add(filepath)
+
+    def __getitem__(self, node_id: int) -> OD:
+        od = self.__configs.get(node_id)
+        if od is None:
+            self.load(node_id)
+            raise KeyError(node_id)
+        return od
+
+    def __iter__(self) -> iter:
+        with self.__lock:
+            return iter(list(self.__configs))
+
+    def __len__(self) -> int:
+        return len(self.__configs)
@@ -0,0 +1,140 @@
+import time
+from .eds import EDS
+from .hb import STATES, BOOT_UP, TimingWheel
+from .result import INVALID_COMMAND, NMTResult, ParseError, unwrap
+
+# Node states, as sent in heartbeats
+STOPPED = 0x04
+OPERATIONAL = 0x05
+PRE_OPERATIONAL = 0x7F
+
+# NMT commands, with the states a node may be in once it followed them
+COMMANDS = {
+    0x01: ("Start remote node", (OPERATIONAL,)),
+    0x02: ("Stop remote node", (STOPPED,)),
+    0x80: ("Enter pre-operational", (PRE_OPERATIONAL,)),
+    0x81: ("Reset node", (BOOT_UP, PRE_OPERATIONAL)),
+    0x82: ("Reset communication", (BOOT_UP, PRE_OPERATIONAL)),
+}
+
+# Node ID addressing every node
+ALL_NODES = 0x00
+
+# Seconds a node without a known heartbeat time has to follow a command
+DEFAULT_RESPONSE_TIME = 2.0
+
+
+def parse(cob_id: int, data: list, eds: EDS):
+    """
+    Parse an NMT command
+
+    .. code-block:: python
+
+         +-------+---------+
+         |  cs   | node id |
+         +-------+---------+
+             0        1
+
+    The command specifier (cs) selects the command and the node ID the node
+    it is sent to, or every node if 0.
+    """
+    return unwrap(try_parse(cob_id, data, eds), data)
+
+
+def try_parse(cob_id: int, data: list, eds: EDS):
+    """
+    Parse an NMT command, returning a `ParseError` rather than raising it
+    """
+    if len(data) != 2 or data[0] not in COMMANDS:
+        return ParseError(INVALID_COMMAND, 0, cob_id, __name__,
+                          "Invalid NMT command")
+    return NMTResult(data[0], COMMANDS[data[0]][0], data[1])
+
+
+class NetworkState:
+    """
+    The state every node is expected to be in according to the NMT commands
+    sent on the bus, reconciled against the state the nodes report in their
+    heartbeats
+
+    A node has one heartbeat period, as given by `timeouts`, to follow a
+    command, after which it is reported by `poll()`. It is reported again on
+    each heartbeat until it reaches the expected state.
+
+    :param timeouts: The heartbeat timeout of every node in seconds, nodes
+        without one have `DEFAULT_RESPONSE_TIME` to follow a command
+    :type timeouts: dict
+
+    :param now: The current time, defaults to `time.monotonic()`
+    :type now: float
+    """
+
+    def __init__(self, timeouts: dict, now: float = None):
+        self.timeouts = timeouts
+        self.states = {}
+        self.expected = {}
+        self.commands = {}
+        self.mismatched = set()
+        self.__pending = set()
+        self.__wheel = TimingWheel(now=now)
+
+    def command(self, command: int, node_id: int, now: float = None) -> None:
+        """
+        Record an NMT command sent to a node, or every node known so far
+        """
+        now = time.monotonic() if now is None else now
+        name, expected = COMMANDS[command]
+        if node_id == ALL_NODES:
+            nodes = set(self.states) | set(self.timeouts)
+        else:
+            nodes = [node_id]
+
+        for node in nodes:
+            self.expected[node] = expected
+            self.commands[node] = name
+            self.mismatched.discard(node)
+            self.__wheel.schedule(node,
+                                  now + self.timeouts.get(
+                                      node, DEFAULT_RESPONSE_TIME))
+
+    def heartbeat(self, node_id: int, state: int) -> None:
+        """
+        Record the state a node reported in a heartbeat
+        """
+        self.states[node_id] = state
+        expected = self.expected.get(node_id)
+        if expected is None:
+            return
+
+        if state in expected:
+            del self.expected[node_id]
+            self.__wheel.cancel(node_id)
+            self.mismatched.discard(node_id)
+        elif node_id in self.mismatched:
+            self.__pending.add(node_id)
+
+    def error(self, node_id: int) -> str:
+        """
+        Describe the command a node did not follow
+        """
+        expected = ' or '.join(map(lambda x: STATES[x],
+                                   self.expected[node_id]))
+        state = STATES.get(self.states.get(node_id), 'no heartbeat')
+        return f"Expected {expected} after {self.commands[node_id]}," \
+               f" is {state}"
+
+    def poll(self, now: float = None) -> [int]:
+        """
+        Check for nodes that did not follow a command in time
+
+        :return: The nodes not in their expected state, that either just ran
+            out of time or sent a heartbeat since the last poll
+        :rtype: [int]
+        """
+        for node_id in self.__wheel.advance(now):
+            self.mismatched.add(node_id)
+            self.__pending.add(node_id)
+
+        nodes = sorted(self.__pending & self.mismatched)
+        self.__pending.clear()
+        return nodes
@@ -1,7 +1,10 @@
 import string
 from math import ceil, floor
 from .eds import EDS
-from .utilities import FailedValidationError, get_name, decode, format_bytes
+from .result import INVALID_COB_ID, INVALID_LENGTH, INVALID_MAPPING, \
+    ParsedField, ParseError, PDOResult, unwrap
+from .utilities import FailedValidationError, get_name, get_decoder, \
+    get_value_decoder, decode_value, format_bytes
 from ..can import MessageType
 
 PDO1_TX = 0x1A00
@@ -14,45 +17,139 @@ PDO4_TX = 0x1A03
 PDO4_RX = 0x1603
 
 
-def parse(cob_id: int, data: bytes, eds: EDS):
+PDO_TYPES = {
+    MessageType.PDO1_TX: PDO1_TX,
+    MessageType.PDO1_RX: PDO1_RX,
+    MessageType.PDO2_TX: PDO2_TX,
+    MessageType.PDO2_RX: PDO2_RX,
+    MessageType.PDO3_TX: PDO3_TX,
+    MessageType.PDO3_RX: PDO3_RX,
+    MessageType.PDO4_TX: PDO4_TX,
+    MessageType.PDO4_RX: PDO4_RX,
+}
+
+
+class PDOField:
     """
-    PDO mappings come from the eds file and is dependent on the type (
-    Receiving/transmission PDO). Mapping value is made up of index subindex
-    and size. For Example 0x31010120 Means 3101sub01 size 32bit
+    A single mapped object of a PDO, with everything needed to extract and
+    decode it precomputed from the mapping entry
+    """
+    __slots__ = ['name', 'data_type', 'num_bytes', 'offset', 'shift', 'mask',
+                 'decoder', 'value_decoder']
+
+    def __init__(self, name: str, data_type: str, size: int, data_start: int):
+        self.name = name
+        self.data_type = data_type
+        self.num_bytes = ceil(size / 8)
+        self.offset = floor(data_start / 8)
+        self.shift = data_start % 8
+        self.mask = (1 << size) - 1 if size > 0 else 1
+        self.decoder = get_decoder(data_type)
+        self.value_decoder = get_value_decoder(data_type)
+
+    def __getstate__(self) -> tuple:
+        # The decoders are looked up again rather than pickled
+        return (self.name, self.data_type, self.num_bytes, self.offset,
+                self.shift, self.mask)
+
+    def __setstate__(self, state: tuple) -> None:
+        self.name, self.data_type, self.num_bytes, self.offset, self.shift, \
+            self.mask = state
+        self.decoder = get_decoder(self.data_type)
+        self.value_decoder = get_value_decoder(self.data_type)
+
+    def extract(self, data: bytes) -> bytes:
+        """
+        Extract the bytes of this field from a PDO payload
+        """
+        end = len(data) - self.offset
+        value = int.from_bytes(data[end - self.num_bytes:end], "big") \
+            & self.mask
+        value = value >> self.shift
+        return value.to_bytes(self.num_bytes, "big")
+
+    def decode(self, data: bytes) -> str:
+        """
+        Extract this field from a PDO payload and decode it to a string
+        """
+        return self.decoder(self.extract(data))
+
+    def parse(self, data: bytes) -> ParsedField:
+        """
+        Extract this field from a PDO payload and decode it to its value
+        """
+        return ParsedField(self.name,
+                           self.data_type,
+                           self.value_decoder(self.extract(data)))
+
+
+class PDOPlan:
+    """
+    The decode plan of a PDO, compiled once from the mapping parameter of the
+    OD and cached on the OD keyed by COB ID
 
-    The eds mapping is determined by the cob_id passed ot this function. That
-    indicated which PDO record to look up in the EDS file.
-    """
-    msg_type = MessageType.cob_id_to_type(cob_id)
-    pdo_type = {
-        MessageType.PDO1_TX: PDO1_TX,
-        MessageType.PDO1_RX: PDO1_RX,
-        MessageType.PDO2_TX: PDO2_TX,
-        MessageType.PDO2_RX: PDO2_RX,
-        MessageType.PDO3_TX: PDO3_TX,
-        MessageType.PDO3_RX: PDO3_RX,
-        MessageType.PDO4_TX: PDO4_TX,
-        MessageType.PDO4_RX: PDO4_RX,
-        MessageType.UKNOWN: None
-    }[msg_type]
-
-    if(not pdo_type or msg_type.supertype is not MessageType.PDO):
-        raise FailedValidationError(data,
-                                    cob_id - MessageType.PDO1_TX.value[0],
-                                    cob_id,
-                                    __name__,
-                                    f"Unable to determine pdo type with given"
-                                    f" cob_id {hex(cob_id)}, expected value"
-                                    f" between {MessageType.PDO1_TX.value[0]}"
-                                    f" and {MessageType.PDO4_RX.value[1] + 1}")
+    :param pdo_type: The index of the mapping parameter in the OD
+    :type pdo_type: int
 
-    if len(data) > 8 or len(data) < 1:
-        raise FailedValidationError(data,
-                                    cob_id - MessageType.PDO1_TX.value[0],
-                                    cob_id,
-                                    __name__,
-                                    f"Invalid payload length {len(data)} "
-                                    f"expected between 1 and 8")
+    :param num_elements: The number of mapped objects, or 0xFE/0xFF for MPDOs
+    :type num_elements: int
+
+    :param fields: The mapped objects, in the order they are displayed
+    :type fields: [PDOField]
+    """
+    __slots__ = ['pdo_type', 'num_elements', 'fields']
+
+    def __init__(self, pdo_type: int, num_elements: int, fields: [PDOField]):
+        self.pdo_type = pdo_type
+        self.num_elements = num_elements
+        self.fields = fields
+
+    @property
+    def is_mpdo(self) -> bool:
+        return self.num_elements in (0xFE, 0xFF)
+
+
+def get_pdo_type(cob_id: int, data: bytes) -> int:
+    """
+    Get the index of the mapping parameter of the PDO sent with a COB ID
+    """
+    pdo_type = PDO_TYPES.get(MessageType.cob_id_to_type(cob_id))
+    if(pdo_type is None):
+        raise pdo_type_error(cob_id).exception(data)
+    return pdo_type
+
+
+def pdo_type_error(cob_id: int) -> ParseError:
+    return ParseError(INVALID_COB_ID,
+                      cob_id - MessageType.PDO1_TX.value[0],
+                      cob_id,
+                      __name__,
+                      "Unable to determine pdo type with given cob_id {}, "
+                      "expected value between {} and {}",
+                      hex(cob_id),
+                      MessageType.PDO1_TX.value[0],
+                      MessageType.PDO4_RX.value[1] + 1)
+
+
+def length_error(cob_id: int, length: int, expected: str) -> ParseError:
+    return ParseError(INVALID_LENGTH,
+                      cob_id - MessageType.PDO1_TX.value[0],
+                      cob_id,
+                      __name__,
+                      "Invalid payload length {} expected {}",
+                      length,
+                      expected)
+
+
+def compile_plan(cob_id: int, eds: EDS, data: bytes = None) -> PDOPlan:
+    """
+    Compile the decode plan of the PDO sent with a COB ID from the mapping
+    parameter in the OD
+
+    The plan only depends on the OD, the data is only used to fill in any
+    validation errors.
+    """
+    pdo_type = get_pdo_type(cob_id, data)
     try:
         eds_elements = eds[hex(pdo_type)][0]
     except (TypeError, IndexError):
@@ -70,17 +167,13 @@ def parse(cob_id: int, data: bytes, eds: EDS):
         num_elements = int(str(eds_elements.default_value))
 
     if num_elements < 0x40:
-        return parse_pdo(num_elements, pdo_type, cob_id, eds, data)
+        return PDOPlan(pdo_type,
+                       num_elements,
+                       compile_fields(num_elements, pdo_type, cob_id, eds,
+                                      data))
 
     if num_elements in (0xFE, 0xFF):
-        if len(data) != 8:
-            raise FailedValidationError(data,
-                                        cob_id - MessageType.PDO1_TX.value[0],
-                                        cob_id,
-                                        __name__,
-                                        f"Invalid payload length {len(data)} "
-                                        f"expected 8")
-        return parse_mpdo(num_elements, pdo_type, eds, data, cob_id)
+        return PDOPlan(pdo_type, num_elements, [])
 
     raise FailedValidationError(data,
                                 cob_id - MessageType.PDO1_TX.value[0],
@@ -90,12 +183,12 @@ def parse(cob_id: int, data: bytes, eds: EDS):
                                 f"[{pdo_type}sub0]")
 
 
-def parse_pdo(num_elements, pdo_type, cob_id, eds, data):
+def compile_fields(num_elements, pdo_type, cob_id, eds, data) -> [PDOField]:
     """
-    Parse pdo message. Message will include num_elements elements. Elements
-    are processed in reverse order, from rightmost to leftmost
+    Compile the num_elements mapped objects of a PDO. Elements are processed
+    in reverse order, from rightmost to leftmost
     """
-    output_string = ""
+    fields = []
     data_start = 0
     for i in range(num_elements, 0, -1):
         try:
@@ -112,62 +205,175 @@ def parse_pdo(num_elements, pdo_type, cob_id, eds, data):
 
         index = pdo_definition[0:3]
         size = pdo_definition[3]
-        mask = 1
-        for j in range(1, size):
-            mask = mask << 1
-            mask += 1
-
-        # Possible exceptions from get_name are not caught because they indicate
-        # an issue with the PDO definition in the OD file, which should be
-        # checked when the file is loaded
+
+        # Possible exceptions from get_name are not caught here, they are
+        #   cached as the error of the mapping by `lookup_plan`
         eds_details = get_name(eds, index)
-        num_bytes = ceil(size / 8)
-
-        start = len(data) - num_bytes - floor(data_start / 8)
-        end = len(data) - floor(data_start / 8)
-        masked_data = int.from_bytes(data[start:end], "big") & mask
-        masked_data = masked_data >> data_start % 8
-        masked_data = masked_data.to_bytes(num_bytes, "big")
-        output_string = f"{eds_details[1]} -" \
-                        f" {decode(eds_details[0], masked_data)}" + \
-                        output_string
-        if i > 1:
-            output_string = " " + output_string
+        fields.insert(0, PDOField(eds_details[1],
+                                  eds_details[0],
+                                  size,
+                                  data_start))
         data_start += size
 
-    return output_string
+    return fields
+
+
+def compile_plans(eds: EDS, node_id: int) -> None:
+    """
+    Compile the decode plans of every PDO of a node ahead of time. Mappings
+    that fail validation are cached as their `ParseError`, which is returned
+    again when a PDO using them is parsed.
+    """
+    for msg_type in PDO_TYPES:
+        cob_id = msg_type.start + node_id
+        if cob_id not in eds.pdo_plans:
+            lookup_plan(cob_id, eds)
+
+
+def lookup_plan(cob_id: int, eds: EDS) -> PDOPlan:
+    """
+    Get the decode plan of the PDO sent with a COB ID from the cache of the
+    OD, compiling it if it is not cached yet
+
+    A mapping that fails validation, or maps an object missing from the OD,
+    is cached as its `ParseError`, so it is only compiled once however many
+    PDOs use it.
+
+    :return: The plan, or the error
+    :rtype: PDOPlan or ParseError
+    """
+    plans = getattr(eds, 'pdo_plans', {})
+    plan = plans.get(cob_id)
+    if plan is None:
+        try:
+            plan = compile_plan(cob_id, eds)
+        except FailedValidationError as exception:
+            plan = ParseError.from_exception(exception, INVALID_MAPPING)
+        except (KeyError, ValueError, TypeError) as exception:
+            plan = ParseError(INVALID_MAPPING,
+                              cob_id - MessageType.PDO1_TX.value[0],
+                              cob_id,
+                              __name__,
+                              'Invalid pdo mapping for {}: {} {}',
+                              hex(cob_id),
+                              type(exception).__name__,
+                              exception)
+        plans[cob_id] = plan
+    return plan
+
+
+def get_plan(cob_id: int, eds: EDS, data: bytes = None) -> PDOPlan:
+    """
+    Get the decode plan of the PDO sent with a COB ID from the cache of the
+    OD, compiling it if it is not cached yet
+
+    :raise: FailedValidationError: The mapping of the PDO is not valid
+    """
+    return unwrap(lookup_plan(cob_id, eds), data)
+
+
+def bind(cob_id: int, eds: EDS) -> callable:
+    """
+    Get a function parsing the data of PDOs sent with a COB ID, with the
+    decode plan looked up once rather than for every PDO. PDOs the plan does
+    not cover, such as MPDOs, are parsed by `try_parse`, so the function
+    returns a `ParseError` rather than raising it.
+    """
+    plan = lookup_plan(cob_id, eds)
+    if type(plan) is not PDOPlan or plan.is_mpdo:
+        return lambda data: try_parse(cob_id, data, eds)
+
+    fields = plan.fields
+
+    def parse_bound(data: bytes) -> PDOResult:
+        if len(data) > 8 or len(data) < 1:
+            return length_error(cob_id, len(data), 'between 1 and 8')
+        return PDOResult([field.parse(data) for field in fields])
+    return parse_bound
+
+
+def parse(cob_id: int, data: bytes, eds: EDS):
+    """
+    PDO mappings come from the eds file and is dependent on the type (
+    Receiving/transmission PDO). Mapping value is made up of index subindex
+    and size. For Example 0x31010120 Means 3101sub01 size 32bit
+
+    The eds mapping is determined by the cob_id passed ot this function. That
+    indicated which PDO record to look up in the EDS file. The mapping is
+    compiled into a `PDOPlan` the first time it is used, and the plan is
+    cached on the OD until the OD is modified.
+    """
+    return unwrap(try_parse(cob_id, data, eds), data)
+
+
+def try_parse(cob_id: int, data: bytes, eds: EDS):
+    """
+    Parse a PDO as `parse` does, returning a `ParseError` rather than raising
+    it
+    """
+    if MessageType.cob_id_to_type(cob_id) not in PDO_TYPES:
+        return pdo_type_error(cob_id)
+
+    if len(data) > 8 or len(data) < 1:
+        return length_error(cob_id, len(data), 'between 1 and 8')
+
+    plan = lookup_plan(cob_id, eds)
+    if type(plan) is ParseError:
+        return plan
+    if plan.is_mpdo:
+        if len(data) != 8:
+            return length_error(cob_id, len(data), '8')
+        return parse_mpdo(plan.num_elements, plan.pdo_type, eds, data, cob_id)
+
+    return PDOResult([field.parse(data) for field in plan.fields])
+
+
+def parse_pdo(num_elements, pdo_type, cob_id, eds, data):
+    """
+    Parse pdo message. Message will include num_elements elements. Elements
+    are processed in reverse order, from rightmost to leftmost
+    """
+    fields = compile_fields(num_elements, pdo_type, cob_id, eds, data)
+    return PDOResult([field.parse(data) for field in fields])
 
 
 def parse_mpdo(num_elements, pdo_type, eds, data, cob_id):
+    """
+    Parse an MPDO, returning a `ParseError` if the MPDO does not match the OD
+    """
     mpdo = MPDO(data)
     if mpdo.is_source_addressing and num_elements != 0xFE:
-        raise FailedValidationError(data,
-                                    cob_id - MessageType.PDO1_TX.value[0],
-                                    cob_id,
-                                    __name__,
-                                    f"MPDO type and definition do not match. "
-                                    f"Check eds file at [{pdo_type}sub0]")
+        return mpdo_error(cob_id,
+                          "MPDO type and definition do not match. "
+                          "Check eds file at [{}sub0]",
+                          pdo_type)
 
     try:
         eds_details = get_name(eds, mpdo.index)
     except KeyError as e:
-        raise FailedValidationError(data,
-                                    cob_id - MessageType.PDO1_TX.value[0],
-                                    cob_id,
-                                    __name__,
-                                    f"MPDO provided type index does not exist. "
-                                    f"Check provided index {str(e)}")
+        return mpdo_error(cob_id,
+                          "MPDO provided type index does not exist. "
+                          "Check provided index {}",
+                          str(e))
 
     except ValueError:
-        raise FailedValidationError(data,
-                                    cob_id - MessageType.PDO1_TX.value[0],
-                                    cob_id,
-                                    __name__,
-                                    f"MPDO provided type index is missing "
-                                    f"attributes. Check OD file provided index "
-                                    f"[{format_bytes(mpdo.index)}")
-
-    return f"{eds_details[1]} - {decode(eds_details[0], mpdo.data)}"
+        return mpdo_error(cob_id,
+                          "MPDO provided type index is missing attributes. "
+                          "Check OD file provided index [{}",
+                          format_bytes(mpdo.index))
+
+    return PDOResult([ParsedField(eds_details[1],
+                                  eds_details[0],
+                                  decode_value(eds_details[0], mpdo.data))])
+
+
+def mpdo_error(cob_id: int, template: str, *args: any) -> ParseError:
+    return ParseError(INVALID_MAPPING,
+                      cob_id - MessageType.PDO1_TX.value[0],
+                      cob_id,
+                      __name__,
+                      template,
+                      *args)
 
 
 class MPDO:
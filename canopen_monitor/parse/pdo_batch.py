@@ -0,0 +1,169 @@
+"""Vectorized decoding of many PDOs sharing a single mapping, for exporting
+and plotting telemetry. This requires the optional NumPy dependency, which can
+be installed with the `numpy` extra.
+"""
+from __future__ import annotations
+from .eds import EDS, DataType
+from .pdo import PDOField, get_plan
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+# The smallest unsigned and signed types holding a number of bytes
+UNSIGNED_DTYPES = {1: 'u1', 2: 'u2', 3: 'u4', 4: 'u4',
+                   5: 'u8', 6: 'u8', 7: 'u8', 8: 'u8'}
+SIGNED_DTYPES = {1: 'i1', 2: 'i2', 3: 'i4', 4: 'i4',
+                 5: 'i8', 6: 'i8', 7: 'i8', 8: 'i8'}
+FLOAT_DTYPES = {4: 'f4', 8: 'f8'}
+
+
+def as_payloads(payloads: any, length: int = None) -> np.ndarray:
+    """
+    Convert payloads to a 2-D array of bytes with one row per frame
+
+    :param payloads: A 2-D array-like of payloads, or a contiguous buffer of
+        payloads of the same length
+    :type payloads: any
+
+    :param length: The length of each payload, if a buffer is given
+    :type length: int
+
+    :return: The payloads
+    :rtype: numpy.ndarray
+    """
+    if(isinstance(payloads, (bytes, bytearray, memoryview))):
+        payloads = np.frombuffer(payloads, dtype=np.uint8)
+    payloads = np.asarray(payloads, dtype=np.uint8)
+
+    if(payloads.ndim == 1):
+        if(length is None):
+            raise ValueError('The payload length is required to split a'
+                             ' buffer of payloads')
+        payloads = payloads.reshape(-1, length)
+    elif(payloads.ndim != 2):
+        raise ValueError(f'Expected a 2-D array of payloads, got'
+                         f' {payloads.ndim} dimensions')
+    return payloads
+
+
+def extract_field(field: PDOField,
+                  payloads: np.ndarray) -> (np.ndarray, np.ndarray):
+    """
+    Extract the raw value of a field from every payload, exactly as
+    `PDOField.decode` does for a single payload
+
+    The bytes of the field are read big-endian, masked and shifted, then
+    reordered to little-endian for the integer and floating point types.
+
+    :param field: The mapped object to extract
+    :type field: PDOField
+
+    :param payloads: The payloads, one row per frame
+    :type payloads: numpy.ndarray
+
+    :return: The big-endian and little-endian readings of the field
+    :rtype: (numpy.ndarray, numpy.ndarray)
+    """
+    end = payloads.shape[1] - field.offset
+    start = end - field.num_bytes
+    if(start < 0 or field.num_bytes > 8):
+        raise ValueError(f'{field.name} does not fit in payloads of'
+                         f' {payloads.shape[1]} bytes')
+
+    value = np.zeros(payloads.shape[0], dtype=np.uint64)
+    for i in range(start, end):
+        value = (value << np.uint64(8)) | payloads[:, i].astype(np.uint64)
+    value = (value & np.uint64(field.mask)) >> np.uint64(field.shift)
+
+    swapped = np.zeros(payloads.shape[0], dtype=np.uint64)
+    for i in range(field.num_bytes):
+        byte = (value >> np.uint64(8 * i)) & np.uint64(0xFF)
+        swapped |= byte << np.uint64(8 * (field.num_bytes - 1 - i))
+    return value, swapped
+
+
+def decode_field(field: PDOField, payloads: np.ndarray) -> np.ndarray:
+    """
+    Decode a field from every payload into a typed column
+
+    Integer, boolean and floating point fields are decoded with vectorized
+    shifts and masks, any other type falls back to an object column of the
+    strings `PDOField.decode` would give.
+
+    :param field: The mapped object to decode
+    :type field: PDOField
+
+    :param payloads: The payloads, one row per frame
+    :type payloads: numpy.ndarray
+
+    :return: The column of decoded values
+    :rtype: numpy.ndarray
+    """
+    data_type = field.data_type
+    num_bytes = field.num_bytes
+
+    if(data_type in DataType.UNSIGNED_INTEGERS.value):
+        _, value = extract_field(field, payloads)
+        return value.astype(UNSIGNED_DTYPES[num_bytes])
+    elif(data_type in DataType.SIGNED_INTEGERS.value):
+        _, value = extract_field(field, payloads)
+        bits = 8 * num_bytes
+        if(bits < 64):
+            sign = np.uint64(1 << (bits - 1))
+            value = (value ^ sign) - sign
+        return value.view(np.int64).astype(SIGNED_DTYPES[num_bytes])
+    elif(data_type == DataType.BOOLEAN.value):
+        _, value = extract_field(field, payloads)
+        return value > 0
+    elif(data_type in DataType.FLOATING_POINTS.value
+            and num_bytes in FLOAT_DTYPES):
+        _, value = extract_field(field, payloads)
+        value = value.astype(f'u{num_bytes}')
+        return value.view(FLOAT_DTYPES[num_bytes])
+
+    return np.array(list(map(lambda x: field.decode(bytes(x)), payloads)),
+                    dtype=object)
+
+
+def decode_batch(cob_id: int,
+                 payloads: any,
+                 eds: EDS,
+                 length: int = None) -> dict:
+    """
+    Decode many PDOs sent with the same COB ID into one column per mapped
+    object, using the decode plan compiled from the OD
+
+    :param cob_id: The COB ID the PDOs were sent with
+    :type cob_id: int
+
+    :param payloads: A 2-D array-like of payloads, or a contiguous buffer of
+        payloads of the same length
+    :type payloads: any
+
+    :param eds: The OD of the node sending or receiving the PDOs
+    :type eds: EDS
+
+    :param length: The length of each payload, if a buffer is given
+    :type length: int
+
+    :return: The decoded columns keyed by the name of the mapped object, in
+        the order they are displayed by `pdo.parse`
+    :rtype: dict
+
+    :raise ImportError: NumPy is not installed
+    :raise ValueError: The payloads do not match the mapping or the PDO is an
+        MPDO, which has no fixed mapping
+    """
+    if(np is None):
+        raise ImportError('Batch decoding requires NumPy, install it with'
+                          ' `pip install canopen-monitor[numpy]`')
+
+    payloads = as_payloads(payloads, length)
+    plan = get_plan(cob_id, eds)
+    if(plan.is_mpdo):
+        raise ValueError(f'{hex(cob_id)} is an MPDO and has no fixed mapping')
+
+    return {field.name: decode_field(field, payloads)
+            for field in plan.fields}
@@ -0,0 +1,288 @@
+"""Plugins decoding manufacturer specific objects and messages.
+
+A plugin is a function of a `PluginRegistry`, which registers the data types,
+objects and COB IDs it decodes with the registry. Installed packages provide
+plugins with an entry point in the `canopen_monitor.plugins` group, such as::
+
+    entry_points={
+        'canopen_monitor.plugins': [
+            'oresat = oresat_monitor.plugin:register',
+        ]
+    }
+
+Registrations are resolved once: objects when an OD is loaded, by setting
+their data types in the OD, and COB IDs when a `CANOpenParser` is created, by
+adding them to its dispatch table. Decoding a message then costs the same
+whether or not a plugin decodes it.
+"""
+from __future__ import annotations
+import logging
+from importlib.metadata import entry_points
+from typing import Union
+from .eds import DataType, OD
+from .utilities import data_type_decoders, register_data_type, \
+    unregister_data_type
+
+# Entry point group of installed plugins
+ENTRY_POINT_GROUP = 'canopen_monitor.plugins'
+
+# Index of the object holding the ECSS time of OreSat nodes
+ECSS_TIME_INDEX = 0x2101
+
+# Registries returned by `PluginRegistry.default`, keyed by whether ECSS time
+#   is enabled, so installed plugins are only loaded once per process
+_DEFAULT_REGISTRIES = {}
+
+
+class ObjectRegistration:
+    """
+    The data type given to an object of the ODs of some or all devices
+
+    :param index: The index of the object
+    :type index: int
+
+    :param subindex: The subindex of the object, or None for an object
+        without subindices
+    :type subindex: int
+
+    :param data_type: The data type to decode the object with
+    :type data_type: int or str
+
+    :param vendor_id: Only give the data type in the ODs of this vendor
+    :type vendor_id: int
+
+    :param product_code: Only give the data type in the ODs of this product
+    :type product_code: int
+    """
+    __slots__ = ['index', 'subindex', 'data_type', 'vendor_id',
+                 'product_code']
+
+    def __init__(self: ObjectRegistration,
+                 index: int,
+                 subindex: int,
+                 data_type: Union[int, str],
+                 vendor_id: int = None,
+                 product_code: int = None):
+        self.index = index
+        self.subindex = subindex
+        self.data_type = data_type
+        self.vendor_id = vendor_id
+        self.product_code = product_code
+
+    def matches(self: ObjectRegistration,
+                vendor_id: int,
+                product_code: int) -> bool:
+        """
+        Whether this registration applies to the OD of a device
+        """
+        return (self.vendor_id is None or self.vendor_id == vendor_id) \
+            and (self.product_code is None
+                 or self.product_code == product_code)
+
+
+class PluginRegistry:
+    """
+    The data types, objects and COB IDs registered by plugins
+
+    The data types registered are added to the decoder tables shared by
+    every OD, as the ODs refer to them by name, until `close()` removes them.
+    Registering a data type already in the tables, such as a CiA 301 data
+    type, is refused unless `replace` is set, or unless it is registered with
+    the same decoders, which does nothing.
+
+    :param plugins: Plugins to register, in addition to the installed plugins
+        loaded by `load_entry_points()`
+    :type plugins: [callable]
+    """
+
+    def __init__(self: PluginRegistry, plugins: [callable] = None):
+        self.objects = []
+        self.parsers = []
+        self.data_types = {}
+        for plugin in plugins or []:
+            plugin(self)
+
+    @classmethod
+    def default(cls: type, enable_ecss: bool = False) -> PluginRegistry:
+        """
+        Get the registry of the installed plugins, and of the built in plugins
+        enabled by the features
+
+        The installed plugins are loaded on the first call, later calls
+        return the same registry.
+
+        :param enable_ecss: Flag to enable ECSS time, defaults to False
+        :type enable_ecss: bool, optional
+        """
+        registry = _DEFAULT_REGISTRIES.get(enable_ecss)
+        if(registry is not None):
+            return registry
+
+        installed = _DEFAULT_REGISTRIES.get(False)
+        if(installed is None):
+            installed = cls()
+            installed.load_entry_points()
+            _DEFAULT_REGISTRIES[False] = installed
+        if(enable_ecss):
+            # The data types of the installed plugins are already registered
+            registry = cls([ecss_time])
+            registry.objects += installed.objects
+            registry.parsers += installed.parsers
+            _DEFAULT_REGISTRIES[True] = registry
+        return _DEFAULT_REGISTRIES[enable_ecss]
+
+    def load_entry_points(self: PluginRegistry) -> [str]:
+        """
+        Register every plugin installed with an entry point, plugins failing
+        to load are logged and skipped
+
+        :return: The names of the plugins registered
+        :rtype: [str]
+        """
+        found = entry_points()
+        if(hasattr(found, 'select')):
+            found = found.select(group=ENTRY_POINT_GROUP)
+        else:
+            found = found.get(ENTRY_POINT_GROUP, [])
+
+        names = []
+        for entry_point in found:
+            try:
+                entry_point.load()(self)
+                names.append(entry_point.name)
+            except Exception as e:
+                logging.warning(f'Failed to load plugin {entry_point.name}:'
+                                f' {e}')
+        return names
+
+    def register_data_type(self: PluginRegistry,
+                           data_type: Union[int, str],
+                           value_decoder: callable,
+                           renderer: callable = str,
+                           replace: bool = False) -> None:
+        """
+        Add a data type to decode objects with, see
+        `utilities.register_data_type`
+
+        :raise: ValueError: The data type is built in or registered already
+            with other decoders, and replace is not set
+        """
+        if(data_type_decoders(data_type) == (value_decoder, renderer)):
+            return
+        previous = register_data_type(data_type,
+                                      value_decoder,
+                                      renderer,
+                                      replace)
+        self.data_types.setdefault(data_type, previous)
+
+    def close(self: PluginRegistry) -> None:
+        """
+        Remove the data types registered from the decoder tables, restoring
+        any decoders they replaced
+        """
+        for data_type, previous in reversed(list(self.data_types.items())):
+            unregister_data_type(data_type, previous)
+        self.data_types = {}
+
+    def register_object(self: PluginRegistry,
+                        index: int,
+                        data_type: Union[int, str],
+                        subindex: int = None,
+                        vendor_id: int = None,
+                        product_code: int = None) -> None:
+        """
+        Decode an object as a data type, whatever its data type in the OD
+
+        :param index: The index of the object
+        :param data_type: The data type to decode the object with, either
+            from CiA 301 or added with `register_data_type()`
+        :param subindex: The subindex of the object, or None for an object
+            without subindices
+        :param vendor_id: Only decode the object of devices of this vendor,
+            defaults to every vendor
+        :param product_code: Only decode the object of devices of this
+            product, defaults to every product
+        """
+        self.objects.append(ObjectRegistration(index,
+                                               subindex,
+                                               data_type,
+                                               vendor_id,
+                                               product_code))
+
+    def register_parser(self: PluginRegistry,
+                        parse_function: callable,
+                        start: int,
+                        end: int = None,
+                        base: int = None) -> None:
+        """
+        Parse a range of COB IDs with a parse function, see
+        `CANOpenParser.register_parser`
+        """
+        self.parsers.append((parse_function, start, end, base))
+
+    def signature(self: PluginRegistry) -> tuple:
+        """
+        The object registrations, which change how ODs are loaded, to tell
+        apart ODs loaded with different plugins
+        """
+        return tuple((registration.index,
+                      registration.subindex,
+                      registration.data_type,
+                      registration.vendor_id,
+                      registration.product_code)
+                     for registration in self.objects)
+
+    def apply(self: PluginRegistry, od: OD) -> None:
+        """
+        Give the registered data types to the objects of an OD, this is done
+        when the OD is loaded
+        """
+        vendor_id, product_code = identity(od)
+        changed = False
+        for registration in self.objects:
+            if(not registration.matches(vendor_id, product_code)
+               or registration.index not in od):
+                continue
+
+            entry = od[registration.index]
+            if(registration.subindex is not None):
+                try:
+                    entry = entry[registration.subindex]
+                except KeyError:
+                    continue
+            entry.data_type = registration.data_type
+            changed = True
+
+        if(changed):
+            od.invalidate()
+
+    def install(self: PluginRegistry, parser: any) -> None:
+        """
+        Add the registered parse functions to the dispatch table of a
+        `CANOpenParser`, this is done when the parser is created
+        """
+        for parse_function, start, end, base in self.parsers:
+            parser.register_parser(parse_function, start, end, base)
+
+
+def identity(od: OD) -> (int, int):
+    """
+    Get the vendor ID and product code of the device of an OD, from its
+    device info
+
+    :return: The vendor ID and product code, each None if not known
+    """
+    values = []
+    for key in ['vendor_number', 'product_number']:
+        try:
+            values.append(int(str(getattr(od.device_info, key)), 0))
+        except (AttributeError, ValueError):
+            values.append(None)
+    return tuple(values)
+
+
+def ecss_time(registry: PluginRegistry) -> None:
+    """
+    Built in plugin decoding the time of OreSat nodes as ECSS SCET time
+    """
+    registry.register_object(ECSS_TIME_INDEX, DataType.ECSS_TIME.value)
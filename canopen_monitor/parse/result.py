@@ -0,0 +1,419 @@
+"""Typed results of parsing messages. Parsers return these instead of
+preformatted strings, so a message is only rendered when it is displayed, and
+the decoded values stay available for analysis.
+
+Messages failing validation are returned as a `ParseError` rather than raised,
+so a node flooding the bus with malformed messages costs no more to parse
+than a well behaved one.
+"""
+from __future__ import annotations
+from datetime import datetime
+from typing import List, Union
+from .utilities import FailedValidationError, format_bytes, render_value
+
+# Reasons for a message to fail validation
+INVALID_LENGTH = 'Invalid length'
+INVALID_COB_ID = 'Invalid COB ID'
+INVALID_STATE = 'Invalid state'
+INVALID_COMMAND = 'Invalid command'
+INVALID_MAPPING = 'Invalid mapping'
+INVALID_MESSAGE = 'Invalid message'
+
+
+class ParseResult:
+    """
+    The result of parsing a message, rendered to a string the first time it
+    is needed and cached from then on
+
+    Results are compared, hashed and tested for truth on their fields, so
+    none of these render them. A result also compares equal to the string it
+    renders to, which does render it. Since the hash of a result is not the
+    hash of its string, results and strings should not be mixed as keys.
+    """
+    __slots__ = ['__text']
+
+    def render(self: ParseResult) -> str:
+        """
+        Render the result as displayed, this is only called once
+        """
+        raise NotImplementedError
+
+    def key(self: ParseResult) -> tuple:
+        """
+        The fields the result is compared and hashed on
+        """
+        raise NotImplementedError
+
+    def __str__(self: ParseResult) -> str:
+        try:
+            return self.__text
+        except AttributeError:
+            self.__text = self.render()
+            return self.__text
+
+    def __eq__(self: ParseResult, other: any) -> bool:
+        if type(other) is type(self):
+            return self.key() == other.key()
+        if isinstance(other, str):
+            return str(self) == other
+        if isinstance(other, ParseResult):
+            return False
+        return NotImplemented
+
+    def __hash__(self: ParseResult) -> int:
+        return hash((type(self), self.key()))
+
+    def __bool__(self: ParseResult) -> bool:
+        return True
+
+    def __len__(self: ParseResult) -> int:
+        return len(str(self))
+
+    def __repr__(self: ParseResult) -> str:
+        return f'<{type(self).__name__} {str(self)!r}>'
+
+
+class ParsedField(ParseResult):
+    """
+    A single decoded object of a message
+
+    :param name: The name of the object in the OD
+    :type name: str
+
+    :param data_type: The data type of the object
+    :type data_type: int
+
+    :param value: The decoded value, such as an int, a float or a string
+    :type value: any
+    """
+    __slots__ = ['name', 'data_type', 'value']
+
+    def __init__(self: ParsedField, name: str, data_type: int, value: any):
+        self.name = name
+        self.data_type = data_type
+        self.value = value
+
+    @property
+    def text(self: ParsedField) -> str:
+        """
+        The value rendered according to its data type
+        """
+        return render_value(self.data_type, self.value)
+
+    def key(self: ParsedField) -> tuple:
+        return (self.name, self.data_type, self.value)
+
+    def render(self: ParsedField) -> str:
+        return f'{self.name} - {self.text}'
+
+
+class PDOResult(ParseResult):
+    """
+    The objects mapped in a PDO, in the order they are displayed
+
+    :param fields: The decoded objects
+    :type fields: [ParsedField]
+    """
+    __slots__ = ['fields']
+
+    def __init__(self: PDOResult, fields: [ParsedField]):
+        self.fields = fields
+
+    @property
+    def values(self: PDOResult) -> dict:
+        """
+        The decoded values keyed by the name of their object
+        """
+        return {field.name: field.value for field in self.fields}
+
+    def key(self: PDOResult) -> tuple:
+        return tuple(self.fields)
+
+    def render(self: PDOResult) -> str:
+        return ' '.join(map(str, self.fields))
+
+    def __bool__(self: PDOResult) -> bool:
+        return len(self.fields) > 0
+
+
+class SDOResult(ParseResult):
+    """
+    The state of an SDO transfer after one of its messages
+
+    :param action: What the message did, such as "Downloaded"
+    :type action: str
+
+    :param name: The name of the object transferred
+    :type name: str
+
+    :param field: The value transferred, for expedited transfers
+    :type field: ParsedField
+
+    :param suffix: Any text to add after the name
+    :type suffix: str
+    """
+    __slots__ = ['action', 'name', 'field', 'suffix']
+
+    def __init__(self: SDOResult,
+                 action: str,
+                 name: str,
+                 field: ParsedField = None,
+                 suffix: str = ''):
+        self.action = action
+        self.name = name
+        self.field = field
+        self.suffix = suffix
+
+    def key(self: SDOResult) -> tuple:
+        return (self.action, self.name, self.field, self.suffix)
+
+    def render(self: SDOResult) -> str:
+        if self.field is not None:
+            return f'{self.action} - {self.name}: {self.field.text}'
+        return f'{self.action} - {self.name}{self.suffix}'
+
+
+class SDOProgress(ParseResult):
+    """
+    The progress of an SDO transfer
+
+    :param name: The name of the object transferred, if known
+    :type name: str
+
+    :param progress: The fraction of the transfer done, or None if the size
+        of the transfer is not known
+    :type progress: float
+
+    :param precise: Whether to render the progress to one decimal
+    :type precise: bool
+    """
+    __slots__ = ['name', 'progress', 'precise']
+
+    def __init__(self: SDOProgress,
+                 name: str,
+                 progress: float,
+                 precise: bool = True):
+        self.name = name
+        self.progress = progress
+        self.precise = precise
+
+    def key(self: SDOProgress) -> tuple:
+        return (self.name, self.progress, self.precise)
+
+    def render(self: SDOProgress) -> str:
+        if self.progress is None:
+            percent = 'XXX'
+        elif self.precise:
+            percent = str(round(self.progress * 100, 1))
+        else:
+            percent = str(round(self.progress * 100))
+        if self.name is None:
+            return f'{percent}%'
+        return f'{self.name} {percent}%'
+
+
+class HBResult(ParseResult):
+    """
+    The state a node reports in its heartbeat
+
+    :param state: The state, such as 0x05 for Operational
+    :type state: int
+
+    :param name: The name of the state
+    :type name: str
+    """
+    __slots__ = ['state', 'name']
+
+    def __init__(self: HBResult, state: int, name: str):
+        self.state = state
+        self.name = name
+
+    def key(self: HBResult) -> tuple:
+        return (self.state,)
+
+    def render(self: HBResult) -> str:
+        return self.name
+
+
+class NMTResult(ParseResult):
+    """
+    An NMT command and the node it is sent to
+
+    :param command: The command specifier
+    :type command: int
+
+    :param name: The name of the command
+    :type name: str
+
+    :param node_id: The node the command is sent to, or 0 for every node
+    :type node_id: int
+    """
+    __slots__ = ['command', 'name', 'node_id']
+
+    def __init__(self: NMTResult, command: int, name: str, node_id: int):
+        self.command = command
+        self.name = name
+        self.node_id = node_id
+
+    @property
+    def target(self: NMTResult) -> str:
+        """
+        The node the command is sent to, as displayed
+        """
+        if self.node_id == 0:
+            return 'All nodes'
+        return f'Node {hex(self.node_id)}'
+
+    def key(self: NMTResult) -> tuple:
+        return (self.command, self.node_id)
+
+    def render(self: NMTResult) -> str:
+        return f'{self.name} - {self.target}'
+
+
+class SYNCResult(ParseResult):
+    """
+    A SYNC and the counter sent with it
+
+    :param counter: The SYNC counter, 0 if none was sent
+    :type counter: int
+    """
+    __slots__ = ['counter']
+
+    def __init__(self: SYNCResult, counter: int):
+        self.counter = counter
+
+    def key(self: SYNCResult) -> tuple:
+        return (self.counter,)
+
+    def render(self: SYNCResult) -> str:
+        return f'SYNC - {self.counter}'
+
+
+class TIMEResult(ParseResult):
+    """
+    The time sent in a TIME message
+
+    :param time: The time
+    :type time: datetime.datetime
+    """
+    __slots__ = ['time']
+
+    def __init__(self: TIMEResult, time: datetime):
+        self.time = time
+
+    def key(self: TIMEResult) -> tuple:
+        return (self.time,)
+
+    def render(self: TIMEResult) -> str:
+        return f"Time - {self.time.strftime('%m/%d/%Y %H:%M:%S.%f')}"
+
+
+class RawData(ParseResult):
+    """
+    The data of a message that was not parsed, rendered as hex bytes
+
+    :param data: The data of the message
+    :type data: bytes
+    """
+    __slots__ = ['data']
+
+    def __init__(self: RawData, data: Union[List[int], bytes]):
+        self.data = data
+
+    def key(self: RawData) -> tuple:
+        return tuple(self.data)
+
+    def render(self: RawData) -> str:
+        return format_bytes(self.data)
+
+    def __bool__(self: RawData) -> bool:
+        return len(self.data) > 0
+
+
+class ParseError(ParseResult):
+    """
+    A message that failed validation
+
+    The error message is only formatted, from its template and arguments,
+    when it is displayed. Errors found in the OD rather than in the message,
+    such as a broken PDO mapping, are cached and returned for every message
+    they affect.
+
+    :param reason: Why the message failed validation, such as
+        `INVALID_LENGTH`, used to count errors
+    :type reason: str
+
+    :param node_id: The node that sent the message
+    :type node_id: int
+
+    :param cob_id: The COB ID of the message
+    :type cob_id: int
+
+    :param parse_type: The parser the message failed in
+    :type parse_type: str
+
+    :param template: The error message, formatted with `args`
+    :type template: str
+    """
+    __slots__ = ['reason', 'node_id', 'cob_id', 'parse_type', 'template',
+                 'args']
+
+    def __init__(self: ParseError,
+                 reason: str,
+                 node_id: int,
+                 cob_id: int,
+                 parse_type: str,
+                 template: str,
+                 *args: any):
+        self.reason = reason
+        self.node_id = node_id
+        self.cob_id = cob_id
+        self.parse_type = parse_type
+        self.template = template
+        self.args = args
+
+    @classmethod
+    def from_exception(cls: type,
+                       exception: FailedValidationError,
+                       reason: str = INVALID_MESSAGE) -> ParseError:
+        """
+        Get the error record of a raised `FailedValidationError`
+        """
+        return cls(reason,
+                   exception.node_id,
+                   exception.cob_id,
+                   exception.parse_type,
+                   exception.message)
+
+    def exception(self: ParseError,
+                  data: Union[List[int], bytes]) -> FailedValidationError:
+        """
+        Get the `FailedValidationError` to raise for this error
+        """
+        return FailedValidationError(data,
+                                     self.node_id,
+                                     self.cob_id,
+                                     self.parse_type,
+                                     str(self))
+
+    def key(self: ParseError) -> tuple:
+        return (self.reason, self.node_id, self.cob_id, self.parse_type,
+                self.template, self.args)
+
+    def render(self: ParseError) -> str:
+        if self.args:
+            return self.template.format(*self.args)
+        return self.template
+
+
+def unwrap(result: ParseResult, data: Union[List[int], bytes]) -> ParseResult:
+    """
+    Raise the `FailedValidationError` of a `ParseError`, for the parse
+    functions which report errors by raising them
+
+    :return: The result, if it is not an error
+    """
+    if type(result) is ParseError:
+        raise result.exception(data)
+    return result
@@ -1,12 +1,56 @@
-import array
+import time
 from .eds import EDS
-from .utilities import FailedValidationError, get_name, decode, format_bytes
+from .result import ParsedField, SDOProgress, SDOResult
+from .utilities import FailedValidationError, get_name, decode_value, \
+    format_bytes
 from typing import List
 from ..can import MessageType
 
 SDO_TX = 'SDO_TX'
 SDO_RX = 'SDO_RX'
 
+# Number of data bytes carried by each segment
+SEGMENT_SIZE = 7
+
+# Largest indicated size preallocated up front, larger transfers grow the
+#   buffer as the data arrives instead of trusting the size indicated
+MAX_PREALLOCATION = 1 << 20
+
+
+def crc16_table(polynomial: int = 0x1021) -> List[int]:
+    """
+    Build the lookup table of the CRC-16-CCITT used by SDO block transfers,
+    one entry per value of the most significant byte of the CRC
+    """
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            if crc & 0x8000:
+                crc = ((crc << 1) ^ polynomial) & 0xFFFF
+            else:
+                crc = (crc << 1) & 0xFFFF
+        table.append(crc)
+    return table
+
+
+CRC16_TABLE = crc16_table()
+
+
+def crc16(data: bytes, crc: int = 0) -> int:
+    """
+    Continue the CRC-16-CCITT (polynomial 0x1021, initial value 0) of SDO
+    block transfers over more data
+
+    :param data: The next bytes of the data set
+    :param crc: The CRC of the data set so far
+    :return: The CRC of the data set including the new bytes
+    """
+    table = CRC16_TABLE
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ table[(crc >> 8) ^ byte]
+    return crc
+
 
 class SDOInitiateData:
     """
@@ -231,7 +275,7 @@ class SDOSegmentData:
         self.__toggle_bit = None
 
         self.__decode_first_section(raw_sdo[0])
-        self.__decode_data(raw_sdo[4:8])
+        self.__decode_data(raw_sdo[1:8])
 
     @property
     def more_segments(self):
@@ -260,10 +304,9 @@ class SDOSegmentData:
             self.__more_segments = True
 
     def __decode_data(self, byte_value: List[int]):
-        value = byte_value[0:6 - self.__n]
-        self.__data = int.from_bytes(value, "big").to_bytes(7, "big")
+        self.__data = bytes(byte_value[0:7 - self.__n])
         if self.__n > 0:
-            if int.from_bytes(byte_value[6 - self.__n:6], "big") > 0:
+            if int.from_bytes(byte_value[7 - self.__n:7], "big") > 0:
                 raise ValueError(f"Data value larger than size: "
                                  f"'{str(byte_value)}'")
 
@@ -764,7 +807,7 @@ otherwise CRC shall be set to 0.
 
     def __init__(self, raw_sdo: List[int]):
         self.__command_specifier = raw_sdo[0] & 0xE0
-        self.__n = raw_sdo[0] & 0x1C
+        self.__n = (raw_sdo[0] & 0x1C) >> 2
         self.__x = raw_sdo[0] & 0x02
         if self.__x > 0:
             raise ValueError(f"Invalid x value (1): '{str(self.__x)}'")
@@ -863,6 +906,15 @@ class SDOParser:
 
     Once the transfer is complete (is_complete() returns true) the object
     should be thrown away
+
+    The data transferred is reassembled in a single buffer, preallocated from
+    the indicated size when there is one. Block segments are written at the
+    offset given by their sequence number, so retransmitted segments overwrite
+    the ones they replace.
+
+    When both sides of a block transfer support it, the CRC of the data is
+    updated as each block is acknowledged and checked against the CRC sent at
+    the end of the transfer.
     """
 
     def __init__(self):
@@ -872,6 +924,15 @@ class SDOParser:
         self.__data_toggle = False
         self.__no_data_toggle = False
         self.__data = b''
+        self.__buffer = bytearray()
+        self.__received = 0
+        self.__block_offset = 0
+        self.__start_time = None
+        self.__supports_crc = None
+        self.__crc = 0
+        self.__crc_offset = 0
+        self.__crc_valid = None
+        self.__last_segment = False
         self.__is_complete = False
         self.__is_expedited = False
         self.__more_segments = True
@@ -881,13 +942,95 @@ class SDOParser:
         self.__block_size = 1
         self.__last_sequence = 0
         self.__awaiting_conf = False
+        self.__last_activity = time.monotonic()
 
     @property
     def is_complete(self):
         return self.__is_complete
 
+    @property
+    def name(self):
+        """The name of the object being transferred, if known yet"""
+        return self.__inProgressName
+
+    @property
+    def size(self):
+        """The size of the transfer in bytes, if it was indicated"""
+        return self.__dataSize
+
+    @property
+    def received(self):
+        """The number of bytes transferred so far"""
+        return self.__received
+
+    @property
+    def progress(self):
+        """The fraction of the indicated size transferred so far, if the size
+        was indicated"""
+        if not self.__dataSize:
+            return None
+        return min(self.__received, self.__dataSize) / self.__dataSize
+
+    @property
+    def throughput(self):
+        """The average rate of the transfer in bytes per second"""
+        if self.__start_time is None:
+            return 0.0
+        elapsed = self.__last_activity - self.__start_time
+        return self.__received / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def crc_valid(self):
+        """Whether the CRC of a block transfer matched, None if the CRC is
+        not known or was not used"""
+        return self.__crc_valid
+
+    @property
+    def payload(self):
+        """The data transferred so far, or all of it once complete"""
+        return bytes(memoryview(self.__buffer)[:self.__received])
+
+    def save(self, filepath: str) -> None:
+        """Write the data transferred to a file"""
+        with open(filepath, 'wb') as file:
+            file.write(memoryview(self.__buffer)[:self.__received])
+
+    @property
+    def idle_time(self):
+        """The number of seconds since the last message of the transfer"""
+        return time.monotonic() - self.__last_activity
+
+    def __set_size(self, size: int) -> None:
+        self.__dataSize = size
+        self.__buffer = bytearray(min(size, MAX_PREALLOCATION))
+
+    def __enable_crc(self, supports_crc: bool) -> None:
+        """Record whether one side of a block transfer supports CRC"""
+        self.__supports_crc = supports_crc \
+            if self.__supports_crc is None \
+            else self.__supports_crc and supports_crc
+
+    def __update_crc(self, end: int) -> None:
+        """Extend the CRC over the data acknowledged up to an offset"""
+        if end > self.__crc_offset:
+            self.__crc = crc16(self.__buffer[self.__crc_offset:end],
+                               self.__crc)
+            self.__crc_offset = end
+
+    def __write(self, offset: int, data: bytes) -> None:
+        """Write data at an offset of the reassembly buffer"""
+        if self.__start_time is None:
+            self.__start_time = self.__last_activity
+        if offset > len(self.__buffer):
+            # Segments were missed, leave a gap for them
+            self.__buffer.extend(bytes(offset - len(self.__buffer)))
+        end = offset + len(data)
+        self.__buffer[offset:end] = data
+        self.__received = max(self.__received, end)
+
     def parse(self, cob_id: int, data: List[int], eds: EDS):
         node_id = None
+        self.__last_activity = time.monotonic()
         try:
             if cob_id in range(*MessageType.SDO_TX.value):
                 sdo_type = SDO_TX
@@ -904,15 +1047,15 @@ class SDOParser:
                                             f"Invalid SDO payload length, "
                                             f"expected 8, received {len(data)}")
 
-            if self.__block_download:
+            if self.__awaiting_conf:
                 if self.__inProgressName is None:
                     self.__inProgressName = ""
-                return self.__parse_block_data(data)
+                return self.__parse_block_no_data(data)
 
-            if self.__awaiting_conf:
+            if self.__block_download:
                 if self.__inProgressName is None:
                     self.__inProgressName = ""
-                return self.__parse_block_no_data(data)
+                return self.__parse_block_data(data)
 
             command_specifier = data[0] & 0xE0
             if (sdo_type == SDO_RX and command_specifier == 0x20) or (
@@ -987,19 +1130,20 @@ class SDOParser:
 
         if current_download_initiate.is_expedited:
             self.__data = current_download_initiate.data
+            self.__write(0, bytes(self.__data))
             self.__is_expedited = True
             """If expedited SDO upload, this is complete"""
             if sdo_type == SDO_TX:
                 self.__is_complete = True
 
-            return f"Downloaded - {self.__inProgressName}: " \
-                   f"{decode(self.__inProgressType, self.__data)}"
+            return self.__downloaded()
 
         if current_download_initiate.size_indicator:
-            self.__dataSize = int.from_bytes(current_download_initiate.data,
-                                             "big")
+            self.__set_size(int.from_bytes(current_download_initiate.data,
+                                           "little"))
 
-        return "Initiating block download - " + self.__inProgressName
+        return SDOResult("Initiating block download",
+                         self.__inProgressName)
 
     def __parse_initiate_no_data(self, data, eds):
         current_download_initiate = SDOInitiateNoData(data)
@@ -1008,10 +1152,9 @@ class SDOParser:
 
         if self.__is_expedited:
             self.__is_complete = True
-            return f"Downloaded - {self.__inProgressName}: " \
-                   f"{decode(self.__inProgressType, self.__data)}"
+            return self.__downloaded()
 
-        return self.__inProgressName + " 0%"
+        return SDOProgress(self.__inProgressName, 0, precise=False)
 
     def __parse_segment_data(self, data, sdo_type):
         download_segment = SDOSegmentData(data)
@@ -1025,12 +1168,12 @@ class SDOParser:
                              f"{not self.__data_toggle} expected")
 
         self.__data_toggle = download_segment.toggle_bit
-        self.__data += download_segment.data
+        self.__write(self.__received, download_segment.data)
 
         if not download_segment.more_segments:
-            return "Block download done - " + self.__inProgressName
+            return SDOResult("Block download done", self.__inProgressName)
         else:
-            return "Block downloading - " + self.__inProgressName
+            return SDOResult("Block downloading", self.__inProgressName)
 
     def __parse_segment_no_data(self, data):
         download_segment = SDOSegmentNoData(data)
@@ -1040,16 +1183,21 @@ class SDOParser:
 
         self.__no_data_toggle = download_segment.toggle_bit
         if not self.__more_segments:
-            result = self.__inProgressName + " 100%"
             self.__is_complete = True
-            return result
+            return SDOProgress(self.__inProgressName, 1, precise=False)
         else:
-            if self.__dataSize is not None:
-                percent = len(data) / self.__dataSize
-                percent = str(round(percent * 100, 1))
-                return self.__inProgressName + " " + percent + "%"
-            else:
-                return self.__inProgressName + " XXX%"
+            return self.__format_progress()
+
+    def __format_progress(self):
+        return SDOProgress(self.__inProgressName, self.progress)
+
+    def __downloaded(self):
+        return SDOResult("Downloaded",
+                         self.__inProgressName,
+                         ParsedField(self.__inProgressName,
+                                     self.__inProgressType,
+                                     decode_value(self.__inProgressType,
+                                                  self.__data)))
 
     def __parse_block_initiate_data(self, data, eds):
         current_download_initiate = SDOBlockInitiateData(data)
@@ -1057,10 +1205,12 @@ class SDOParser:
             self.__set_name(eds, current_download_initiate.index)
 
         if current_download_initiate.size_indicated:
-            self.__dataSize = int.from_bytes(current_download_initiate.size,
-                                             "big")
+            self.__set_size(int.from_bytes(current_download_initiate.size,
+                                           "little"))
+        self.__enable_crc(current_download_initiate.supports_crc)
 
-        return "Initiating block download - " + self.__inProgressName
+        return SDOResult("Initiating block download",
+                         self.__inProgressName)
 
     def __parse_block_initiate_no_data(self, data, eds):
         current_download_initiate = SDOBlockInitiateNoData(data)
@@ -1068,8 +1218,9 @@ class SDOParser:
             self.__set_name(eds, current_download_initiate.index)
 
         self.__block_size = current_download_initiate.blksize
+        self.__enable_crc(current_download_initiate.supports_crc)
 
-        return self.__inProgressName + " 0%"
+        return SDOProgress(self.__inProgressName, 0, precise=False)
 
     def __parse_block_upload_initiate_no_data(self, data, eds):
         current_download_initiate = SDOBlockUploadInitiateNoData(data)
@@ -1077,40 +1228,63 @@ class SDOParser:
             self.__set_name(eds, current_download_initiate.index)
 
         self.__block_size = current_download_initiate.blksize
+        self.__enable_crc(current_download_initiate.supports_crc)
 
-        return self.__inProgressName + " 0%"
+        return SDOProgress(self.__inProgressName, 0, precise=False)
 
     def __parse_block_data(self, data):
         download_segment = SDOBlockSegmentData(data)
         self.__block_download = download_segment.more_segments
         self.__last_sequence = download_segment.seqno
+        self.__last_segment = not download_segment.more_segments
 
-        if self.__last_sequence % self.__block_size == 0:
+        if self.__last_sequence % self.__block_size == 0 or \
+                not download_segment.more_segments:
             self.__awaiting_conf = True
 
-        self.__data += array.array('B', download_segment.data)
+        offset = self.__block_offset \
+            + (download_segment.seqno - 1) * SEGMENT_SIZE
+        self.__write(offset, bytes(download_segment.data))
 
-        return "Block downloading - " + self.__inProgressName
+        return SDOResult("Block downloading", self.__inProgressName)
 
     def __parse_block_no_data(self, data):
-        # download_segment = SDOBlockSegmentNoData(data)  # Unused
+        download_segment = SDOBlockSegmentNoData(data)
         self.__awaiting_conf = False
         if not self.__last_sequence:
             self.__block_download = True
 
-        if self.__dataSize is not None:
-            percent = str(round((len(data) / self.__dataSize) * 100, 1))
-            return self.__inProgressName + " " + percent + "%"
+        # Segments after the last one acknowledged are sent again in the next
+        #   block, starting over from sequence number 1
+        self.__block_offset += download_segment.ackseq * SEGMENT_SIZE
+        self.__received = self.__block_offset
+        if download_segment.ackseq < self.__last_sequence:
+            self.__block_download = True
+            self.__last_segment = False
+        if download_segment.blksize > 0:
+            self.__block_size = download_segment.blksize
+
+        # The padding of the last segment is only known at the end of the
+        #   transfer, so it is left out of the CRC until then
+        if self.__last_segment:
+            self.__update_crc(self.__block_offset - SEGMENT_SIZE)
         else:
-            return self.__inProgressName + " XXX%"
+            self.__update_crc(self.__block_offset)
+
+        return self.__format_progress()
 
     def __parse_block_end_data(self, data):
-        # download_segment = SDOBlockEndData(data)  # Unused
+        download_segment = SDOBlockEndData(data)
 
-        if self.__inProgressName is not None:
-            return self.__inProgressName + " 100%"
-        else:
-            return "100%"
+        # The last segment may be padded with bytes that do not contain data
+        self.__received = max(0, self.__received - download_segment.n)
+
+        if self.__supports_crc:
+            self.__update_crc(self.__received)
+            self.__crc_valid = self.__crc == \
+                int.from_bytes(download_segment.crc, "little")
+
+        return SDOProgress(self.__inProgressName, 1, precise=False)
 
     def __parse_block_end_no_data(self, data):
         download_segment = SDOBlockEndNoData(data)
@@ -1118,11 +1292,20 @@ class SDOParser:
         """On upload confirmation"""
         if download_segment.subcommand == 3:
             self.__block_download = True
-            return "Initiating block download - " + self.__inProgressName
+            return SDOResult("Initiating block download",
+                             self.__inProgressName)
 
         self.__is_complete = True
 
-        return "Block download done - " + self.__inProgressName
+        if self.__crc_valid is False:
+            raise ValueError(f"CRC mismatch on block transfer of "
+                             f"{self.__inProgressName}, calculated "
+                             f"{hex(self.__crc)}")
+        elif self.__crc_valid:
+            return SDOResult("Block download done",
+                             self.__inProgressName,
+                             suffix=" (CRC OK)")
+        return SDOResult("Block download done", self.__inProgressName)
 
     def __set_name(self, eds, index: List[int]):
         try:
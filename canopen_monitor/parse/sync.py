@@ -1,10 +1,236 @@
+import time
+from collections import deque
 from .eds import EDS
-from .utilities import FailedValidationError, decode, DataType
+from .result import INVALID_LENGTH, ParseError, SYNCResult, unwrap
+from .utilities import decode_value, DataType, object_value
+from ..can import MessageType
+
+# Object indices of the SYNC parameters and TPDO communication parameters in
+#   the OD
+SYNC_WINDOW_LENGTH = 0x1007
+TPDO1_COMMUNICATION = 0x1800
+TRANSMISSION_TYPE_SUBINDEX = 2
+
+# Transmission types of TPDOs sent every 1 to 240 SYNCs
+SYNCHRONOUS_TRANSMISSION_TYPES = range(1, 241)
+
+TPDO_TYPES = [MessageType.PDO1_TX,
+              MessageType.PDO2_TX,
+              MessageType.PDO3_TX,
+              MessageType.PDO4_TX]
+
+# Gains of the smoothed SYNC period and jitter, as for round trip times in
+#   RFC 6298
+PERIOD_GAIN = 1 / 8
+JITTER_GAIN = 1 / 4
+
+# Number of completed SYNC cycles kept by a `SyncCycleAssembler`
+SYNC_CYCLE_HISTORY = 64
 
 
 def parse(cob_id: int, data: bytes, eds: EDS):
+    return unwrap(try_parse(cob_id, data, eds), data)
+
+
+def try_parse(cob_id: int, data: bytes, eds: EDS):
+    """
+    Parse a SYNC message, returning a `ParseError` rather than raising it
+    """
     if len(data) > 1:
-        raise FailedValidationError(data, cob_id, cob_id, __name__,
-                                    f'SYNC message is outside of bounds '
-                                    f'limit of 1 byte, {len(data)} provided')
-    return f'SYNC - {decode(DataType.UNSIGNED8.value, data)}'
+        return ParseError(INVALID_LENGTH, cob_id, cob_id, __name__,
+                          'SYNC message is outside of bounds limit of 1 '
+                          'byte, {} provided', len(data))
+    return SYNCResult(decode_value(DataType.UNSIGNED8.value, data))
+
+
+def synchronous_pdos(eds_configs: dict) -> dict:
+    """
+    Get the transmission type of every synchronous TPDO, from the TPDO
+    communication parameters in the ODs
+
+    The ODs of the extended PDO definitions of a node, keyed by the node ID
+    plus an offset, use the communication parameters after the first four.
+
+    :return: The number of SYNCs between two of each TPDO, keyed by COB ID
+    """
+    pdos = {}
+    for node_id, eds in eds_configs.items():
+        if node_id is None:
+            continue
+        offset = node_id - eds.node_id \
+            if isinstance(eds.node_id, int) else 0
+        for i, msg_type in enumerate(TPDO_TYPES):
+            try:
+                transmission_type = object_value(
+                    eds[hex(TPDO1_COMMUNICATION + offset * len(TPDO_TYPES)
+                            + i)]
+                    [TRANSMISSION_TYPE_SUBINDEX])
+            except KeyError:
+                continue
+            if transmission_type in SYNCHRONOUS_TRANSMISSION_TYPES:
+                pdos[msg_type.start + node_id] = transmission_type
+    return pdos
+
+
+def synchronous_window(eds_configs: dict) -> float:
+    """
+    Get the shortest synchronous window length of the ODs, in seconds
+
+    :return: The window, or None if no OD sets one
+    """
+    windows = []
+    for node_id, eds in eds_configs.items():
+        try:
+            window = object_value(eds[hex(SYNC_WINDOW_LENGTH)])
+        except KeyError:
+            continue
+        if window:
+            windows.append(window)
+    return min(windows) / 1000000 if windows else None
+
+
+class SyncCycle:
+    """
+    The synchronous PDOs received between two SYNCs, a snapshot of the
+    process image of the network
+
+    :param number: The number of the cycle, counting from the first SYNC
+    :type number: int
+
+    :param counter: The SYNC counter sent with the SYNC, if any
+    :type counter: int
+
+    :param timestamp: When the SYNC was received
+    :type timestamp: float
+    """
+    __slots__ = ['number', 'counter', 'timestamp', 'pdos', 'late', 'missed']
+
+    def __init__(self, number: int, counter: int, timestamp: float):
+        self.number = number
+        self.counter = counter
+        self.timestamp = timestamp
+        self.pdos = {}
+        self.late = []
+        self.missed = []
+
+    @property
+    def values(self) -> dict:
+        """
+        The decoded values of every PDO of the cycle keyed by the name of
+        their object
+        """
+        values = {}
+        for pdo in self.pdos.values():
+            values.update(getattr(pdo, 'values', {}))
+        return values
+
+    def __repr__(self) -> str:
+        return f'<SyncCycle {self.number} pdos={len(self.pdos)}' \
+            f' late={len(self.late)} missed={len(self.missed)}>'
+
+
+class SyncCycleAssembler:
+    """
+    Groups the synchronous PDOs received after each SYNC into a `SyncCycle`,
+    measures the SYNC period and jitter, and notices PDOs arriving late or
+    missing a cycle
+
+    Each PDO is expected again as many cycles after it was received as its
+    transmission type. The PDOs due in a cycle are kept in a bucket for the
+    cycle, so a PDO costs O(1) and closing a cycle only visits the PDOs due
+    in it.
+
+    :param pdos: The transmission type of every synchronous PDO, keyed by
+        COB ID, see `synchronous_pdos`
+    :type pdos: dict
+
+    :param window: The time after a SYNC in which synchronous PDOs are sent,
+        in seconds, PDOs are late after it, defaults to the SYNC period
+    :type window: float
+    """
+
+    def __init__(self, pdos: dict, window: float = None):
+        self.pdos = pdos
+        self.window = window
+        self.period = None
+        self.jitter = None
+        self.cycle = None
+        self.cycles = deque(maxlen=SYNC_CYCLE_HISTORY)
+        self.__due = {}
+        self.__buckets = {}
+        self.__pending = []
+
+    def sync(self, counter: int = None, now: float = None) -> SyncCycle:
+        """
+        Record a SYNC, closing the current cycle and starting the next
+
+        :return: The closed cycle, or None for the first SYNC
+        """
+        now = time.monotonic() if now is None else now
+        closed = self.cycle
+        if closed is not None:
+            self.__close(closed)
+            self.__measure(now - closed.timestamp)
+        number = closed.number + 1 if closed is not None else 0
+        self.cycle = SyncCycle(number, counter, now)
+        return closed
+
+    def pdo(self, cob_id: int, result: any, now: float = None) -> bool:
+        """
+        Record a synchronous PDO in the current cycle
+
+        :return: Whether the PDO is late
+        """
+        cycle = self.cycle
+        transmission_type = self.pdos.get(cob_id)
+        if cycle is None or transmission_type is None:
+            return False
+
+        now = time.monotonic() if now is None else now
+        cycle.pdos[cob_id] = result
+        self.__schedule(cob_id, cycle.number + transmission_type)
+
+        limit = self.window if self.window is not None else self.period
+        late = limit is not None and now - cycle.timestamp > limit
+        if late:
+            cycle.late.append(cob_id)
+            self.__pending.append((cob_id,
+                                   f'Late for SYNC cycle {cycle.number}'))
+        return late
+
+    def poll(self) -> [(int, str)]:
+        """
+        Get the PDOs flagged since the last poll
+
+        :return: The COB IDs of the PDOs and the errors to flag them with
+        """
+        pending = self.__pending
+        self.__pending = []
+        return pending
+
+    def __schedule(self, cob_id: int, number: int) -> None:
+        previous = self.__due.get(cob_id)
+        if previous is not None:
+            self.__buckets[previous].discard(cob_id)
+        self.__due[cob_id] = number
+        self.__buckets.setdefault(number, set()).add(cob_id)
+
+    def __close(self, cycle: SyncCycle) -> None:
+        for cob_id in self.__buckets.pop(cycle.number, ()):
+            del self.__due[cob_id]
+            if cob_id in cycle.pdos:
+                continue
+            cycle.missed.append(cob_id)
+            self.__pending.append((cob_id,
+                                   f'Missed SYNC cycle {cycle.number}'))
+            self.__schedule(cob_id, cycle.number + self.pdos[cob_id])
+        self.cycles.append(cycle)
+
+    def __measure(self, interval: float) -> None:
+        if self.period is None:
+            self.period = interval
+            self.jitter = interval / 2
+            return
+        self.jitter += (abs(interval - self.period) - self.jitter) \
+            * JITTER_GAIN
+        self.period += (interval - self.period) * PERIOD_GAIN
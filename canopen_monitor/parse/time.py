@@ -2,7 +2,7 @@ import datetime
 from typing import List
 
 from .eds import EDS
-from .utilities import FailedValidationError
+from .result import INVALID_LENGTH, ParseError, TIMEResult, unwrap
 
 """
 the Time-Stamp object represents an absolute time in milliseconds after
@@ -12,9 +12,16 @@ of length 48 (6 bytes).
 
 
 def parse(cob_id: int, data: List[int], eds: EDS):
+    return unwrap(try_parse(cob_id, data, eds), data)
+
+
+def try_parse(cob_id: int, data: List[int], eds: EDS):
+    """
+    Parse a TIME message, returning a `ParseError` rather than raising it
+    """
     if len(data) != 6:
-        raise FailedValidationError(data, cob_id, cob_id, __name__,
-                                    "Invalid TIME message length")
+        return ParseError(INVALID_LENGTH, cob_id, cob_id, __name__,
+                          "Invalid TIME message length")
 
     milliseconds = int.from_bytes(data[0:4], "little")
     days = int.from_bytes(data[4:6], "little")
@@ -22,4 +29,4 @@ def parse(cob_id: int, data: List[int], eds: EDS):
     date = datetime.datetime(1984, 1, 1, 0, 0, 0) \
         + datetime.timedelta(days=days, milliseconds=milliseconds)
 
-    return f"Time - {date.strftime('%m/%d/%Y %H:%M:%S.%f')}"
+    return TIMEResult(date)
@@ -1,9 +1,9 @@
 from __future__ import annotations
-import array
 from datetime import datetime, timedelta
-from struct import unpack
+from functools import partial
+from struct import Struct
 from typing import List, Union
-from .eds import DataType, EDS
+from .eds import DataType, EDS, convert_data_type
 
 
 class FailedValidationError(Exception):
@@ -40,6 +40,31 @@ class FailedValidationError(Exception):
 def get_name(eds_config: EDS, index: Union[List[int], bytes]) -> (str, str):
     """
     Get the name and data type for a given index
+
+    The name is found with a single lookup in the map of names of the OD, any
+    index not in the map is looked up again by `lookup_name` to raise the
+    same errors it always has
+    :param eds_config: An EDS file for the current node
+    :param index: the index and subindex to retrieve data from
+                  expected to be length 3. (not validated)
+    :return: (str, str): a tuple containing the name and data type as a string
+    :raise: IndexError: The index or subindex failed to find a value in the
+    provided OD file
+    :raise: ValueError: The provided index/subindex does not contain a
+    parameter_name and data_type attribute
+    """
+    try:
+        return eds_config.names[(index[0] << 16)
+                                | (index[1] << 8)
+                                | index[2]]
+    except (AttributeError, KeyError, IndexError, TypeError):
+        return lookup_name(eds_config, index)
+
+
+def lookup_name(eds_config: EDS,
+                index: Union[List[int], bytes]) -> (str, str):
+    """
+    Get the name and data type for a given index, by searching the OD
     :param eds_config: An EDS file for the current node
     :param index: the index and subindex to retrieve data from
                   expected to be length 3. (not validated)
@@ -65,60 +90,6 @@ def get_name(eds_config: EDS, index: Union[List[int], bytes]) -> (str, str):
     return defined_type, result
 
 
-def decode(defined_type: Union[str, DataType], data: List[int]) -> str:
-    """
-    Decodes data by defined type
-    :param defined_type: Hex constant for type
-    :param data: list of ints to be decoded
-    :return: Decoded data as string
-    :raise: ValueError: Indicates datatype provided is not supported
-    """
-    if defined_type in DataType.UNSIGNED_INTEGERS.value:
-        result = str(int.from_bytes(data, byteorder="little", signed=False))
-    elif defined_type in DataType.SIGNED_INTEGERS.value:
-        result = str(int.from_bytes(data, byteorder="little", signed=True))
-    elif defined_type == DataType.BOOLEAN.value:
-        if int.from_bytes(data, byteorder="little", signed=False) > 0:
-            result = str(True)
-        else:
-            result = str(False)
-    elif defined_type in DataType.FLOATING_POINTS.value:
-        data = array.array('B', data).tobytes()
-        result = str(unpack('>f', data)[0])
-    elif defined_type == DataType.VISIBLE_STRING.value:
-        data = array.array('B', data).tobytes()
-        result = data.decode('utf-8')
-    elif defined_type == DataType.OCTET_STRING.value:
-        data = list(map(lambda x: hex(x)[2:].rjust(2, '0'), data))
-        result = '0x' + ''.join(data)
-    elif defined_type == DataType.UNICODE_STRING.value:
-        data = array.array('B', data).tobytes()
-        result = data.decode('utf-16-be')
-    elif defined_type == DataType.TIME_OF_DAY.value:
-        delta = get_time_values(data)
-        date = datetime(1984, 1, 1) + delta
-        result = date.isoformat()
-    elif defined_type == DataType.TIME_DIFFERENCE.value:
-        result = str(get_time_values(data))
-    elif defined_type in DataType.NON_FORMATTED.value:
-        result = format_bytes(data)
-    elif defined_type == DataType.ECSS_TIME.value:
-        # This is ECSS SCET Time
-        # data[0:4]: Fine Time: Microseconds
-        # data[4:8]: Coarse Time: Seconds
-        coarse = data[4:8]
-        fine = int.from_bytes(data[:4], byteorder="little", signed=False)
-        coarse = int.from_bytes(data[4:8], byteorder="little", signed=False)
-        delta = timedelta(seconds=coarse, microseconds=fine)
-        date = datetime(1970, 1, 1) + delta
-        result = date.isoformat()
-    else:
-        raise ValueError(f"Invalid data type {defined_type}. "
-                         f"Unable to decode data {str(data)}")
-
-    return result
-
-
 def get_time_values(data: [int]) -> timedelta:
     # Component ms is the time in milliseconds after midnight. Component
     # days is the number of days since January 1, 1984.
@@ -135,3 +106,287 @@ def format_bytes(data: Union[List[int], bytes]) -> str:
                              .upper()
                              .rjust(2, '0'),
                              data)))
+
+
+def object_value(entry: any) -> Union[int, None]:
+    """
+    Get the integer value of an object of an OD, its parameter value if it
+    has one, otherwise its default value
+    :param entry: An index or subindex of the OD
+    :return: The value, or None if the object has no numeric value, such as a
+    value relative to $NODEID
+    """
+    value = getattr(entry, 'parameter_value', None)
+    if value is None:
+        value = getattr(entry, 'default_value', None)
+    if isinstance(value, str):
+        try:
+            return int(value, 0)
+        except ValueError:
+            return None
+    return value
+
+
+def integer_decoder(size: int, signed: bool) -> callable:
+    """
+    Get a function decoding a little-endian integer of a number of bytes,
+    using a precompiled struct for the sizes struct supports. Data of any
+    other length is decoded whole, as it always has been.
+    :param size: The size of the integer in bytes
+    :param signed: Whether the integer is signed
+    :return: A function of the data to be decoded returning an int
+    """
+    code = {1: 'b', 2: 'h', 4: 'i', 8: 'q'}.get(size)
+    if code is None:
+        return lambda data: int.from_bytes(data, "little", signed=signed)
+
+    unpack = Struct('<' + (code if signed else code.upper())).unpack
+
+    def decoder(data: Union[List[int], bytes]) -> int:
+        if len(data) == size:
+            try:
+                return unpack(data)[0]
+            except TypeError:
+                # Data given as a list of ints
+                pass
+        return int.from_bytes(data, "little", signed=signed)
+    return decoder
+
+
+def float_decoder(code: str) -> callable:
+    """
+    Get a function decoding a little-endian IEEE 754 float with a
+    precompiled struct
+    :param code: The struct format of the float
+    :return: A function of the data to be decoded returning a float
+    """
+    unpack = Struct(code).unpack
+    return lambda data: unpack(bytes(data))[0]
+
+
+def decode_time_of_day(data: List[int]) -> datetime:
+    return datetime(1984, 1, 1) + get_time_values(data)
+
+
+def decode_ecss_time(data: List[int]) -> datetime:
+    # This is ECSS SCET Time
+    # data[0:4]: Fine Time: Microseconds
+    # data[4:8]: Coarse Time: Seconds
+    fine = int.from_bytes(data[:4], byteorder="little", signed=False)
+    coarse = int.from_bytes(data[4:8], byteorder="little", signed=False)
+    return datetime(1970, 1, 1) + timedelta(seconds=coarse,
+                                            microseconds=fine)
+
+
+# Sizes in bytes of every integer type, CiA 301 section 7.1.4
+INTEGER_SIZES = {
+    DataType.INTEGER8.value: (1, True),
+    DataType.INTEGER16.value: (2, True),
+    DataType.INTEGER24.value: (3, True),
+    DataType.INTEGER32.value: (4, True),
+    DataType.INTEGER40.value: (5, True),
+    DataType.INTEGER48.value: (6, True),
+    DataType.INTEGER56.value: (7, True),
+    DataType.INTEGER64.value: (8, True),
+    DataType.UNSIGNED8.value: (1, False),
+    DataType.UNSIGNED16.value: (2, False),
+    DataType.UNSIGNED24.value: (3, False),
+    DataType.UNSIGNED32.value: (4, False),
+    DataType.UNSIGNED40.value: (5, False),
+    DataType.UNSIGNED48.value: (6, False),
+    DataType.UNSIGNED56.value: (7, False),
+    DataType.UNSIGNED64.value: (8, False),
+}
+
+# Functions decoding data to its native value, keyed by data type
+VALUE_DECODERS = {
+    DataType.BOOLEAN.value: any,
+    DataType.REAL32.value: float_decoder('<f'),
+    DataType.REAL64.value: float_decoder('<d'),
+    DataType.VISIBLE_STRING.value: lambda data: bytes(data).decode('utf-8'),
+    DataType.OCTET_STRING.value: bytes,
+    DataType.UNICODE_STRING.value:
+        lambda data: bytes(data).decode('utf-16-be'),
+    DataType.TIME_OF_DAY.value: decode_time_of_day,
+    DataType.TIME_DIFFERENCE.value: get_time_values,
+    DataType.ECSS_TIME.value: decode_ecss_time,
+}
+VALUE_DECODERS.update({data_type: integer_decoder(*size)
+                       for data_type, size in INTEGER_SIZES.items()})
+VALUE_DECODERS.update({data_type: bytes
+                       for data_type in DataType.NON_FORMATTED.value})
+
+# Functions rendering native values as strings, for the types not rendered by
+#   `str`
+RENDERERS = {
+    DataType.VISIBLE_STRING.value: None,
+    DataType.UNICODE_STRING.value: None,
+    DataType.OCTET_STRING.value: lambda value: '0x' + value.hex(),
+    DataType.TIME_OF_DAY.value: datetime.isoformat,
+    DataType.ECSS_TIME.value: datetime.isoformat,
+}
+RENDERERS.update({data_type: format_bytes
+                  for data_type in DataType.NON_FORMATTED.value})
+
+
+def string_decoder(data_type: Union[int, str]) -> callable:
+    """
+    Compose the value decoder of a data type with its renderer
+    :param data_type: The data type code
+    :return: A function of the data to be decoded returning a string
+    """
+    decoder = VALUE_DECODERS[data_type]
+    renderer = RENDERERS.get(data_type, str)
+    if renderer is None:
+        return decoder
+    return lambda data: renderer(decoder(data))
+
+
+# Functions decoding data to a string, keyed by data type
+DECODERS = {data_type: string_decoder(data_type)
+            for data_type in VALUE_DECODERS}
+
+
+# Data types decoded by the built in decoders
+BUILTIN_DATA_TYPES = frozenset(VALUE_DECODERS)
+
+
+def register_data_type(data_type: Union[int, str],
+                       value_decoder: callable,
+                       renderer: callable = str,
+                       replace: bool = False) -> tuple:
+    """
+    Add a data type to the decoder tables, or replace the decoders of one
+
+    :param data_type: The data type code, or a name for data types outside of
+        CiA 301 such as `DataType.ECSS_TIME`, names must not be valid hex
+    :param value_decoder: A function of the data returning its native value
+    :param renderer: A function of the native value returning it as a
+        string, or None if the native value already is a string
+    :param replace: Whether to replace the decoders of a data type already
+        in the tables, such as a built in data type
+    :return: The value decoder and renderer replaced, or None, to restore
+        with `unregister_data_type`
+    :raise: ValueError: The data type is already in the tables and replace
+        is not set
+    """
+    previous = None
+    if data_type in VALUE_DECODERS:
+        if not replace:
+            kind = 'built in' if data_type in BUILTIN_DATA_TYPES \
+                else 'already registered'
+            raise ValueError(f'Data type {data_type} is {kind}, set replace'
+                             ' to replace its decoders')
+        previous = (VALUE_DECODERS[data_type],
+                    RENDERERS.get(data_type, str))
+
+    VALUE_DECODERS[data_type] = value_decoder
+    if renderer is str:
+        RENDERERS.pop(data_type, None)
+    else:
+        RENDERERS[data_type] = renderer
+    DECODERS[data_type] = string_decoder(data_type)
+    return previous
+
+
+def data_type_decoders(data_type: Union[int, str]) -> tuple:
+    """
+    Get the decoders of a data type in the decoder tables
+
+    :param data_type: The data type code or name
+    :return: The value decoder and renderer, as given to
+        `register_data_type`, or None if the data type is not in the tables
+    """
+    if data_type not in VALUE_DECODERS:
+        return None
+    return VALUE_DECODERS[data_type], RENDERERS.get(data_type, str)
+
+
+def unregister_data_type(data_type: Union[int, str],
+                         previous: tuple = None) -> None:
+    """
+    Remove a data type added with `register_data_type`, or restore the
+    decoders it replaced
+
+    :param data_type: The data type code or name
+    :param previous: The value decoder and renderer returned by
+        `register_data_type`, or None if the data type was added
+    """
+    if previous is not None:
+        register_data_type(data_type, *previous, replace=True)
+        return
+    VALUE_DECODERS.pop(data_type, None)
+    RENDERERS.pop(data_type, None)
+    DECODERS.pop(data_type, None)
+
+
+def render_value(defined_type: Union[int, str, DataType], value: any) -> str:
+    """
+    Render a value decoded by `decode_value` as `decode` would
+    :param defined_type: Hex constant for type
+    :param value: The decoded value
+    :return: The value as a string
+    """
+    if defined_type not in VALUE_DECODERS:
+        defined_type = convert_data_type(defined_type)
+    renderer = RENDERERS.get(defined_type, str)
+    return value if renderer is None else renderer(value)
+
+
+def get_value_decoder(defined_type: Union[int, str, DataType]) -> callable:
+    """
+    Get a function decoding data of a defined type to its native value
+    :param defined_type: Hex constant for type
+    :return: A function of the data to be decoded, which raises a ValueError
+    if the type is not supported
+    """
+    return VALUE_DECODERS.get(defined_type) \
+        or VALUE_DECODERS.get(convert_data_type(defined_type)) \
+        or partial(decode_value, defined_type)
+
+
+def get_decoder(defined_type: Union[int, str, DataType]) -> callable:
+    """
+    Get a function decoding data of a defined type to a string
+    :param defined_type: Hex constant for type
+    :return: A function of the data to be decoded returning a string, which
+    raises a ValueError if the type is not supported
+    """
+    return DECODERS.get(defined_type) \
+        or DECODERS.get(convert_data_type(defined_type)) \
+        or partial(decode, defined_type)
+
+
+def decode(defined_type: Union[int, str, DataType],
+           data: List[int]) -> str:
+    """
+    Decodes data by defined type
+    :param defined_type: Hex constant for type
+    :param data: list of ints to be decoded
+    :return: Decoded data as string
+    :raise: ValueError: Indicates datatype provided is not supported
+    """
+    decoder = DECODERS.get(defined_type) \
+        or DECODERS.get(convert_data_type(defined_type))
+    if decoder is None:
+        raise ValueError(f"Invalid data type {defined_type}. "
+                         f"Unable to decode data {str(data)}")
+    return decoder(data)
+
+
+def decode_value(defined_type: Union[int, str, DataType],
+                 data: List[int]) -> any:
+    """
+    Decodes data by defined type to its native value, such as an int, a
+    float or a datetime, rather than a string
+    :param defined_type: Hex constant for type
+    :param data: list of ints to be decoded
+    :return: Decoded value
+    :raise: ValueError: Indicates datatype provided is not supported
+    """
+    decoder = VALUE_DECODERS.get(defined_type) \
+        or VALUE_DECODERS.get(convert_data_type(defined_type))
+    if decoder is None:
+        raise ValueError(f"Invalid data type {defined_type}. "
+                         f"Unable to decode data {str(data)}")
+    return decoder(data)
@@ -5,11 +5,13 @@ from .pane import Pane
 from .colum import Column
 from .windows import PopupWindow, InputPopup, SelectionPopup
 from .message_pane import MessagePane
+from .emcy_pane import EMCYPane
 
 __all__ = [
     "Pane",
     "Column",
     "MessagePane",
+    "EMCYPane",
     "PopupWindow",
     "InputPopup",
     "SelectionPopup",
@@ -2,15 +2,36 @@ from __future__ import annotations
 
 
 class Column:
+    """A single column of a `MessagePane`
+
+    :param name: The column header
+    :type name: str
+
+    :param attr_name: The name of the attribute of the row to display
+    :type attr_name: str
+
+    :param fmt_fn: The function used to turn the attribute into text
+    :type fmt_fn: callable
+
+    :param padding: The number of spaces after the column
+    :type padding: int
+
+    :param dynamic: An indicator that the displayed text changes with time
+        (such as an age) even when the row itself did not change
+    :type dynamic: bool
+    """
+
     def __init__(self: Column,
                  name: str,
                  attr_name: str,
                  fmt_fn: callable = str,
-                 padding: int = 2):
+                 padding: int = 2,
+                 dynamic: bool = False):
         self.name = name
         self.attr_name = attr_name
         self.fmt_fn = fmt_fn
         self.padding = padding
+        self.dynamic = dynamic
         self.length = len(name) + self.padding
 
     def update_length(self: Column, object: any) -> bool:
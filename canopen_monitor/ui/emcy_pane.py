@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from .windows import PopupWindow
+from ..parse.emcy import EMCYTracker
+
+
+class EMCYPane(PopupWindow):
+    """
+    A popup window listing the emergency errors still active on each node, as
+    tracked by an `EMCYTracker`, with the number of times each was sent
+
+    :param parent: parent ui element
+    :type: any
+    :param tracker: The tracker of the EMCY messages
+    :type: EMCYTracker
+    :param header: header text of popup window
+    :type: str
+    :param footer: footer text of popup window
+    :type: str
+    :param style: style of window
+    :type: any
+    """
+
+    def __init__(self: EMCYPane,
+                 parent: any,
+                 tracker: EMCYTracker,
+                 header: str = 'Emergency Errors',
+                 footer: str = 'ESC: close',
+                 style: any = None):
+        self.tracker = tracker
+        super().__init__(parent, header, self.format_errors(), footer, style)
+
+    def format_errors(self: EMCYPane) -> [str]:
+        """
+        Format a line for every active error, ordered by node ID
+
+        :return: The lines of the active errors
+        :rtype: [str]
+        """
+        lines = []
+        for node_id, timestamp, emcy in self.tracker.active_errors():
+            bits = ', '.join(emcy.error_register_bits)
+            lines.append(f'Node 0x{node_id:02X}'
+                         f'  0x{emcy.error_code:04X}'
+                         f'  x{self.tracker.count(node_id, emcy.error_code)}'
+                         f'  {timestamp:%H:%M:%S}'
+                         f'  {emcy.error_message}'
+                         + (f' [{bits}]' if bits else ''))
+
+        if(len(lines) == 0):
+            lines.append('No active errors')
+        return lines
+
+    def draw(self: EMCYPane) -> None:
+        """
+        Update the active errors then draw the window, resizing it to fit the
+        errors that can fit on the screen
+        """
+        if(self.enabled):
+            p_height, p_width = self.parent.getmaxyx()
+            content = self.format_errors()[:max(1, p_height - 4)]
+            if(content != self.content):
+                self.content = content
+                self._pad.clear()
+                self.setUIDimension(p_height, p_width)
+        super().draw()
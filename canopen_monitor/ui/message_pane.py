@@ -1,8 +1,13 @@
 from __future__ import annotations
 from .pane import Pane
 from .colum import Column
-from ..can import Message, MessageType, MessageTable
+from ..can import Message, MessageType, MessageTable, TableChanges
+from bisect import bisect_left, insort
 import curses
+import time
+
+# Seconds between redraws of rows when a column changes with time alone
+DYNAMIC_REDRAW_PERIOD = 1.0
 
 
 class MessagePane(Pane):
@@ -23,6 +28,12 @@ class MessagePane(Pane):
 
     :param table: The message table
     :type table: MessageTable
+
+    .. note::
+
+        The pane keeps its own sorted list of rows, updated from the change
+        feed of the `MessageTable`, and only redraws the rows that changed
+        unless the layout of the pane changed.
     """
 
     def __init__(self: MessagePane,
@@ -50,6 +61,17 @@ class MessagePane(Pane):
         self.__header_style = curses.color_pair(4)
         self.table = message_table
 
+        # Sorted COB IDs of the rows in this pane and the rows that need to be
+        #   redrawn, both kept up to date by the table change feed
+        self.__rows = list(map(lambda x: x.arb_id,
+                               self.table.filter(self.types)))
+        self.__dirty = set()
+        self.__drawn_rows = 0
+        self.__view = None
+        self.__needs_redraw = True
+        self.__last_redraw = 0.0
+        self.table.subscribe(self.__on_changes)
+
         # Cursor stuff
         self.cursor = 0
         self.cursor_min = 0
@@ -61,6 +83,39 @@ class MessagePane(Pane):
         """
         self.table.clear()
 
+    def invalidate(self: MessagePane) -> None:
+        """
+        Force the entire pane to be redrawn on the next draw. This is needed
+        whenever something else has drawn over or cleared the pane.
+        """
+        self.__needs_redraw = True
+
+    def __on_changes(self: MessagePane, changes: TableChanges) -> None:
+        """
+        Apply a set of table changes to the rows of this pane
+
+        :param changes: The changes published by the message table
+        :type changes: TableChanges
+        """
+        if(changes.cleared):
+            self.__rows = []
+            self.__dirty.clear()
+            self.__needs_redraw = True
+
+        for arb_id in changes.removed:
+            i = bisect_left(self.__rows, arb_id)
+            if(i < len(self.__rows) and self.__rows[i] == arb_id):
+                del self.__rows[i]
+                self.__needs_redraw = True
+
+        for arb_id in changes.inserted:
+            message = self.table[arb_id]
+            if(message.type in self.types or message.supertype in self.types):
+                insort(self.__rows, arb_id)
+                self.__needs_redraw = True
+
+        self.__dirty |= changes.dirty
+
     def resize(self: MessagePane, height: int, width: int) -> None:
         """
         A wrapper for `Pane.resize()`. This intercepts a call for a resize
@@ -76,7 +131,7 @@ class MessagePane(Pane):
         """
         super().resize(height, width)
         p_height = self.d_height - 3
-        table_size = len(self.table.filter(self.types))
+        table_size = len(self.__rows)
         occluded = table_size - self.__top - self.d_height + 3
 
         self.cursor_max = table_size if table_size < p_height else p_height
@@ -162,6 +217,27 @@ class MessagePane(Pane):
             self.__top += leftover
             self.__top = max if(self.__top > max) else self.__top
 
+    def jump_to(self: MessagePane, arb_id: int) -> bool:
+        """
+        Scroll the Pane to put the cursor on the record of a COB ID
+
+        :param arb_id: The COB ID of the record
+        :type arb_id: int
+
+        :return: An indication that the record is in this Pane
+        :rtype: bool
+        """
+        i = bisect_left(self.__rows, arb_id)
+        if(i >= len(self.__rows) or self.__rows[i] != arb_id):
+            return False
+
+        # Only scroll the messages if the record is not already visible
+        rows = self.d_height - 3
+        if(i < self.__top or i >= self.__top + rows):
+            self.__top = max(0, min(i, len(self.__rows) - rows))
+        self.cursor = i - self.__top
+        return True
+
     def __draw_header(self: Pane) -> None:
         """
         Draw the table header at the top of the Pane
@@ -169,7 +245,7 @@ class MessagePane(Pane):
         This uses the `cols` dictionary to determine what to write
         """
         self.add_line(f'{self._name}:'
-                      f' ({len(self.table.filter(self.types))} messages)',
+                      f' ({len(self.__rows)} messages)',
                       y=0,
                       x=1,
                       highlight=self.selected)
@@ -181,34 +257,102 @@ class MessagePane(Pane):
 
     def draw(self: MessagePane) -> None:
         """
-        Draw all records from the MessageTable to the Pane
+        Draw the records from the MessageTable that changed since the last
+        draw, or all of the visible records if the layout of the pane changed
+        """
+        view = (self.__top, self.cursor, self.selected, self.parent.getmaxyx())
+        expired = any(map(lambda x: x.dynamic, self.cols)) \
+            and (time.monotonic() - self.__last_redraw) >= DYNAMIC_REDRAW_PERIOD
+
+        if(self.__needs_redraw or expired or view != self.__view):
+            self.__view = view
+            self.__draw_all()
+        elif(len(self.__dirty) > 0):
+            self.__draw_dirty()
+
+        # Refresh the Pane and end the draw cycle
+        super().refresh()
+
+    def __draw_all(self: MessagePane) -> None:
+        """
+        Draw the header and every visible record to the Pane
         """
-        super().draw()
         self.resize(self.v_height, self.v_width)
+        self.__needs_redraw = False
+        self.__last_redraw = time.monotonic()
+        self.__dirty.clear()
 
         # Get the messages to be displayed based on scroll positioning,
         #   and adjust column widths accordingly
-        draw_messages = self.table.filter(self.types, self.__top, self.__top + self.d_height - 3)
+        draw_messages = list(map(lambda x: self.table[x], self.__rows[
+            self.__top:self.__top + self.d_height - 3]))
         self.__check_col_widths(draw_messages)
 
-        # Draw the header and messages
+        # Remove any rows left over from a longer table
+        for i in range(len(draw_messages), self.__drawn_rows):
+            self.clear_line(2 + i)
+        self.__drawn_rows = len(draw_messages)
+
+        # Draw the border, header and messages
+        super().draw()
+        self._pad.touchwin()
         self.__draw_header()
         for i, message in enumerate(draw_messages):
-            self._pad.move(2 + i, 1)
-            for col in self.cols:
-                self.add_line(col.format(message),
-                              highlight=((self.cursor == i) and self.selected))
-        # Refresh the Pane and end the draw cycle
-        super().refresh()
+            self.__draw_message(i, message)
 
-    def __check_col_widths(self: MessagePane, messages: [Message]) -> None:
+    def __draw_dirty(self: MessagePane) -> None:
+        """
+        Draw only the visible records that changed since the last draw
+        """
+        top = self.__top
+        bottom = top + self.d_height - 3
+        draw_messages = []
+        for arb_id in self.__dirty:
+            i = bisect_left(self.__rows, arb_id)
+            if(top <= i < bottom and i < len(self.__rows)
+                    and self.__rows[i] == arb_id):
+                draw_messages.append((i - top, self.table[arb_id]))
+        self.__dirty.clear()
+
+        # A wider column shifts every row, so fall back to a full redraw
+        if(self.__check_col_widths(list(map(lambda x: x[1], draw_messages)))):
+            self.__draw_all()
+            return
+
+        for i, message in draw_messages:
+            self.__draw_message(i, message)
+
+    def __draw_message(self: MessagePane, i: int, message: Message) -> None:
+        """
+        Draw a single record on the i-th row of the Pane
+
+        :param i: The row relative to the top of the visible rows
+        :type i: int
+
+        :param message: The record to draw
+        :type message: Message
+        """
+        self._pad.move(2 + i, 1)
+        for col in self.cols:
+            self.add_line(col.format(message),
+                          highlight=((self.cursor == i) and self.selected))
+
+    def __check_col_widths(self: MessagePane, messages: [Message]) -> bool:
         """
         Check the width of the message in Pane column.
 
         :param messages: The list of the messages
         :type messages: list
+
+        :return: An indication that a column was widened
+        :rtype: bool
         """
+        widened = False
         for col in self.cols:
             for message in messages:
                 if(col.update_length(message)):
-                    self._pad.clear()
+                    widened = True
+
+        if(widened):
+            self._pad.clear()
+        return widened
@@ -130,6 +130,8 @@ class InputPopup(PopupWindow):
     :type: any
     :param input_len: Maximum length of input text
     :type: int
+    :param input_filter: Function accepting the characters allowed as input
+    :type: callable
     """
 
     def __init__(self: InputPopup,
@@ -138,9 +140,11 @@ class InputPopup(PopupWindow):
                  footer: str = 'ESC: close',
                  style: any = None,
                  input_len: int = 30,
+                 input_filter: callable = curses.ascii.isalnum,
                  ):
 
         self.input_len = input_len
+        self.input_filter = input_filter
         content = [" " * self.input_len]
         super().__init__(parent, header, content, footer, style)
         self.cursor_loc = 0
@@ -152,7 +156,7 @@ class InputPopup(PopupWindow):
         :param keyboard_input: curses input character value from curses.getch
         :type: int
         """
-        if curses.ascii.isalnum(keyboard_input) and \
+        if self.input_filter(keyboard_input) and \
                 self.cursor_loc < self.input_len:
             temp = list(self.content[0])
             temp[self.cursor_loc] = chr(keyboard_input)
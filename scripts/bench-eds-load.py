@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import tempfile
+import timeit
+from canopen_monitor.parse import ODCache, load_eds_files
+
+FILE_INFO = """[FileInfo]
+FileName=node{node}.eds
+FileVersion=1
+FileRevision=1
+EDSVersion=4.0
+Description=Synthetic OD {node}
+CreationTime=09:00AM
+CreationDate=01-01-2021
+CreatedBy=bench-eds-load
+ModificationTime=10:00AM
+ModificationDate=01-02-2021
+ModifiedBy=bench-eds-load
+
+[DeviceInfo]
+VendorName=Synthetic
+VendorNumber=0x{node:08X}
+ProductName=Synthetic Node
+ProductNumber=0
+RevisionNumber=0
+BaudRate_1000=1
+SimpleBootUpMaster=0
+SimpleBootUpSlave=0
+Granularity=8
+DynamicChannelsSupported=0
+CompactPDO=0
+GroupMessaging=0
+NrOfRXPDO=4
+NrOfTXPDO=4
+LSS_Supported=0
+
+[DeviceCommissioning]
+NodeId={node}
+NodeName=Synthetic {node}
+Baudrate=1000
+"""
+
+RECORD = """[{index:X}]
+ParameterName=Record {index:X}
+ObjectType=0x9
+;StorageLocation=RAM
+SubNumber={subs}
+"""
+
+SUBINDEX = """[{index:X}sub{sub:X}]
+ParameterName=Value {sub}
+ObjectType=0x7
+;StorageLocation=RAM
+DataType=0x0007
+AccessType=rw
+DefaultValue=0x{sub:08X}
+PDOMapping=1
+"""
+
+
+def write_corpus(directory: str, files: int, records: int, subs: int) -> int:
+    """
+    Write a corpus of synthetic ODs, returning the number of objects written
+    """
+    for node in range(1, files + 1):
+        sections = [FILE_INFO.format(node=node)]
+        for index in range(0x2000, 0x2000 + records):
+            sections.append(RECORD.format(index=index, subs=subs))
+            sections += [SUBINDEX.format(index=index, sub=sub)
+                         for sub in range(subs)]
+        with open(os.path.join(directory, f'node{node}.eds'), 'w') as file:
+            file.write('\n'.join(sections))
+    return files * records * (subs + 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='bench-eds-load',
+                                     description='Time loading a corpus of'
+                                                 ' large synthetic OD files',
+                                     allow_abbrev=False)
+    parser.add_argument('-f', '--files',
+                        type=int,
+                        default=24,
+                        help='Number of OD files in the corpus')
+    parser.add_argument('-r', '--records',
+                        type=int,
+                        default=200,
+                        help='Number of records in each OD')
+    parser.add_argument('-s', '--subindices',
+                        type=int,
+                        default=8,
+                        help='Number of subindices of each record')
+    parser.add_argument('-n', '--number',
+                        type=int,
+                        default=3,
+                        help='Number of times the corpus is loaded')
+    parser.add_argument('-c', '--cache',
+                        action='store_true',
+                        default=False,
+                        help='Load the corpus through a warm OD cache')
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        objects = write_corpus(directory,
+                               args.files,
+                               args.records,
+                               args.subindices)
+        if args.cache:
+            path = os.path.join(directory, 'od-cache.pickle')
+            load_eds_files(directory, cache=ODCache(path))
+
+            def load():
+                return load_eds_files(directory, cache=ODCache(path))
+        else:
+            def load():
+                return load_eds_files(directory)
+
+        elapsed = timeit.timeit(load, number=args.number) / args.number
+        print(f'{args.files} files, {objects} objects loaded in'
+              f' {elapsed:.3f}s ({elapsed / objects * 1e6:.1f} us/object)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+import argparse
+import timeit
+from canopen_monitor.parse import load_eds_file
+from canopen_monitor.parse.utilities import get_name, lookup_name
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='bench-get-name',
+                                     description='Compare looking up the name'
+                                                 ' of every object of an OD'
+                                                 ' in the precomputed name map'
+                                                 ' against searching the OD',
+                                     allow_abbrev=False)
+    parser.add_argument('filepath',
+                        type=str,
+                        help='The OD file whose objects are looked up')
+
+    parser.add_argument('-n', '--number',
+                        type=int,
+                        default=1000,
+                        help='Number of passes over every object')
+
+    args = parser.parse_args()
+
+    od = load_eds_file(args.filepath)
+    indices = list(map(lambda x: x.to_bytes(3, 'big'), od.names))
+
+    for name, function in [('lookup_name', lookup_name),
+                           ('get_name', get_name)]:
+        elapsed = timeit.timeit(lambda: [function(od, i) for i in indices],
+                                number=args.number)
+        lookups = len(indices) * args.number
+        print(f'{name:<12} {lookups} lookups in {elapsed:.3f}s'
+              f' ({elapsed / lookups * 1e9:.0f} ns/lookup)')
+
+
+if __name__ == '__main__':
+    main()
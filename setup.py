@@ -37,6 +37,9 @@ setuptools.setup(
         "python-dateutil >= 2.8.1"
     ],
     extras_require={
+        "numpy": [
+            "numpy",
+        ],
         "dev": [
             "python-can",
             "setuptools",
@@ -0,0 +1,248 @@
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import mock_open, patch
+
+from canopen_monitor.can import Message, MessageType
+from canopen_monitor.parse.canopen import CANOpenParser
+from canopen_monitor.parse import load_eds_files
+from canopen_monitor.parse.emcy import EMCY
+from canopen_monitor.parse.result import INVALID_LENGTH, INVALID_STATE, \
+    HBResult, NMTResult, ParseResult, SYNCResult, TIMEResult
+from canopen_monitor.parse.utilities import FailedValidationError
+from tests import BATTERY_DCF
+
+
+def make_message(arb_id: int, data: [int]) -> Message:
+    return Message(arb_id,
+                   data=data,
+                   timestamp=datetime.now(),
+                   extended=arb_id > 0x7FF)
+
+
+class TestCANOpenParser(unittest.TestCase):
+    """
+    Tests for the CANOpen parser dispatch
+    """
+
+    def setUp(self):
+        self.parser = CANOpenParser({})
+
+    def test_cob_id_to_type(self):
+        """
+        Test the message type table matches the ranges of the message types
+        """
+        self.assertEqual(MessageType.SYNC, MessageType.cob_id_to_type(0x80))
+        self.assertEqual(MessageType.EMER, MessageType.cob_id_to_type(0x81))
+        self.assertEqual(MessageType.UKNOWN, MessageType.cob_id_to_type(0x1))
+        self.assertEqual(MessageType.PDO4_RX,
+                         MessageType.cob_id_to_type(0x57F))
+        self.assertEqual(MessageType.SDO_RX,
+                         MessageType.cob_id_to_type(0x680))
+        self.assertEqual(MessageType.UKNOWN,
+                         MessageType.cob_id_to_type(0x12345))
+
+    def test_emcy_tracked(self):
+        """
+        Test EMCY messages are recorded in the EMCY tracker
+        """
+        message = make_message(0x85, [0x10, 0x81, 0x11, 0, 0, 0, 0, 0])
+        self.assertEqual(("CAN overrun (objects lost)", ""),
+                         self.parser.parse(message))
+        self.assertEqual([5], [e[0] for e in
+                               self.parser.emcy_tracker.active_errors()])
+
+    def test_heartbeat_poll(self):
+        """
+        Test a reboot loop is reported by poll for the heartbeat COB ID
+        """
+        for _ in range(3):
+            self.parser.parse(make_message(0x705, [0x00]))
+        self.assertEqual([0x705],
+                         [arb_id for arb_id, _ in self.parser.poll()])
+        self.assertEqual([], self.parser.poll())
+
+    def test_error_counts(self):
+        """
+        Test messages failing validation are shown as raw data with their
+        error, and counted by node and reason
+        """
+        self.assertEqual(("FF", "Invalid heartbeat state detected"),
+                         self.parser.parse(make_message(0x705, [0xFF])))
+        self.parser.parse(make_message(0x705, [0xFE]))
+        self.parser.parse(make_message(0x86, [0x01]))
+
+        self.assertEqual(2, self.parser.error_count(5, INVALID_STATE))
+        self.assertEqual(1, self.parser.error_count(6))
+        self.assertEqual(1, self.parser.error_count(reason=INVALID_LENGTH))
+        self.assertEqual(3, self.parser.error_count())
+
+    def test_sync_cob_id(self):
+        """
+        Test SYNCs are received on COB ID 0x80, not as EMCYs
+        """
+        for i in range(3):
+            self.assertEqual((f'SYNC - {i}', ''),
+                             self.parser.parse(make_message(0x80, [i])))
+        self.assertEqual(2, len(self.parser.sync_cycles.cycles))
+        self.assertEqual(0, self.parser.error_count())
+
+    def test_sync_cycles(self):
+        """
+        Test synchronous PDOs are grouped into the cycle of the SYNC they
+        follow
+        """
+        with patch('canopen_monitor.parse.sync.synchronous_pdos') as pdos:
+            pdos.return_value = {0x185: 1}
+            self.parser = CANOpenParser({})
+        self.parser.parse(make_message(0x80, [0x01]))
+        self.parser.parse(make_message(0x185, [0x01]))
+        self.parser.parse(make_message(0x80, [0x02]))
+        self.assertEqual(1, self.parser.sync_cycles.cycles[-1].counter)
+        self.assertEqual([0x185],
+                         list(self.parser.sync_cycles.cycles[-1].pdos))
+
+    def test_sync_cycle_timestamps(self):
+        """
+        Test SYNC cycles are timed with the timestamps of the messages, not
+        when they are parsed
+        """
+        start = datetime(2021, 6, 1, 12, 0, 0)
+
+        def frame(arb_id: int, data: [int], ms: float) -> Message:
+            return Message(arb_id,
+                           data=data,
+                           timestamp=start + timedelta(milliseconds=ms))
+
+        frames = [frame(0x80, [0x01], 0),
+                  frame(0x185, [0x01], 1),
+                  frame(0x80, [0x02], 10),
+                  frame(0x185, [0x01], 11),
+                  frame(0x80, [0x03], 20),
+                  frame(0x185, [0x01], 35)]
+        for parse_frames in [lambda parser: [parser.parse(frame)
+                                             for frame in frames],
+                             lambda parser: parser.parse_many(frames)]:
+            with patch('canopen_monitor.parse.sync.synchronous_pdos') as pdos:
+                pdos.return_value = {0x185: 1}
+                parser = CANOpenParser({})
+            parse_frames(parser)
+
+            self.assertAlmostEqual(0.01, parser.sync_cycles.period)
+            self.assertEqual([0x185], parser.sync_cycles.cycle.late)
+            self.assertEqual([(0x185, 'Late for SYNC cycle 2')],
+                             parser.poll())
+
+    def test_typed_results(self):
+        """
+        Test the built in parsers return typed records of their fields,
+        without rendering them
+        """
+        messages = [make_message(0x81, [0x30, 0x81, 0x11, 0, 0, 0, 0, 0]),
+                    make_message(0x701, [0x05]),
+                    make_message(0x0, [0x01, 0x02]),
+                    make_message(0x80, [0x07]),
+                    make_message(0x100, [0x0, 0x0, 0x0, 0x0, 0x1, 0x0])]
+        with patch.object(ParseResult, '__str__') as render:
+            results = [self.parser.parse(message)[0]
+                       for message in messages]
+        render.assert_not_called()
+
+        emcy, hb, nmt, sync, time_ = results
+        self.assertIsInstance(emcy, EMCY)
+        self.assertEqual(0x8130, emcy.error_code)
+        self.assertIsInstance(hb, HBResult)
+        self.assertEqual(0x05, hb.state)
+        self.assertIsInstance(nmt, NMTResult)
+        self.assertEqual((0x01, 0x02), (nmt.command, nmt.node_id))
+        self.assertIsInstance(sync, SYNCResult)
+        self.assertEqual(7, sync.counter)
+        self.assertIsInstance(time_, TIMEResult)
+        self.assertEqual(datetime(1984, 1, 2), time_.time)
+        self.assertEqual(['Life guard error on heartbeat error',
+                          'Operational', 'Start remote node - Node 0x2',
+                          'SYNC - 7', 'Time - 01/02/1984 00:00:00.000000'],
+                         list(map(str, results)))
+
+    def test_no_parser(self):
+        """
+        Test a message without a parser is shown as raw data with no error
+        """
+        self.assertEqual(("01 05", ""),
+                         self.parser.parse(make_message(0x101, [0x01, 0x05])))
+
+    def test_nmt(self):
+        """
+        Test NMT commands are parsed and nodes that do not follow them are
+        reported by poll
+        """
+        self.parser.parse(make_message(0x705, [0x7F]))
+        self.assertEqual(("Start remote node - All nodes", ""),
+                         self.parser.parse(make_message(0x0, [0x01, 0x00])))
+        self.parser.nmt_state.poll(now=time.monotonic() + 10)
+
+        self.parser.parse(make_message(0x705, [0x7F]))
+        self.assertEqual([(0x705, "Expected Operational after Start remote"
+                                  " node, is Pre-operational")],
+                         self.parser.poll())
+
+        self.parser.parse(make_message(0x705, [0x05]))
+        self.assertEqual([], self.parser.poll())
+
+    def test_register_parser(self):
+        """
+        Test custom parsers for standard and extended COB IDs
+        """
+        def parse(cob_id, data, eds):
+            if len(data) == 0:
+                raise FailedValidationError(data, None, cob_id, __name__,
+                                            "Empty")
+            return f"Node {cob_id - 0x7A0}"
+
+        self.parser.register_parser(parse, 0x7A0, 0x7AF)
+        self.parser.register_parser(parse, 0x18FF0000)
+
+        self.assertEqual(("Node 3", ""),
+                         self.parser.parse(make_message(0x7A3, [0x01])))
+        self.assertEqual(("", "Empty"),
+                         self.parser.parse(make_message(0x7A3, [])))
+        self.assertEqual("Node " + str(0x18FF0000 - 0x7A0),
+                         self.parser.parse(make_message(0x18FF0000,
+                                                        [0x01]))[0])
+
+        self.parser.register_parser(None, 0x7A0, 0x7AF)
+        self.assertEqual(("01", ""),
+                         self.parser.parse(make_message(0x7A3, [0x01])))
+
+
+class TestParseMany(unittest.TestCase):
+    """
+    Tests for parsing many messages at once
+    """
+
+    def setUp(self):
+        with patch('builtins.open', mock_open(read_data=BATTERY_DCF)):
+            with patch('os.listdir') as mocked_listdir:
+                mocked_listdir.return_value = ["battery.dcf"]
+                self.parser = CANOpenParser(load_eds_files("/"))
+
+    def test_parse_many_matches_parse(self):
+        """
+        Test parsing many frames gives the same results, in the same order,
+        as parsing them one at a time
+        """
+        frames = [make_message(0x384, [0x09, 0x00, 0x04, 0x00,
+                                       0x50, 0x00, 0x38, 0xFF]),
+                  make_message(0x704, [0x05]),
+                  make_message(0x384, [0xFF, 0xFF, 0x00, 0x80,
+                                       0x01, 0x00, 0x00, 0x00]),
+                  make_message(0x384, []),
+                  make_message(0x704, [0xFF]),
+                  make_message(0x101, [0x01])]
+
+        expected = list(map(self.parser.parse, frames))
+        self.assertEqual(expected, self.parser.parse_many(frames))
+        self.assertEqual(expected,
+                         self.parser.parse_many(map(lambda x:
+                                                    (x.arb_id, x.data),
+                                                    frames)))
@@ -0,0 +1,57 @@
+import unittest
+from canopen_monitor.parse import DataType
+from canopen_monitor.parse.utilities import decode, decode_value
+
+
+class TestDecode(unittest.TestCase):
+    """
+    Tests for decoding data by data type
+    """
+
+    def test_real64(self):
+        """
+        Test decoding a little-endian REAL64
+        """
+        data = [0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x25, 0x40]
+        self.assertEqual("10.5", decode(DataType.REAL64.value, data))
+
+    def test_odd_width_integers(self):
+        """
+        Test decoding the 24, 40, 48 and 56 bit integers
+        """
+        self.assertEqual("-2",
+                         decode(DataType.INTEGER24.value, [0xFE, 0xFF, 0xFF]))
+        self.assertEqual("16777216",
+                         decode(DataType.UNSIGNED40.value,
+                                [0x00, 0x00, 0x00, 0x01, 0x00]))
+        self.assertEqual("-1",
+                         decode(DataType.INTEGER48.value, [0xFF] * 6))
+        self.assertEqual(str(2 ** 56 - 1),
+                         decode(DataType.UNSIGNED56.value, [0xFF] * 7))
+
+    def test_data_type_formats(self):
+        """
+        Test data types given as hex strings or `DataType` decode the same as
+        their codes
+        """
+        data = b'\x34\x12'
+        self.assertEqual("4660", decode(DataType.UNSIGNED16.value, data))
+        self.assertEqual("4660", decode('0x0006', data))
+        self.assertEqual("4660", decode(DataType.UNSIGNED16, data))
+
+    def test_decode_value(self):
+        """
+        Test decoding native values rather than strings
+        """
+        self.assertEqual(-2, decode_value(DataType.INTEGER16.value,
+                                          b'\xFE\xFF'))
+        self.assertIs(True, decode_value(DataType.BOOLEAN.value, [0x01]))
+        self.assertEqual(b'\x01\x02',
+                         decode_value(DataType.OCTET_STRING.value, [1, 2]))
+
+    def test_invalid_data_type(self):
+        """
+        Test an unsupported data type is rejected
+        """
+        with self.assertRaises(ValueError):
+            decode(0x0E, [0x00])
@@ -1,6 +1,7 @@
 import unittest
 from canopen_monitor import parse
 from unittest.mock import mock_open, patch, MagicMock
+from canopen_monitor.parse.utilities import lookup_name
 from tests import TEST_EDS, TEST_DCF
 
 eds = parse.eds
@@ -83,6 +84,59 @@ class TestEDS(unittest.TestCase):
         self.assertEqual("Last Aolved filepath",
                          self.eds[hex(0x3102)].parameter_name,
                          "Error parsing last index location")
+        self.assertEqual(0, self.eds[hex(0x3102)].pdo_mapping,
+                         "Error parsing last line")
+
+    def test_tokenize(self):
+        """
+        The tokenizer should split sections and fields in one pass, leaving
+        out comments and blank lines
+        """
+        lines = ["[1000]", "ParameterName=Device type", ";Comment", "",
+                 "DefaultValue=a=b", "[DeviceInfo]", "VendorName=OreSat"]
+        self.assertEqual([("1000", [("ParameterName", "Device type"),
+                                    ("DefaultValue", "a=b")]),
+                          ("DeviceInfo", [("VendorName", "OreSat")])],
+                         list(eds.tokenize(lines)))
+
+    def test_lazy_dates(self):
+        """
+        Dates and times of named sections should be parsed when first read
+        """
+        file_info = self.eds.file_info
+        self.assertNotIn('creation_date', vars(file_info))
+        self.assertEqual(2019, file_info.creation_date.year)
+        self.assertIn('creation_date', vars(file_info))
+        with self.assertRaises(AttributeError):
+            file_info.deletion_date
+
+
+    def test_data_type_normalized(self):
+        """
+        EDS should normalize data types to their integer codes
+        """
+        self.assertEqual(parse.DataType.UNSIGNED32.value,
+                         self.eds[hex(0x1000)].data_type,
+                         "Error normalizing data type")
+
+    def test_name_map(self):
+        """
+        The name map should give the same data type and name as searching the
+        OD, for every index and subindex
+        """
+        for key, details in self.eds.names.items():
+            index = key.to_bytes(3, "big")
+            self.assertEqual(lookup_name(self.eds, index),
+                             details,
+                             f"Mismatched name for {index.hex()}")
+
+    def test_name_map_invalidated(self):
+        """
+        The name map should be rebuilt after an object of the OD is modified
+        """
+        self.eds[hex(0x1000)].parameter_name = "Renamed"
+        self.eds.invalidate()
+        self.assertEqual("Renamed", self.eds.names[0x100000][1])
 
 
 class TestDCF(unittest.TestCase):
@@ -1,5 +1,5 @@
 import unittest
-from canopen_monitor.parse.emcy import parse
+from canopen_monitor.parse.emcy import parse, parse_emcy, EMCYTracker
 from canopen_monitor.parse.utilities import FailedValidationError
 
 
@@ -12,7 +12,7 @@ class TestEMCY(unittest.TestCase):
         """
         Test EMCY Message
         """
-        emcy_message = [0x81, 0x10, 0x0, 0x0, 0x0, 0x0, 0x0, 0x0]
+        emcy_message = [0x10, 0x81, 0x0, 0x0, 0x0, 0x0, 0x0, 0x0]
         self.assertEqual("CAN overrun (objects lost)",
                          parse(0, emcy_message, 0),
                          "Error on EMCY Message parse")
@@ -21,7 +21,7 @@ class TestEMCY(unittest.TestCase):
         """
         Test EMCY Message with undefined message
         """
-        emcy_message = [0x81, 0x11, 0x0, 0x0, 0x0, 0x0, 0x0, 0x0]
+        emcy_message = [0x11, 0x81, 0x0, 0x0, 0x0, 0x0, 0x0, 0x0]
         self.assertEqual("Error code not found",
                          parse(0, emcy_message, 0),
                          "Error on EMCY Message parse with undefined error "
@@ -31,8 +31,75 @@ class TestEMCY(unittest.TestCase):
         """
         Test EMCY Message with undefined message
         """
-        emcy_message = [0x81, 0x11, 0x0]
+        emcy_message = [0x11, 0x81, 0x0]
         with self.assertRaises(FailedValidationError) as context:
             parse(0, emcy_message, 0)
 
         self.assertEqual("Invalid EMCY message length", str(context.exception))
+
+    def test_EMCY_leading_zeros(self):
+        """
+        Test EMCY error code bytes with leading zeros
+        """
+        emcy_message = [0x00, 0x10, 0x0, 0x0, 0x0, 0x0, 0x0, 0x0]
+        self.assertEqual("Generic error",
+                         parse(0, emcy_message, 0),
+                         "Error on EMCY Message parse with leading zeros")
+
+    def test_EMCY_byte_order(self):
+        """
+        Test the error code is read least significant byte first
+        """
+        emcy = parse_emcy(0x81, [0x30, 0x81, 0x11, 0x0, 0x0, 0x0, 0x0, 0x0])
+        self.assertEqual(0x8130, emcy.error_code)
+        self.assertEqual("Life guard error on heartbeat error",
+                         emcy.error_message)
+
+    def test_EMCY_error_register(self):
+        """
+        Test decoding the bits of the error register
+        """
+        emcy = parse_emcy(0x81, [0x10, 0x81, 0x11, 0x0, 0x0, 0x0, 0x0, 0x0])
+        self.assertEqual(["Generic error", "Communication error"],
+                         emcy.error_register_bits)
+
+
+class TestEMCYTracker(unittest.TestCase):
+    """
+    Tests for tracking the active EMCY errors of nodes
+    """
+
+    def setUp(self):
+        self.tracker = EMCYTracker(history_length=3)
+        self.overrun = parse_emcy(0x81, [0x10, 0x81, 0x11, 0, 0, 0, 0, 0])
+        self.passive = parse_emcy(0x81, [0x20, 0x81, 0x11, 0, 0, 0, 0, 0])
+        self.reset = parse_emcy(0x81, [0x00, 0x00, 0x00, 0, 0, 0, 0, 0])
+
+    def test_active_errors(self):
+        """
+        Test errors stay active per node until the node resets them
+        """
+        self.tracker.update(1, self.passive)
+        self.tracker.update(1, self.overrun)
+        self.tracker.update(2, self.overrun)
+        self.assertEqual([0x8110, 0x8120],
+                         [e[2].error_code
+                          for e in self.tracker.active_errors(1)])
+
+        self.tracker.update(1, self.reset)
+        self.assertEqual([], self.tracker.active_errors(1))
+        self.assertEqual([2],
+                         [e[0] for e in self.tracker.active_errors()])
+
+    def test_history_and_counts(self):
+        """
+        Test every EMCY is counted and the most recent are kept in the history
+        """
+        for _ in range(4):
+            self.tracker.update(1, self.overrun)
+        self.tracker.update(1, self.reset)
+
+        self.assertEqual(3, len(self.tracker.history))
+        self.assertEqual(4, self.tracker.count(1, 0x8110))
+        self.assertEqual(5, self.tracker.count(1))
+        self.assertEqual(0, self.tracker.count(2))
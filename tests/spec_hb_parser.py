@@ -2,9 +2,10 @@ import unittest
 from unittest.mock import mock_open, patch
 
 from canopen_monitor.parse import eds
-from canopen_monitor.parse.hb import parse
+from canopen_monitor.parse.hb import parse, HeartbeatSupervisor, \
+    TimingWheel, HEARTBEAT_LOST, REBOOT_LOOP
 from canopen_monitor.parse.utilities import FailedValidationError
-from tests import TEST_EDS
+from tests import TEST_EDS, TEST_DCF
 
 
 class TestHB(unittest.TestCase):
@@ -45,3 +46,79 @@ class TestHB(unittest.TestCase):
             parse(123, hb_message, self.eds)
 
         self.assertEqual("Invalid heartbeat state detected", str(context.exception))
+
+
+class TestTimingWheel(unittest.TestCase):
+    """
+    Tests for the timing wheel of the heartbeat supervisor
+    """
+
+    def test_expire_in_order(self):
+        """
+        Test timers only expire once their deadline has passed
+        """
+        wheel = TimingWheel(tick=0.1, slots=8, now=0)
+        wheel.schedule('a', 0.25)
+        wheel.schedule('b', 0.55)
+        self.assertEqual([], wheel.advance(0.2))
+        self.assertEqual(['a'], wheel.advance(0.3))
+        self.assertEqual(['b'], wheel.advance(10.0))
+        self.assertEqual(0, len(wheel))
+
+    def test_reschedule_and_cancel(self):
+        """
+        Test rescheduling replaces a timer, including one more than a turn of
+        the wheel away, and cancelled timers never expire
+        """
+        wheel = TimingWheel(tick=0.1, slots=8, now=0)
+        wheel.schedule('a', 0.25)
+        wheel.schedule('a', 2.05)
+        wheel.schedule('b', 0.35)
+        wheel.cancel('b')
+        self.assertEqual([], wheel.advance(1.0))
+        self.assertEqual([], wheel.advance(2.0))
+        self.assertEqual(['a'], wheel.advance(2.1))
+
+
+class TestHeartbeatSupervisor(unittest.TestCase):
+    """
+    Tests for the heartbeat supervisor
+    """
+
+    def setUp(self):
+        with patch('builtins.open', mock_open(read_data=TEST_DCF)):
+            self.dcf = eds.load_eds_file("star_tracker_OD.dcf")
+        self.supervisor = HeartbeatSupervisor({self.dcf.node_id: self.dcf},
+                                              now=0)
+
+    def test_timeouts(self):
+        """
+        Test the heartbeat timeout comes from the producer time in the OD
+        """
+        self.assertEqual({0x0A: 1.5}, self.supervisor.timeouts)
+
+    def test_heartbeat_lost(self):
+        """
+        Test a node is lost once it misses its heartbeat, and found again on
+        its next heartbeat
+        """
+        self.supervisor.heartbeat(0x0A, 0x05, now=0)
+        self.supervisor.heartbeat(0x0A, 0x05, now=1.0)
+        self.assertEqual([], self.supervisor.poll(now=2.0))
+
+        events = self.supervisor.poll(now=2.6)
+        self.assertEqual([(0x0A, HEARTBEAT_LOST)],
+                         [(e.node_id, e.kind) for e in events])
+        self.assertEqual({0x0A}, self.supervisor.lost)
+
+        self.supervisor.heartbeat(0x0A, 0x05, now=3.0)
+        self.assertEqual(set(), self.supervisor.lost)
+
+    def test_reboot_loop(self):
+        """
+        Test repeated boot-ups of a node are reported as a reboot loop
+        """
+        for i in range(3):
+            self.supervisor.heartbeat(0x0A, 0x00, now=i)
+        events = self.supervisor.poll(now=2.0)
+        self.assertEqual(REBOOT_LOOP, events[-1].kind)
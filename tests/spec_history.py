@@ -0,0 +1,120 @@
+import unittest
+import datetime as dt
+from canopen_monitor import can
+from unittest.mock import MagicMock
+
+T0 = dt.datetime(2021, 6, 1, 12, 0, 0)
+
+
+def make_message(arb_id: int, seconds: float, data: [int] = [0x05]):
+    return can.Message(arb_id,
+                       data=data,
+                       interface='vcan0',
+                       timestamp=T0 + dt.timedelta(seconds=seconds))
+
+
+class MessageHistory_Spec(unittest.TestCase):
+    """Tests for the Message History"""
+
+    def setUp(self):
+        self.history = can.MessageHistory()
+        for i in range(100):
+            self.history.append(make_message(0x721, i))
+            self.history.append(make_message(0x1A1, i + 0.5))
+            self.history.append(make_message(0x722, i + 0.25))
+
+    def query(self, **kwargs) -> [tuple]:
+        return list(map(lambda x: (x.arb_id, x.timestamp),
+                        self.history.query(**kwargs)))
+
+    def test_time_window(self):
+        """Given a history of messages from several nodes
+        When querying a time window
+        Then only messages inside the window should be returned in order
+        """
+        result = self.query(start=T0 + dt.timedelta(seconds=10),
+                            end=T0 + dt.timedelta(seconds=11))
+        self.assertEqual([x[0] for x in result],
+                         [0x721, 0x722, 0x1A1, 0x721])
+        self.assertEqual(result[0][1], T0 + dt.timedelta(seconds=10))
+
+    def test_node_id(self):
+        """Given a history of messages from several nodes
+        When querying by node ID
+        Then only messages from the node should be returned
+        """
+        result = self.query(node_id=0x21,
+                            end=T0 + dt.timedelta(seconds=1))
+        self.assertEqual([x[0] for x in result], [0x721, 0x1A1, 0x721])
+
+    def test_cob_id_and_type(self):
+        """Given a history of messages from several nodes
+        When querying by COB ID or message type
+        Then only the matching messages should be returned
+        """
+        self.assertEqual(len(self.query(cob_id=0x722)), 100)
+        self.assertEqual(len(self.query(cob_id=0x723)), 0)
+        self.assertEqual(len(self.query(msg_type=can.MessageType.PDO)), 100)
+        self.assertEqual(len(self.query(msg_type=can.MessageType.HEARTBEAT)),
+                         200)
+
+    def test_out_of_order(self):
+        """Given a message recorded out of timestamp order
+        When querying the history
+        Then the message should be returned in timestamp order
+        """
+        self.history.append(make_message(0x721, 10.1))
+        result = self.query(cob_id=0x721,
+                            start=T0 + dt.timedelta(seconds=10),
+                            end=T0 + dt.timedelta(seconds=11))
+        self.assertEqual(len(result), 3)
+        self.assertEqual(result[1][1], T0 + dt.timedelta(seconds=10.1))
+
+    def test_parsed_lazily(self):
+        """Given a history of messages
+        When querying the history with a parser
+        Then only the messages read from the query should be parsed
+        """
+        parser = MagicMock()
+        parser.parse.return_value = ('Operational', '')
+        result = self.history.query(cob_id=0x721, parser=parser)
+        self.assertEqual(parser.parse.call_count, 0)
+
+        message = next(result)
+        self.assertEqual(parser.parse.call_count, 1)
+        self.assertEqual(message.message, 'Operational')
+        self.assertEqual(message.data, [0x05])
+
+    def test_max_messages(self):
+        """Given a history with a size limit
+        When more messages than the limit are recorded
+        Then the oldest messages should be forgotten first
+        """
+        history = can.MessageHistory(max_messages=100)
+        for i in range(150):
+            history.append(make_message(0x721 if i % 2 else 0x1A1, i))
+
+        self.assertLessEqual(len(history), 100)
+        result = list(history.query())
+        self.assertEqual(len(result), len(history))
+        self.assertEqual(result[-1].timestamp, T0 + dt.timedelta(seconds=149))
+        self.assertGreaterEqual(result[0].timestamp,
+                                T0 + dt.timedelta(seconds=50))
+
+    def test_trim_while_querying(self):
+        """Given a query of a history with a size limit being iterated over
+        When recording messages past the limit, or clearing the history
+        Then the query should still return the messages it found, in order
+        """
+        history = can.MessageHistory(max_messages=100)
+        for i in range(100):
+            history.append(make_message(0x721, i))
+
+        result = history.query()
+        read = [next(result).timestamp for _ in range(3)]
+        history.append(make_message(0x721, 99.5))
+        history.append(make_message(0x721, 100))
+        history.clear()
+        read += [x.timestamp for x in result]
+        self.assertEqual(read, [T0 + dt.timedelta(seconds=i)
+                                for i in range(100)])
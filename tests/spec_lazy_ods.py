@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from canopen_monitor.parse import CANOpenParser, LazyODs, ODCache, \
+    PluginRegistry, load_eds_files
+from canopen_monitor.parse.lazy import scan_node_id
+from tests import TEST_EDS
+
+COMMISSIONING = '\n[DeviceCommissioning]\nNodeName=Star Tracker\nNodeId=18\n'
+
+
+class TestLazyODs(unittest.TestCase):
+    """
+    Tests for loading OD files lazily
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.od_path = os.path.join(self.directory, 'star_tracker_OD.eds')
+        with open(self.od_path, 'w') as file:
+            file.write(COMMISSIONING + TEST_EDS)
+
+    def test_scan_node_id(self):
+        """
+        Test the node ID is read from the DeviceCommissioning section
+        """
+        self.assertEqual(18, scan_node_id(self.od_path))
+        with open(self.od_path, 'w') as file:
+            file.write(TEST_EDS)
+        self.assertIsNone(scan_node_id(self.od_path))
+
+    def test_load_on_lookup(self):
+        """
+        Test OD files are indexed without being parsed, and parsed in the
+        background once their node is looked up
+        """
+        ods = LazyODs(self.directory, plugins=PluginRegistry())
+        self.assertEqual({18: self.od_path}, ods.files)
+        self.assertEqual(0, len(ods))
+
+        self.assertIsNone(ods.get(18))
+        ods.join()
+        self.assertEqual([18], ods.poll())
+        self.assertEqual([], ods.poll())
+        self.assertEqual('Star Tracker',
+                         ods[18].device_commissioning.node_name)
+
+    def test_unindexed_file(self):
+        """
+        Test OD files without a DeviceCommissioning section are parsed while
+        indexing, since their node ID is only known once parsed
+        """
+        with open(self.od_path, 'w') as file:
+            file.write(TEST_EDS)
+
+        ods = LazyODs(self.directory, plugins=PluginRegistry())
+        self.assertEqual(1, len(ods))
+        self.assertEqual([], ods.poll())
+
+    def test_cached_index(self):
+        """
+        Test node IDs are indexed from the cache without reading the files
+        """
+        cache_path = os.path.join(self.directory, 'od-cache.pickle')
+        load_eds_files(self.directory,
+                       plugins=PluginRegistry(),
+                       cache=ODCache(cache_path))
+
+        with patch('canopen_monitor.parse.lazy.scan_node_id') as scan:
+            ods = LazyODs(self.directory,
+                          plugins=PluginRegistry(),
+                          cache=ODCache(cache_path))
+        scan.assert_not_called()
+        self.assertEqual({18: self.od_path}, ods.files)
+
+        ods.get(18)
+        ods.join()
+        self.assertIn(0x192, ods[18].pdo_plans)
+
+    def test_parser(self):
+        """
+        Test the parser decodes the messages of a node once its OD is loaded
+        and taken in by a poll
+        """
+        ods = LazyODs(self.directory, plugins=PluginRegistry())
+        parser = CANOpenParser(ods)
+        message = MagicMock(arb_id=0x192,
+                            node_id=0x12,
+                            data=[0x0, 0x0, 0x80, 0x3f])
+
+        self.assertEqual('0x12', parser.get_name(message))
+        self.assertNotEqual('', parser.parse(message)[1])
+
+        ods.join()
+        parser.poll()
+        self.assertEqual("Orientation orientation - 1.0",
+                         str(parser.parse(message)[0]))
+        self.assertEqual('Star Tracker', parser.get_name(message))
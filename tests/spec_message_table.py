@@ -0,0 +1,323 @@
+import unittest
+import threading
+import time
+import datetime as dt
+from canopen_monitor import can
+from canopen_monitor.parse.canopen import CANOpenParser
+from unittest.mock import MagicMock, patch
+
+
+def make_message(arb_id: int, age: int = 0, data: [int] = [0x00]) \
+        -> can.Message:
+    timestamp = dt.datetime.now() - dt.timedelta(seconds=age)
+    return can.Message(arb_id, data=data, timestamp=timestamp)
+
+
+class MessageTable_Spec(unittest.TestCase):
+    """Tests for the Message Table"""
+
+    def setUp(self):
+        self.table = can.MessageTable()
+        self.subscriber = MagicMock()
+        self.table.subscribe(self.subscriber)
+
+    def test_publish_inserted_and_updated(self):
+        """Given a table with a subscriber
+        When adding messages for new and existing COB IDs
+        Then the published changes should separate inserted and updated rows
+        """
+        self.table += make_message(0x701)
+        self.table += make_message(0x702)
+        changes = self.table.publish()
+        self.assertEqual(changes.inserted, {0x701, 0x702})
+        self.assertEqual(changes.dirty, set())
+
+        self.table += make_message(0x701)
+        changes = self.table.publish()
+        self.assertEqual(changes.inserted, set())
+        self.assertEqual(changes.dirty, {0x701})
+        self.assertEqual(self.subscriber.call_count, 2)
+
+    def test_annotate(self):
+        """Given a table with a published row
+        When flagging the row with an error
+        Then the row should be replaced by a flagged copy and be published as
+        updated
+        """
+        message = make_message(0x701)
+        message.error = ''
+        self.table += message
+        self.table.publish()
+
+        self.assertTrue(self.table.annotate(0x701, 'Heartbeat lost'))
+        self.assertFalse(self.table.annotate(0x702, 'Heartbeat lost'))
+        changes = self.table.publish()
+        self.assertEqual(changes.dirty, {0x701})
+        self.assertEqual(self.table[0x701].error, 'Heartbeat lost')
+        self.assertEqual(message.error, '')
+
+    def test_publish_nothing(self):
+        """Given a table with no changes since the last publish
+        When publishing the changes
+        Then the subscribers should not be called
+        """
+        self.table += make_message(0x701)
+        self.table.publish()
+        self.table.publish()
+        self.assertEqual(self.subscriber.call_count, 1)
+
+    def test_publish_state_changed(self):
+        """Given a table with messages of different ages
+        When publishing the changes
+        Then only the rows that aged into a new state should be reported
+        """
+        self.table += make_message(0x701, age=11)
+        self.table += make_message(0x702, age=6)
+        self.table += make_message(0x703)
+        changes = self.table.publish()
+        self.assertEqual(changes.state_changed, {0x701, 0x702})
+
+        self.table += make_message(0x704)
+        changes = self.table.publish()
+        self.assertEqual(changes.state_changed, set())
+
+        self.table += make_message(0x701)
+        changes = self.table.publish()
+        self.assertEqual(changes.state_changed, {0x701})
+
+    def test_clear(self):
+        """Given a table with messages
+        When clearing the table
+        Then the subscribers should be notified immediately
+        """
+        self.table += make_message(0x701)
+        self.table.clear()
+        changes = self.subscriber.call_args[0][0]
+        self.assertTrue(changes.cleared)
+        self.assertEqual(changes.inserted, set())
+        self.assertEqual(len(self.table), 0)
+
+    def test_snapshot(self):
+        """Given a table with a published snapshot
+        When adding more messages to the table
+        Then the snapshot should not change until the next publish
+        """
+        self.table += make_message(0x701)
+        self.table.publish()
+        snapshot = self.table.snapshot
+
+        self.table += make_message(0x702)
+        self.assertEqual(len(snapshot), 1)
+        self.assertNotIn(0x702, snapshot)
+
+        self.table.publish()
+        self.assertEqual(len(self.table.snapshot), 2)
+        self.assertEqual(self.table.snapshot.version, snapshot.version + 1)
+        self.assertEqual([m.arb_id for m in self.table.snapshot],
+                         [0x701, 0x702])
+
+    def test_snapshot_concurrent_reader(self):
+        """Given a reader thread iterating over the published snapshots
+        When the table is being written to at the same time
+        Then every snapshot read should be internally consistent
+        """
+        errors = []
+        done = threading.Event()
+
+        def reader():
+            while not done.is_set():
+                snapshot = self.table.snapshot
+                try:
+                    count = sum(1 for _ in snapshot)
+                    if count != len(snapshot):
+                        errors.append(snapshot.version)
+                except RuntimeError as e:
+                    errors.append(e)
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        for i in range(2000):
+            self.table += make_message(0x180 + (i % 0x400))
+            if i % 10 == 0:
+                self.table.publish()
+        done.set()
+        thread.join()
+        self.assertEqual(errors, [])
+
+    def test_call(self):
+        """Given a table with messages
+        When iterating over a range of the table twice at once
+        Then both iterations should be independent and sorted by COB ID
+        """
+        for arb_id in [0x703, 0x701, 0x702]:
+            self.table += make_message(arb_id)
+        first = self.table(0, 2)
+        second = self.table(1)
+        self.assertEqual([m.arb_id for m in first], [0x701, 0x702])
+        self.assertEqual([m.arb_id for m in second], [0x702, 0x703])
+
+    def test_max_entries(self):
+        """Given a table with a maximum number of entries
+        When adding a message for a new COB ID to a full table
+        Then the least recently updated dead row should be evicted first
+        """
+        table = can.MessageTable(max_entries=3)
+        table += make_message(0x702, age=11)
+        table += make_message(0x701)
+        table += make_message(0x703)
+        table.publish()
+
+        table += make_message(0x704)
+        changes = table.publish()
+        self.assertEqual(changes.removed, {0x702})
+        self.assertEqual(changes.inserted, {0x704})
+        self.assertEqual(sorted(table.table), [0x701, 0x703, 0x704])
+
+        table += make_message(0x705)
+        changes = table.publish()
+        self.assertEqual(changes.removed, {0x701})
+        self.assertEqual(table.evicted_capacity, 2)
+        self.assertEqual(len(table), 3)
+
+    def test_max_entries_unpublished(self):
+        """Given a full table with a row that was never published
+        When that row is evicted
+        Then it should not be reported as inserted or removed
+        """
+        table = can.MessageTable(max_entries=1)
+        table += make_message(0x701)
+        table += make_message(0x702)
+        changes = table.publish()
+        self.assertEqual(changes.inserted, {0x702})
+        self.assertEqual(changes.removed, set())
+
+    def test_dead_ttl(self):
+        """Given a table with a dead row TTL
+        When publishing the changes
+        Then only the rows dead for longer than the TTL should be evicted
+        """
+        table = can.MessageTable(dead_ttl=dt.timedelta(seconds=5))
+        table += make_message(0x701, age=16)
+        table += make_message(0x702, age=12)
+        table += make_message(0x703)
+        table.publish()
+        self.assertEqual(sorted(table.table), [0x702, 0x703])
+        self.assertEqual(table.evicted_expired, 1)
+        self.assertEqual(table.evicted, 1)
+
+
+class ParsePool_Spec(unittest.TestCase):
+    """Tests for parsing messages on worker threads"""
+
+    def setUp(self):
+        self.parser = MagicMock()
+        self.parser.get_name.return_value = 'node'
+        self.parser.parse.side_effect = \
+            lambda message: (f'parsed {message.data[0]}', '')
+        self.parser.poll.return_value = []
+        self.parser.shares_state.return_value = False
+        self.parser.lock = threading.RLock()
+
+    def test_pool_merge(self):
+        """Given a table parsing messages with a worker pool
+        When adding messages of several nodes
+        Then the rows should only appear once parsed and merged on publish,
+        with the messages of each COB ID merged in order
+        """
+        with can.ParsePool(self.parser, workers=2) as pool:
+            table = can.MessageTable(self.parser, pool=pool, parse_budget=1)
+            for i in range(10):
+                table += make_message(0x701, data=[i])
+                table += make_message(0x702, data=[i])
+            self.assertEqual(len(table), 0)
+
+            while(pool.pending or len(table) < 2):
+                table.publish()
+
+        table.publish()
+        self.assertEqual(table[0x701].message, 'parsed 9')
+        self.assertEqual(table[0x702].message, 'parsed 9')
+        self.assertEqual(table[0x701].node_name, 'node')
+        self.assertEqual(self.parser.parse.call_count, 20)
+
+    def test_pool_budget(self):
+        """Given a pool with parsed messages waiting to be merged
+        When getting the results with no time budget
+        Then no message should be merged and all should be kept for later
+        """
+        pool = can.ParsePool(self.parser)
+        pool.completed.append(make_message(0x701))
+        self.assertEqual(list(pool.results(0)), [])
+        self.assertEqual(len(list(pool.results(1))), 1)
+
+    def test_pool_shards(self):
+        """Given a pool with several workers
+        When submitting messages
+        Then every message of a node should go to the same worker
+        """
+        pool = can.ParsePool(self.parser, workers=3)
+        pool.submit(make_message(0x181))
+        pool.submit(make_message(0x701))
+        pool.submit(make_message(0x182))
+        self.assertEqual([shard.qsize() for shard in pool.shards], [0, 2, 1])
+        self.assertEqual(pool.pending, 3)
+
+    def test_pool_shared_state(self):
+        """Given a pool with several workers and a CANopen parser
+        When submitting SYNCs interleaved with the synchronous PDOs of
+        several nodes
+        Then the SYNCs and the synchronous PDOs should all go to the first
+        worker and be grouped into the right cycles
+        """
+        with patch('canopen_monitor.parse.sync.synchronous_pdos') as pdos:
+            pdos.return_value = {0x185: 1, 0x186: 1}
+            parser = CANOpenParser({})
+        start = dt.datetime(2021, 6, 1, 12, 0, 0)
+        messages = []
+        for i in range(20):
+            timestamp = start + dt.timedelta(milliseconds=10 * i)
+            messages += [can.Message(0x80, data=[i], timestamp=timestamp),
+                         can.Message(0x185, data=[i], timestamp=timestamp),
+                         can.Message(0x186, data=[i], timestamp=timestamp),
+                         can.Message(0x187, data=[i], timestamp=timestamp)]
+
+        pool = can.ParsePool(parser, workers=3)
+        for message in messages[:4]:
+            pool.submit(message)
+        self.assertEqual([shard.qsize() for shard in pool.shards], [3, 1, 0])
+
+        with can.ParsePool(parser, workers=3) as pool:
+            for message in messages:
+                pool.submit(message)
+        self.assertEqual(len(list(pool.results(1))), len(messages))
+
+        self.assertEqual(len(parser.sync_cycles.cycles), 19)
+        for cycle in parser.sync_cycles.cycles:
+            self.assertEqual(set(cycle.pdos), {0x185, 0x186})
+            self.assertEqual(cycle.missed, [])
+        self.assertEqual(parser.poll(), [])
+
+    def test_pool_unlocked_parse(self):
+        """Given a pool whose lock is held, such as while drawing the UI
+        When submitting a message that does not update shared state
+        Then the message should still be parsed
+        """
+        parser = CANOpenParser({})
+        with can.ParsePool(parser, workers=2) as pool, pool.lock:
+            pool.submit(make_message(0x187))
+            deadline = time.monotonic() + 5
+            while(not pool.completed and time.monotonic() < deadline):
+                time.sleep(0.001)
+            self.assertEqual(len(pool.completed), 1)
+
+    def test_pool_backlog(self):
+        """Given a pool keeping a small backlog of parsed messages
+        When more messages are parsed than it keeps
+        Then the oldest should be dropped and counted
+        """
+        with can.ParsePool(self.parser, backlog=2) as pool:
+            for i in range(5):
+                pool.submit(make_message(0x701, data=[i]))
+        self.assertEqual(pool.dropped, 3)
+        self.assertEqual([message.message for message in pool.results(1)],
+                         ['parsed 3', 'parsed 4'])
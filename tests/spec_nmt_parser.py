@@ -0,0 +1,80 @@
+import unittest
+from canopen_monitor.parse.nmt import parse, NetworkState
+from canopen_monitor.parse.utilities import FailedValidationError
+
+
+class TestNMT(unittest.TestCase):
+    """
+    Tests for the NMT parser
+    """
+
+    def test_NMT(self):
+        """
+        Test NMT command sent to a single node
+        """
+        self.assertEqual("Stop remote node - Node 0xa",
+                         parse(0, [0x02, 0x0A], None),
+                         "Error on NMT Message parse")
+
+    def test_NMT_broadcast(self):
+        """
+        Test NMT command sent to every node
+        """
+        self.assertEqual("Reset node - All nodes",
+                         parse(0, [0x81, 0x00], None),
+                         "Error on NMT broadcast Message parse")
+
+    def test_NMT_invalid(self):
+        """
+        Test NMT Message with an undefined command
+        """
+        with self.assertRaises(FailedValidationError) as context:
+            parse(0, [0x03, 0x00], None)
+
+        self.assertEqual("Invalid NMT command", str(context.exception))
+
+
+class TestNetworkState(unittest.TestCase):
+    """
+    Tests for reconciling NMT commands against heartbeats
+    """
+
+    def setUp(self):
+        self.state = NetworkState({0x0A: 1.0, 0x0B: 1.0}, now=0)
+
+    def test_followed_command(self):
+        """
+        Test nodes reaching the expected state in time are not reported
+        """
+        self.state.command(0x01, 0x00, now=0)
+        self.state.heartbeat(0x0A, 0x05)
+        self.state.heartbeat(0x0B, 0x05)
+        self.assertEqual([], self.state.poll(now=2.0))
+        self.assertEqual({}, self.state.expected)
+
+    def test_ignored_command(self):
+        """
+        Test a node still in the wrong state after its heartbeat period is
+        reported, and reported again on each heartbeat until it complies
+        """
+        self.state.command(0x02, 0x0A, now=0)
+        self.state.heartbeat(0x0A, 0x05)
+        self.assertEqual([], self.state.poll(now=0.5))
+        self.assertEqual([0x0A], self.state.poll(now=1.5))
+        self.assertEqual([], self.state.poll(now=1.6))
+
+        self.state.heartbeat(0x0A, 0x05)
+        self.assertEqual([0x0A], self.state.poll(now=2.5))
+        self.assertEqual("Expected Stopped after Stop remote node,"
+                         " is Operational", self.state.error(0x0A))
+
+        self.state.heartbeat(0x0A, 0x04)
+        self.assertEqual([], self.state.poll(now=3.5))
+
+    def test_reset_boot_up(self):
+        """
+        Test a boot-up follows a reset command
+        """
+        self.state.command(0x82, 0x0B, now=0)
+        self.state.heartbeat(0x0B, 0x00)
+        self.assertEqual([], self.state.poll(now=5.0))
@@ -0,0 +1,97 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from canopen_monitor.parse import ODCache, PluginRegistry, load_eds_files
+from canopen_monitor.parse.pdo import parse
+from tests import TEST_EDS
+
+LOAD = 'canopen_monitor.parse.eds.load_node_configs'
+
+
+class TestODCache(unittest.TestCase):
+    """
+    Tests for the cache of parsed OD files
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.od_path = os.path.join(self.directory, 'star_tracker_OD.eds')
+        self.cache_path = os.path.join(self.directory, 'od-cache.pickle')
+        with open(self.od_path, 'w') as file:
+            file.write(TEST_EDS + '\n[DeviceCommissioning]\nNodeId=18\n')
+
+    def load(self, plugins: PluginRegistry = None) -> dict:
+        return load_eds_files(self.directory,
+                              plugins=plugins or PluginRegistry(),
+                              cache=ODCache(self.cache_path))
+
+    def test_cache_hit(self):
+        """
+        Test unchanged OD files are loaded from the cache with their decode
+        plans, without being parsed again
+        """
+        configs = self.load()
+        self.assertEqual([0x12], list(configs))
+        self.assertTrue(os.path.exists(self.cache_path))
+
+        with patch(LOAD) as load_node_configs:
+            cached = self.load()
+        load_node_configs.assert_not_called()
+        self.assertEqual(list(configs), list(cached))
+
+        od = next(iter(cached.values()))
+        self.assertIn(0x192, od.pdo_plans)
+        self.assertEqual("Orientation orientation - 1.0",
+                         parse(0x192, [0x0, 0x0, 0x80, 0x3f], od))
+
+    def test_touched_file(self):
+        """
+        Test an OD file with a new modification time but the same content is
+        still loaded from the cache
+        """
+        self.load()
+        stat = os.stat(self.od_path)
+        os.utime(self.od_path, ns=(stat.st_atime_ns,
+                                   stat.st_mtime_ns + 10 ** 9))
+
+        with patch(LOAD) as load_node_configs:
+            self.load()
+        load_node_configs.assert_not_called()
+
+    def test_invalidation(self):
+        """
+        Test OD files are parsed again when their content changes or they
+        are loaded with other plugins, and deleted files are dropped
+        """
+        self.load()
+        with open(self.od_path, 'w') as file:
+            file.write(TEST_EDS.replace('Orientation', 'Attitude'))
+
+        od = next(iter(self.load().values()))
+        self.assertEqual('Attitude', od[0x3101].parameter_name)
+
+        def plugin(registry):
+            registry.register_object(0x3101, 'UNSIGNED32', subindex=3)
+
+        od = next(iter(self.load(PluginRegistry([plugin])).values()))
+        self.assertEqual('UNSIGNED32', od[0x3101][3].data_type)
+
+        os.remove(self.od_path)
+        self.assertEqual({}, self.load())
+        self.assertEqual({}, ODCache(self.cache_path).entries)
+
+    def test_corrupt_cache(self):
+        """
+        Test a corrupt cache is ignored and replaced
+        """
+        with open(self.cache_path, 'wb') as file:
+            file.write(b'not a cache')
+
+        with self.assertLogs(level='WARNING'):
+            configs = self.load()
+        self.assertEqual(1, len(configs))
+        self.assertEqual(1, len(ODCache(self.cache_path).entries))
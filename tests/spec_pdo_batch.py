@@ -0,0 +1,58 @@
+import unittest
+from unittest.mock import patch, mock_open
+
+from canopen_monitor.parse import eds, load_eds_files
+from canopen_monitor.parse.pdo import parse
+from canopen_monitor.parse.pdo_batch import decode_batch, np
+from tests import TEST_EDS, BATTERY_DCF
+
+
+@unittest.skipIf(np is None, 'NumPy is not installed')
+class TestPDOBatch(unittest.TestCase):
+    """
+    Tests for the vectorized PDO batch decoder
+    """
+
+    def setUp(self):
+        """
+        Generate Mocked eds files
+        """
+        with patch('builtins.open', mock_open(read_data=TEST_EDS)):
+            self.eds_data = eds.load_eds_file("star_tracker_OD.eds")
+        with patch('builtins.open', mock_open(read_data=BATTERY_DCF)):
+            with patch('os.listdir') as mocked_listdir:
+                mocked_listdir.return_value = ["battery.dcf"]
+                self.battery = load_eds_files("/")[4]
+
+    def test_batch_matches_parse(self):
+        """
+        Test every column matches the values decoded one frame at a time
+        """
+        payloads = [[0x09, 0x00, 0x04, 0x00, 0x50, 0x00, 0x38, 0xFF],
+                    [0xFF, 0xFF, 0x00, 0x80, 0x01, 0x00, 0x00, 0x00]]
+        columns = decode_batch(0x384, payloads, self.battery)
+
+        self.assertEqual(columns['Battery Current min'].dtype, np.int16)
+        for i, payload in enumerate(payloads):
+            expected = parse(0x384, payload, self.battery)
+            decoded = ' '.join(f'{name} - {column[i]}'
+                               for name, column in columns.items())
+            self.assertEqual(expected, decoded)
+
+    def test_batch_floats_and_booleans(self):
+        """
+        Test decoding floating point and bit sized fields from a buffer
+        """
+        buffer = bytes([0x01, 0x00, 0x00, 0xC0, 0x3F,
+                        0x00, 0x00, 0x00, 0x00, 0x40])
+        columns = decode_batch(0x200, buffer, self.eds_data, length=5)
+
+        self.assertEqual(list(columns['Orientation boolean']), [True, False])
+        self.assertEqual(list(columns['Orientation timestamp']), [1.5, 2.0])
+
+    def test_batch_payload_too_short(self):
+        """
+        Test a mapping that does not fit in the payloads is rejected
+        """
+        with self.assertRaises(ValueError):
+            decode_batch(0x280, [[0x3F, 0x80, 0x00, 0x00]], self.eds_data)
@@ -2,7 +2,9 @@ import unittest
 from unittest.mock import patch, mock_open
 
 from canopen_monitor.parse import eds, load_eds_files
-from canopen_monitor.parse.pdo import parse
+from canopen_monitor.parse.pdo import parse, try_parse
+from canopen_monitor.parse.result import INVALID_LENGTH, INVALID_MAPPING, \
+    PDOResult
 from canopen_monitor.parse.utilities import FailedValidationError
 from tests import TEST_EDS, BATTERY_DCF
 from canopen_monitor.parse.canopen import CANOpenParser
@@ -25,7 +27,7 @@ class TestPDO(unittest.TestCase):
         """
         Test PDO transmit
         """
-        pdo_message = [0x3f, 0x80, 0x0, 0x0]
+        pdo_message = [0x0, 0x0, 0x80, 0x3f]
         self.assertEqual("Orientation orientation - 1.0",
                          parse(0x180, pdo_message, self.eds_data),
                          "Error on PDO Message parse")
@@ -34,7 +36,7 @@ class TestPDO(unittest.TestCase):
         """
         Test PDO transmit with multiple elements in message
         """
-        pdo_message = [0x3F, 0x80, 0x00, 0x00, 0x3F, 0xC0, 0x00, 0x00]
+        pdo_message = [0x00, 0x00, 0x80, 0x3F, 0x00, 0x00, 0xC0, 0x3F]
         self.assertEqual("Orientation orientation - 1.0 Orientation timestamp "
                          "- 1.5",
                          parse(0x280, pdo_message, self.eds_data),
@@ -44,24 +46,70 @@ class TestPDO(unittest.TestCase):
         """
         Test PDO transmit with multiple elements in message
         """
-        pdo_message = [0x01, 0x3F, 0xC0, 0x00, 0x00]
+        pdo_message = [0x01, 0x00, 0x00, 0xC0, 0x3F]
         self.assertEqual("Orientation boolean - True Orientation timestamp - "
                          "1.5",
                          parse(0x200, pdo_message, self.eds_data),
                          "Error on PDO Message parse (multiple & complex)")
 
-        pdo_message = [0x7F, 0x80, 0x00, 0x01]
+        pdo_message = [0x00, 0x01, 0x80, 0x7F]
         self.assertEqual("Orientation timestamp - 1.5 Orientation boolean - "
                          "True",
                          parse(0x300, pdo_message, self.eds_data),
                          "Error on PDO Message parse (multiple & complex - "
                          "reverse)")
 
+    def test_pdo_result_values(self):
+        """
+        Test PDO results hold the decoded values and render to the same
+        string every time
+        """
+        pdo_message = [0x01, 0x00, 0x00, 0xC0, 0x3F]
+        result = parse(0x200, pdo_message, self.eds_data)
+        self.assertEqual({"Orientation boolean": True,
+                          "Orientation timestamp": 1.5},
+                         result.values)
+        self.assertIs(str(result), str(result))
+        self.assertEqual("Orientation timestamp - 1.5", result.fields[1])
+
+    def test_pdo_result_compare_unrendered(self):
+        """
+        Test PDO results are compared, hashed and tested for truth without
+        being rendered
+        """
+        pdo_message = [0x01, 0x00, 0x00, 0xC0, 0x3F]
+        result = parse(0x200, pdo_message, self.eds_data)
+        other = parse(0x200, pdo_message, self.eds_data)
+        with patch.object(PDOResult, 'render') as render:
+            self.assertTrue(result)
+            self.assertEqual(result, other)
+            self.assertEqual(1, len({result, other}))
+            self.assertNotEqual(result, parse(0x200, [0x0] + pdo_message[1:],
+                                              self.eds_data))
+        render.assert_not_called()
+        self.assertFalse(PDOResult([]))
+
+    def test_pdo_plan_cached(self):
+        """
+        Test PDO decode plans are cached and invalidated when the OD changes
+        """
+        pdo_message = [0x0, 0x0, 0x80, 0x3f]
+        parse(0x180, pdo_message, self.eds_data)
+        plan = self.eds_data.pdo_plans[0x180]
+        parse(0x180, pdo_message, self.eds_data)
+        self.assertIs(plan, self.eds_data.pdo_plans[0x180])
+
+        self.eds_data[0x1A00] = self.eds_data[0x1A01]
+        self.assertNotIn(0x180, self.eds_data.pdo_plans)
+        self.assertEqual("Orientation orientation - 1.0 Orientation timestamp "
+                         "- 1.0",
+                         parse(0x180, pdo_message * 2, self.eds_data))
+
     def test_mpdo_with_SAM(self):
         """
         Test MPDO transmit with source addressing mode
         """
-        pdo_message = [0x00, 0x31, 0x01, 0x03, 0x3F, 0x80, 0x00, 0x00]
+        pdo_message = [0x00, 0x31, 0x01, 0x03, 0x00, 0x00, 0x80, 0x3F]
         self.assertEqual("Orientation orientation - 1.0",
                          parse(0x380, pdo_message, self.eds_data),
                          "Error on MPDO SAM Message parse")
@@ -69,14 +117,15 @@ class TestPDO(unittest.TestCase):
     def test_pdo_transmit_with_invalid_index(self):
         """
         Test PDO transmit with invalid OD File index
-        An exception is returned here because this is due
-        to an malformed OD file, not a malformed message
+        The missing object is reported as an invalid mapping, since this is
+        due to an malformed OD file, not a malformed message
         """
-        pdo_message = [0x3f, 0x80, 0x0, 0x0]
-        with self.assertRaises(KeyError) as context:
+        pdo_message = [0x0, 0x0, 0x80, 0x3f]
+        with self.assertRaises(FailedValidationError) as context:
             parse(0x480, pdo_message, self.eds_data)
 
-        self.assertEqual("'3101sub6'", str(context.exception))
+        self.assertEqual("Invalid pdo mapping for 0x480: KeyError '3101sub6'",
+                         str(context.exception))
 
     def test_mpdo_with_invalid_index(self):
         """
@@ -90,6 +139,40 @@ class TestPDO(unittest.TestCase):
         self.assertEqual("MPDO provided type index does not exist. Check "
                          "provided index '310a'", str(context.exception))
 
+    def test_try_parse_errors(self):
+        """
+        Test invalid PDOs are returned as errors rather than raised, and
+        errors in the mapping are cached
+        """
+        error = try_parse(0x180, [], self.eds_data)
+        self.assertEqual(INVALID_LENGTH, error.reason)
+        self.assertEqual("Invalid payload length 0 expected between 1 and 8",
+                         error)
+
+        self.eds_data[0x1A00][0].default_value = '0x50'
+        self.eds_data.invalidate()
+        error = try_parse(0x180, [0x01], self.eds_data)
+        self.assertEqual(INVALID_MAPPING, error.reason)
+        self.assertEqual("Invalid pdo mapping detected in eds file at "
+                         "[6656sub0]", error)
+        self.assertIs(error, self.eds_data.pdo_plans[0x180])
+        self.assertIs(error, try_parse(0x180, [0x02], self.eds_data))
+
+    def test_dangling_mapping(self):
+        """
+        Test a mapping naming an object missing from the OD is returned as
+        an error, cached like other mapping errors
+        """
+        self.eds_data[0x1A00][1].default_value = '0x31050120'
+        self.eds_data.invalidate()
+        error = try_parse(0x180, [0x0, 0x0, 0x80, 0x3f], self.eds_data)
+        self.assertEqual(INVALID_MAPPING, error.reason)
+        self.assertIs(error, self.eds_data.pdo_plans[0x180])
+
+        parser = CANOpenParser({0: self.eds_data})
+        message = Message(0x180, data=[0x0, 0x0, 0x80, 0x3f])
+        self.assertIs(error, parser.parse(message)[1])
+
 
 class TestExtendedPDODefinition(unittest.TestCase):
     """
@@ -0,0 +1,154 @@
+import unittest
+from unittest.mock import MagicMock, mock_open, patch
+
+from canopen_monitor.parse import eds
+from canopen_monitor.parse.canopen import CANOpenParser
+from canopen_monitor.parse.eds import DataType
+from canopen_monitor.parse.pdo import parse
+from canopen_monitor.parse.plugins import ECSS_TIME_INDEX, PluginRegistry, \
+    ecss_time, _DEFAULT_REGISTRIES
+from canopen_monitor.parse.utilities import decode_value
+from tests import TEST_EDS
+
+
+def load(plugins: PluginRegistry) -> eds.EDS:
+    with patch('builtins.open', mock_open(read_data=TEST_EDS)):
+        return eds.load_eds_file("star_tracker_OD.eds", plugins=plugins)
+
+
+class TestPluginRegistry(unittest.TestCase):
+    """
+    Tests for the plugin registry
+    """
+
+    def test_register_object(self):
+        """
+        Test objects registered by plugins are decoded with their data type,
+        only in the ODs of the devices they are registered for
+        """
+        def plugin(registry):
+            registry.register_data_type('TEST_FIXED16',
+                                        lambda data: int.from_bytes(
+                                            data, 'little') / 256,
+                                        lambda value: f'{value:.2f}')
+            registry.register_object(0x3101, 'TEST_FIXED16', subindex=3,
+                                     vendor_id=0)
+
+        registry = PluginRegistry([plugin])
+        self.addCleanup(registry.close)
+        od = load(registry)
+        self.assertEqual('TEST_FIXED16', od[0x3101][3].data_type)
+        self.assertEqual("Orientation orientation - 1.50",
+                         parse(0x180, [0x80, 0x01, 0x00, 0x00], od))
+
+        registry = PluginRegistry()
+        registry.register_object(0x3101, 'TEST_FIXED16', subindex=3,
+                                 vendor_id=1)
+        od = load(registry)
+        self.assertEqual(DataType.REAL32.value, od[0x3101][3].data_type)
+
+    def test_register_data_type(self):
+        """
+        Test built in data types are only replaced when asked to, and data
+        types are removed or restored when their registry is closed
+        """
+        registry = PluginRegistry()
+        with self.assertRaises(ValueError):
+            registry.register_data_type(DataType.UNSIGNED32.value, bytes)
+
+        registry.register_data_type(DataType.UNSIGNED32.value, bytes,
+                                    replace=True)
+        registry.register_data_type('TEST_RAW', bytes)
+        self.assertEqual(b'\x01\x00\x00\x00',
+                         decode_value(DataType.UNSIGNED32.value,
+                                      [1, 0, 0, 0]))
+        with self.assertRaises(ValueError):
+            PluginRegistry().register_data_type('TEST_RAW', bytearray)
+
+        registry.close()
+        self.assertEqual(1, decode_value(DataType.UNSIGNED32.value,
+                                         [1, 0, 0, 0]))
+        with self.assertRaises(ValueError):
+            decode_value('TEST_RAW', [1])
+
+    def test_register_same_data_type(self):
+        """
+        Test registering a data type again with the same decoders does
+        nothing, and is left to the registry that added it
+        """
+        def plugin(registry):
+            registry.register_data_type('TEST_SAME', bytes)
+
+        first = PluginRegistry([plugin])
+        self.addCleanup(first.close)
+        second = PluginRegistry([plugin])
+        second.close()
+        self.assertEqual(b'\x01', decode_value('TEST_SAME', [1]))
+
+    @patch('canopen_monitor.parse.plugins.entry_points')
+    def test_default_registry(self, mocked_entry_points):
+        """
+        Test the installed plugins are only loaded once, however many OD
+        files are loaded with the default registry
+        """
+        def plugin(registry):
+            registry.register_data_type('TEST_VENDOR_T',
+                                        lambda data: bytes(data).hex())
+            registry.register_object(0x3101, 'TEST_VENDOR_T', subindex=3)
+
+        vendor = MagicMock()
+        vendor.name = 'vendor'
+        vendor.load.return_value = plugin
+        mocked_entry_points.return_value.select.return_value = [vendor]
+
+        with patch.dict(_DEFAULT_REGISTRIES, clear=True):
+            self.addCleanup(lambda: _DEFAULT_REGISTRIES.get(False).close())
+            for _ in range(2):
+                with patch('builtins.open', mock_open(read_data=TEST_EDS)):
+                    od = eds.load_eds_file("star_tracker_OD.eds")
+                self.assertEqual('TEST_VENDOR_T', od[0x3101][3].data_type)
+
+            ecss = PluginRegistry.default(enable_ecss=True)
+            self.assertIs(ecss, PluginRegistry.default(enable_ecss=True))
+            self.assertEqual(vendor.load.call_count, 1)
+            self.assertEqual([ECSS_TIME_INDEX, 0x3101],
+                             [x.index for x in ecss.objects])
+
+    def test_ecss_time(self):
+        """
+        Test the built in ECSS time plugin
+        """
+        self.assertEqual(DataType.ECSS_TIME.value,
+                         load(PluginRegistry([ecss_time]))[0x2101].data_type)
+        self.assertEqual(DataType.UNSIGNED8.value,
+                         load(PluginRegistry())[0x2101].data_type)
+
+    def test_register_parser(self):
+        """
+        Test parse functions registered by plugins are installed in the
+        dispatch table of the parser
+        """
+        registry = PluginRegistry()
+        registry.register_parser(lambda cob_id, data, eds: "Vendor",
+                                 0x7A0, 0x7AF)
+        parser = CANOpenParser({}, plugins=registry)
+        message = MagicMock(arb_id=0x7A1, data=[0x01])
+        self.assertEqual(("Vendor", ""), parser.parse(message))
+
+    @patch('canopen_monitor.parse.plugins.entry_points')
+    def test_load_entry_points(self, mocked_entry_points):
+        """
+        Test installed plugins are registered, and plugins failing to load
+        are skipped
+        """
+        working = MagicMock()
+        working.name = 'working'
+        broken = MagicMock()
+        broken.name = 'broken'
+        broken.load.side_effect = ImportError('No module named broken')
+        mocked_entry_points.return_value.select.return_value = [broken,
+                                                                working]
+
+        registry = PluginRegistry()
+        self.assertEqual(['working'], registry.load_entry_points())
+        working.load.return_value.assert_called_once_with(registry)
@@ -1,8 +1,11 @@
 import unittest
+from datetime import datetime
 from unittest.mock import patch, mock_open
 
 from canopen_monitor.parse import eds
-from canopen_monitor.parse.sdo import SDOParser
+from canopen_monitor.parse.sdo import SDOParser, crc16
+from canopen_monitor.parse.canopen import CANOpenParser
+from canopen_monitor.can import Message
 from canopen_monitor.parse.utilities import FailedValidationError
 from tests import TEST_EDS
 
@@ -109,8 +112,8 @@ class TestSDO(unittest.TestCase):
         Text expedited SDO transfer with an float data type
         """
         parser = SDOParser()
-        client_initiate_message = [0x2F, 0x10, 0x18, 0x03, 0x41, 0x28, 0x00,
-                                   0x00]
+        client_initiate_message = [0x2F, 0x10, 0x18, 0x03, 0x00, 0x00, 0x28,
+                                   0x41]
         self.assertEqual("Downloaded - Identity real32: 10.5",
                          parser.parse(0x600, client_initiate_message,
                                       self.eds_data),
@@ -198,8 +201,8 @@ class TestSDO(unittest.TestCase):
         """
         parser = SDOParser()
 
-        client_initiate_message = [0x21, 0x10, 0x18, 0x00, 0x00, 0x00, 0x00,
-                                   0x10]
+        client_initiate_message = [0x21, 0x10, 0x18, 0x00, 0x10, 0x00, 0x00,
+                                   0x00]
         self.assertEqual("Initiating block download - Identity unsigned8",
                          parser.parse(0x600, client_initiate_message,
                                       self.eds_data),
@@ -227,7 +230,7 @@ class TestSDO(unittest.TestCase):
 
         server_download_response = [0x30, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
                                     0x00]
-        self.assertEqual("Identity unsigned8 50.0%",
+        self.assertEqual("Identity unsigned8 43.8%",
                          parser.parse(0x580, server_download_response,
                                       self.eds_data),
                          "Error on Server End Message")
@@ -326,8 +329,8 @@ class TestSDO(unittest.TestCase):
         self.assertEqual(False, parser.is_complete,
                          "Parser should be incomplete")
 
-        server_initiate_response = [0x41, 0x10, 0x18, 0x00, 0x00, 0x00, 0x00,
-                                    0x10]
+        server_initiate_response = [0x41, 0x10, 0x18, 0x00, 0x10, 0x00, 0x00,
+                                    0x00]
         self.assertEqual("Initiating block download - Identity unsigned8",
                          parser.parse(0x580, server_initiate_response,
                                       self.eds_data),
@@ -337,7 +340,7 @@ class TestSDO(unittest.TestCase):
 
         client_download_segment = [0x70, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
                                    0x00]
-        self.assertEqual("Identity unsigned8 50.0%",
+        self.assertEqual("Identity unsigned8 0.0%",
                          parser.parse(0x600, client_download_segment,
                                       self.eds_data),
                          "Error on Client End Message")
@@ -355,7 +358,7 @@ class TestSDO(unittest.TestCase):
 
         client_download_segment = [0x60, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
                                    0x00]
-        self.assertEqual("Identity unsigned8 50.0%",
+        self.assertEqual("Identity unsigned8 43.8%",
                          parser.parse(0x600, client_download_segment,
                                       self.eds_data),
                          "Error on Client End Message")
@@ -399,8 +402,8 @@ class TestSDO(unittest.TestCase):
         Upload 8byte unsigned integer with value 10
         """
         parser = SDOParser()
-        client_initiate_message = [0xE6, 0x10, 0x18, 0x00, 0x00, 0x00, 0x00,
-                                   0x08]
+        client_initiate_message = [0xE6, 0x10, 0x18, 0x00, 0x08, 0x00, 0x00,
+                                   0x00]
         self.assertEqual("Initiating block download - Identity unsigned8",
                          parser.parse(0x600, client_initiate_message,
                                       self.eds_data),
@@ -442,7 +445,7 @@ class TestSDO(unittest.TestCase):
         self.assertEqual(False, parser.is_complete,
                          "Parser should be incomplete")
 
-        client_block_end_message = [0xDD, 0xA1, 0x4A, 0x00, 0x00, 0x00, 0x00,
+        client_block_end_message = [0xD9, 0x4A, 0xA1, 0x00, 0x00, 0x00, 0x00,
                                     0x00]
         self.assertEqual("Identity unsigned8 100%",
                          parser.parse(0x600, client_block_end_message,
@@ -453,12 +456,81 @@ class TestSDO(unittest.TestCase):
 
         server_block_end_confirm_message = [0xA1, 0x00, 0x00, 0x00, 0x00, 0x00,
                                             0x00, 0x00]
-        self.assertEqual("Block download done - Identity unsigned8",
+        self.assertEqual("Block download done - Identity unsigned8 (CRC OK)",
                          parser.parse(0x580, server_block_end_confirm_message,
                                       self.eds_data),
                          "Error on Server End Message")
         self.assertEqual(True, parser.is_complete, "Parser should be complete")
 
+    def test_sdo_block_reassembly(self):
+        """
+        Test SDO Block Download of 16 bytes over two blocks, with the last
+        segment of the first block retransmitted
+        """
+        parser = SDOParser()
+        payload = list(range(1, 17))
+        messages = [
+            (0x600, [0xE2, 0x10, 0x18, 0x00, 0x10, 0x00, 0x00, 0x00]),
+            (0x580, [0xC4, 0x10, 0x18, 0x00, 0x02, 0x00, 0x00, 0x00]),
+            (0x600, [0x01] + payload[0:7]),
+            (0x600, [0x02] + [0xFF] * 7),
+            (0x580, [0xA2, 0x01, 0x02, 0x00, 0x00, 0x00, 0x00, 0x00]),
+            (0x600, [0x01] + payload[7:14]),
+            (0x600, [0x82] + payload[14:16] + [0x00] * 5),
+            (0x580, [0xA2, 0x02, 0x02, 0x00, 0x00, 0x00, 0x00, 0x00]),
+            (0x600, [0xD5, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00]),
+            (0x580, [0xA1, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00]),
+        ]
+        results = [parser.parse(cob_id, data, self.eds_data)
+                   for cob_id, data in messages]
+
+        self.assertEqual("Identity unsigned8 43.8%", results[4])
+        self.assertEqual("Identity unsigned8 100.0%", results[7])
+        self.assertTrue(parser.is_complete)
+        self.assertEqual(bytes(payload), parser.payload)
+        self.assertEqual(16, parser.received)
+        self.assertEqual(1.0, parser.progress)
+        self.assertGreaterEqual(parser.throughput, 0.0)
+
+    def block_download_with_crc(self, crc):
+        parser = SDOParser()
+        payload = list(range(1, 17))
+        messages = [
+            (0x600, [0xE6, 0x10, 0x18, 0x00, 0x10, 0x00, 0x00, 0x00]),
+            (0x580, [0xC4, 0x10, 0x18, 0x00, 0x02, 0x00, 0x00, 0x00]),
+            (0x600, [0x01] + payload[0:7]),
+            (0x600, [0x02] + [0xFF] * 7),
+            (0x580, [0xA2, 0x01, 0x02, 0x00, 0x00, 0x00, 0x00, 0x00]),
+            (0x600, [0x01] + payload[7:14]),
+            (0x600, [0x82] + payload[14:16] + [0x00] * 5),
+            (0x580, [0xA2, 0x02, 0x02, 0x00, 0x00, 0x00, 0x00, 0x00]),
+            (0x600, [0xD5] + list(crc.to_bytes(2, "little")) + [0x00] * 5),
+        ]
+        for cob_id, data in messages:
+            parser.parse(cob_id, data, self.eds_data)
+        return parser, bytes(payload)
+
+    def test_sdo_block_crc(self):
+        """
+        Test the CRC of a block transfer is validated on completion
+        """
+        self.assertEqual(0x31C3, crc16(b"123456789"))
+
+        parser, payload = self.block_download_with_crc(0)
+        parser, _ = self.block_download_with_crc(crc16(payload))
+        self.assertEqual("Block download done - Identity unsigned8 (CRC OK)",
+                         parser.parse(0x580, [0xA1, 0x00, 0x00, 0x00, 0x00,
+                                              0x00, 0x00, 0x00],
+                                      self.eds_data))
+        self.assertTrue(parser.crc_valid)
+
+        parser, _ = self.block_download_with_crc(crc16(payload) ^ 0x1)
+        with self.assertRaises(FailedValidationError):
+            parser.parse(0x580, [0xA1, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+                                 0x00], self.eds_data)
+        self.assertFalse(parser.crc_valid)
+        self.assertTrue(parser.is_complete)
+
     def test_sdo_block_upload(self):
         """
         Test SDO Block Download
@@ -475,8 +547,8 @@ class TestSDO(unittest.TestCase):
         self.assertEqual(False, parser.is_complete,
                          "Parser should be incomplete")
 
-        server_initiate_response = [0xE6, 0x10, 0x18, 0x00, 0x00, 0x00, 0x00,
-                                    0x08]
+        server_initiate_response = [0xE6, 0x10, 0x18, 0x00, 0x08, 0x00, 0x00,
+                                    0x00]
         self.assertEqual("Initiating block download - Identity unsigned8",
                          parser.parse(0x580, server_initiate_response,
                                       self.eds_data),
@@ -518,7 +590,7 @@ class TestSDO(unittest.TestCase):
         self.assertEqual(False, parser.is_complete,
                          "Parser should be incomplete")
 
-        server_block_end_message = [0xDD, 0xA1, 0x4A, 0x00, 0x00, 0x00, 0x00,
+        server_block_end_message = [0xD9, 0x4A, 0xA1, 0x00, 0x00, 0x00, 0x00,
                                     0x00]
         self.assertEqual("Identity unsigned8 100%",
                          parser.parse(0x580, server_block_end_message,
@@ -529,7 +601,7 @@ class TestSDO(unittest.TestCase):
 
         client_block_end_confirm_message = [0xA1, 0x00, 0x00, 0x00, 0x00, 0x00,
                                             0x00, 0x00]
-        self.assertEqual("Block download done - Identity unsigned8",
+        self.assertEqual("Block download done - Identity unsigned8 (CRC OK)",
                          parser.parse(0x600, client_block_end_confirm_message,
                                       self.eds_data),
                          "Error on Server End Message")
@@ -579,3 +651,65 @@ class TestSDO(unittest.TestCase):
 
         self.assertEqual(False, parser.is_complete,
                          "Parser should be incomplete")
+
+
+class TestSDOChannels(unittest.TestCase):
+    """
+    Tests for tracking SDO transfers per channel in the CANOpen parser
+    """
+
+    def setUp(self):
+        """
+        Generate Mocked eds files for two nodes
+        """
+        with patch('builtins.open', mock_open(read_data=TEST_EDS)):
+            eds_data = eds.load_eds_file("star_tracker_OD.eds")
+        self.parser = CANOpenParser({1: eds_data, 2: eds_data})
+
+    def parse(self, cob_id, data):
+        message = Message(cob_id, data=data, timestamp=datetime.now())
+        return self.parser.parse(message)
+
+    def test_concurrent_transfers(self):
+        """
+        Test interleaved segmented transfers with two nodes
+        """
+        for cob_id in [0x601, 0x602]:
+            self.parse(cob_id, [0x21, 0x10, 0x18, 0x00, 0x10, 0x00, 0x00,
+                                0x00])
+        for cob_id in [0x581, 0x582]:
+            self.parse(cob_id, [0x60, 0x10, 0x18, 0x00, 0x00, 0x00, 0x00,
+                                0x00])
+        self.assertEqual(sorted(self.parser.sdo_transfers),
+                         [(0x601, 0x581), (0x602, 0x582)])
+
+        for cob_id in [0x601, 0x602]:
+            message, error = self.parse(cob_id, [0x10, 0x00, 0x00, 0x00,
+                                                 0x00, 0x00, 0x00, 0x0A])
+            self.assertEqual("", error)
+        for cob_id in [0x602, 0x601]:
+            message, error = self.parse(cob_id - 0x80,
+                                        [0x30, 0x00, 0x00, 0x00, 0x00, 0x00,
+                                         0x00, 0x00])
+            self.assertEqual("", error)
+        for cob_id in [0x601, 0x602]:
+            self.parse(cob_id, [0x01, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+                                0x0A])
+            message, error = self.parse(cob_id - 0x80,
+                                        [0x20, 0x00, 0x00, 0x00, 0x00, 0x00,
+                                         0x00, 0x00])
+            self.assertEqual(("Identity unsigned8 100%", ""),
+                             (message, error))
+        self.assertEqual(self.parser.sdo_transfers, {})
+        self.assertEqual(len(self.parser.sdo_completed), 2)
+        self.assertEqual(self.parser.sdo_completed[0].payload,
+                         bytes([0, 0, 0, 0, 0, 0, 0x0A] * 2))
+
+    def test_idle_timeout(self):
+        """
+        Test an idle SDO transfer is dropped after the timeout
+        """
+        self.parser.sdo_timeout = 0
+        self.parse(0x601, [0x21, 0x10, 0x18, 0x00, 0x10, 0x00, 0x00, 0x00])
+        self.parse(0x602, [0x21, 0x10, 0x18, 0x00, 0x10, 0x00, 0x00, 0x00])
+        self.assertEqual(list(self.parser.sdo_parsers), [(0x602, 0x582)])
@@ -0,0 +1,55 @@
+import unittest
+import datetime as dt
+from canopen_monitor import can
+
+
+def make_message(arb_id: int, message: str, error: str = '') -> can.Message:
+    msg = can.Message(arb_id, data=[0x00], timestamp=dt.datetime.now())
+    msg.message = message
+    msg.error = error
+    return msg
+
+
+class SearchIndex_Spec(unittest.TestCase):
+    """Tests for the Search Index"""
+
+    def setUp(self):
+        self.table = can.MessageTable()
+        self.index = can.SearchIndex(self.table)
+        self.table += make_message(0x181, 'Battery Voltage: 7.4')
+        self.table += make_message(0x701, 'OPERATIONAL')
+        self.table += make_message(0x702,
+                                   'PRE-OPERATIONAL',
+                                   'Invalid heartbeat state detected')
+        self.table.publish()
+
+    def test_search_words(self):
+        """Given a table of parsed messages
+        When searching for words in the messages and errors
+        Then the rows containing every word should be found, ignoring case
+        """
+        self.assertEqual(self.index.search('operational'), [0x701, 0x702])
+        self.assertEqual(self.index.search('Heartbeat operational'), [0x702])
+        self.assertEqual(self.index.search('battery voltage'), [0x181])
+        self.assertEqual(self.index.search('battery missing'), [])
+        self.assertEqual(self.index.search(''), [])
+
+    def test_search_updated(self):
+        """Given a row that received a new message after it was indexed
+        When searching after the change was published
+        Then only the words of the new message should be found
+        """
+        self.assertEqual(self.index.search('stopped'), [])
+        self.table += make_message(0x701, 'STOPPED')
+        self.table.publish()
+        self.assertEqual(self.index.search('stopped'), [0x701])
+        self.assertEqual(self.index.search('operational'), [0x702])
+
+    def test_search_removed(self):
+        """Given an indexed table
+        When the table is cleared
+        Then nothing should be found
+        """
+        self.index.search('operational')
+        self.table.clear()
+        self.assertEqual(self.index.search('operational'), [])
@@ -1,5 +1,12 @@
+import re
 import unittest
-from canopen_monitor.parse.sync import parse, FailedValidationError
+from unittest.mock import mock_open, patch
+
+from canopen_monitor.parse import load_eds_files
+from canopen_monitor.parse.sync import parse, SyncCycleAssembler, \
+    synchronous_pdos
+from canopen_monitor.parse.utilities import FailedValidationError
+from tests import BATTERY_DCF
 
 
 class TestSYNC(unittest.TestCase):
@@ -40,3 +47,62 @@ class TestSYNC(unittest.TestCase):
         sync_message = b'\x01\xFF'
         with self.assertRaises(FailedValidationError):
             parse(None, sync_message, None)
+
+
+class TestSyncCycleAssembler(unittest.TestCase):
+    """
+    Tests for grouping synchronous PDOs into SYNC cycles
+    """
+
+    def setUp(self):
+        self.assembler = SyncCycleAssembler({0x181: 1, 0x282: 2})
+
+    def test_synchronous_pdos(self):
+        """
+        Test synchronous TPDOs are found from their transmission types
+        """
+        dcf = re.sub(r'(\[1800sub2\][^\[]*DefaultValue=)254', r'\g<1>1',
+                     BATTERY_DCF)
+        with patch('builtins.open', mock_open(read_data=dcf)):
+            with patch('os.listdir') as mocked_listdir:
+                mocked_listdir.return_value = ["battery.dcf"]
+                self.assertEqual({0x184: 1},
+                                 synchronous_pdos(load_eds_files("/")))
+
+    def test_cycles(self):
+        """
+        Test PDOs are grouped by the SYNC they follow, and the SYNC period
+        and jitter are measured
+        """
+        self.assembler.pdo(0x181, "ignored", now=0.0)
+        self.assertIsNone(self.assembler.sync(0, now=0.0))
+        self.assembler.pdo(0x181, "a", now=0.01)
+        self.assembler.pdo(0x282, "b", now=0.02)
+        cycle = self.assembler.sync(1, now=1.0)
+        self.assembler.sync(2, now=2.0)
+
+        self.assertEqual(0, cycle.number)
+        self.assertEqual({0x181: "a", 0x282: "b"}, cycle.pdos)
+        self.assertEqual(1.0, self.assembler.period)
+        self.assertEqual(0.5 * 0.75, self.assembler.jitter)
+
+    def test_late_and_missed(self):
+        """
+        Test PDOs are flagged when they arrive after the SYNC period or miss
+        a cycle they were due in, according to their transmission type
+        """
+        self.assembler.sync(now=0.0)
+        self.assembler.pdo(0x181, "a", now=0.01)
+        self.assembler.pdo(0x282, "b", now=0.01)
+        self.assembler.sync(now=1.0)
+        self.assembler.pdo(0x181, "a", now=1.01)
+        self.assembler.sync(now=2.0)
+        self.assertEqual([], self.assembler.poll())
+
+        self.assertTrue(self.assembler.pdo(0x181, "a", now=3.5))
+        cycle = self.assembler.sync(now=4.0)
+        self.assertEqual([0x282], cycle.missed)
+        self.assertEqual([(0x181, "Late for SYNC cycle 2"),
+                          (0x282, "Missed SYNC cycle 2")],
+                         self.assembler.poll())
+        self.assertEqual([], self.assembler.poll())